@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Recognize bot and automation commits so they can be dropped while the history is parsed.
+
+A commit is automated when its author name, author email or subject matches one of the
+configured regular expressions (case-insensitive, ``re.search``). Each list is compiled
+into a single alternation. Dropped commits are not discarded entirely: ``AutomationTally``
+keeps per-day totals per bot, so the overview can still show how much automation there was.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+
+def _compile(patterns: list[str]) -> re.Pattern[str] | None:
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns), re.IGNORECASE)
+
+
+class BotFilter:
+    def __init__(self, authors: list[str], emails: list[str], messages: list[str]) -> None:
+        self.patterns = {"authors": authors, "emails": emails, "messages": messages}
+        self._author_re = _compile(authors)
+        self._email_re = _compile(emails)
+        self._message_re = _compile(messages)
+        self._memo: dict[tuple[str, str], bool] = {}
+
+    @property
+    def active(self) -> bool:
+        return any(self.patterns.values())
+
+    def is_bot(self, name: str, email: str) -> bool:
+        verdict = self._memo.get((name, email))
+        if verdict is None:
+            verdict = self._memo[(name, email)] = bool(
+                (self._author_re is not None and self._author_re.search(name))
+                or (self._email_re is not None and self._email_re.search(email))
+            )
+        return verdict
+
+    def is_automated(self, name: str, email: str, subject: str) -> bool:
+        return self.is_bot(name, email) or bool(self._message_re is not None and self._message_re.search(subject))
+
+    @property
+    def fingerprint(self) -> str:
+        payload = json.dumps(self.patterns, sort_keys=True)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+
+@dataclass
+class AutomationTally:
+    """``[commits, additions, deletions]`` per day per bot name for the commits that were filtered out."""
+
+    days: dict[dt.date, dict[str, list[int]]] = field(default_factory=dict)
+
+    def add(self, day: dt.date, name: str, additions: int = 0, deletions: int = 0, commits: int = 0) -> None:
+        totals = self.days.setdefault(day, {}).setdefault(name, [0, 0, 0])
+        totals[0] += commits
+        totals[1] += additions
+        totals[2] += deletions
+
+    def merge(self, other: AutomationTally) -> None:
+        for day, bots in other.days.items():
+            for name, (commits, additions, deletions) in bots.items():
+                self.add(day, name, additions, deletions, commits)
+
+    def window(self, start: dt.date | None) -> tuple[int, int, int, int]:
+        """``(commits, bots, additions, deletions)`` over days on or after ``start``."""
+        commits = additions = deletions = 0
+        bots: set[str] = set()
+        for day, day_bots in self.days.items():
+            if start is not None and day < start:
+                continue
+            for name, totals in day_bots.items():
+                commits += totals[0]
+                additions += totals[1]
+                deletions += totals[2]
+                if totals[0]:
+                    bots.add(name)
+        return commits, len(bots), additions, deletions
+
+    def to_dict(self) -> dict[str, Any]:
+        return {day.isoformat(): bots for day, bots in sorted(self.days.items())}
+
+    @classmethod
+    def from_dict(cls, payload: dict[str, Any] | None) -> AutomationTally:
+        return cls({dt.date.fromisoformat(day): bots for day, bots in (payload or {}).items()})
+
+
+def build_bot_filter(bots_cfg: dict[str, Any]) -> BotFilter:
+    if not bots_cfg.get("enabled", True):
+        return BotFilter([], [], [])
+
+    def patterns(key: str) -> list[str]:
+        value = bots_cfg.get(key) or []
+        if isinstance(value, str):
+            value = [value]
+        return [str(pattern) for pattern in value if str(pattern)]
+
+    return BotFilter(patterns("authors"), patterns("emails"), patterns("messages"))
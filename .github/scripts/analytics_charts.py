@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Skip re-rendering charts whose input data has not changed.
+
+Each cached chart is recorded in a manifest next to the images as ``{filename: digest}``,
+where the digest is a hash of the JSON-serialized data the chart was drawn from. When the
+digest for a chart still matches and its file exists, the file is reused as-is. Unchanged
+windows then cost neither matplotlib time nor a rewritten PNG in the next commit.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable
+
+CHART_CACHE_VERSION = 1
+
+
+def chart_digest(kind: str, payload: Any) -> str:
+    text = json.dumps([CHART_CACHE_VERSION, kind, payload], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class ChartCache:
+    def __init__(self, manifest_path: Path) -> None:
+        self.manifest_path = manifest_path
+        try:
+            payload = json.loads(manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            payload = {}
+        self.digests: dict[str, str] = payload if isinstance(payload, dict) else {}
+        self.dirty = False
+
+    def render(self, output: Path, digest: str, draw: Callable[[Path], bool]) -> Path | None:
+        """Return ``output``; ``draw(output)`` only runs when the recorded digest differs or the file is gone."""
+        if self.digests.get(output.name) == digest and output.exists():
+            return output
+        if not draw(output):
+            return None
+        self.digests[output.name] = digest
+        self.dirty = True
+        return output
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.manifest_path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(self.digests, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        os.replace(temp_path, self.manifest_path)
+        self.dirty = False
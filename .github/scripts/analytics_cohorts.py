@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Contributor cohorts: arrivals per month and how many of them keep contributing.
+
+Each author is reduced to the month of their first commit, the month of their latest commit
+and an activity bitmap. Bit ``i`` of the bitmap is set when the author committed in month
+``first + i``. Months are plain integers (``year * 12 + month - 1``), so "N months later"
+is addition. Adding a commit updates one author in O(1), whatever order commits arrive in.
+Retention is then a bitmap test per author and never rescans the history.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+from dataclasses import dataclass, field
+from typing import Any, Sequence
+
+
+def month_index(day: dt.date) -> int:
+    return day.year * 12 + day.month - 1
+
+
+def month_label(month: int) -> str:
+    return f"{month // 12:04d}-{month % 12 + 1:02d}"
+
+
+@dataclass
+class CohortIndex:
+    first_seen: dict[Any, int] = field(default_factory=dict)
+    last_seen: dict[Any, int] = field(default_factory=dict)
+    activity: dict[Any, int] = field(default_factory=dict)
+
+    def add(self, author: Any, month: int) -> None:
+        first = self.first_seen.get(author)
+        if first is None:
+            self.first_seen[author] = self.last_seen[author] = month
+            self.activity[author] = 1
+            return
+        if month < first:
+            # History is read newest first, so earlier months usually arrive later.
+            self.activity[author] = (self.activity[author] << (first - month)) | 1
+            self.first_seen[author] = first = month
+        else:
+            self.activity[author] |= 1 << (month - first)
+        if month > self.last_seen[author]:
+            self.last_seen[author] = month
+
+    def add_rows(self, commits: Sequence[Any], start: int = 0) -> None:
+        """Fold ``commits[start:]`` (rows with ``.author`` and ``.date``) into the index."""
+        months: dict[dt.date, int] = {}
+        for row in range(start, len(commits)):
+            commit = commits[row]
+            month = months.get(commit.date)
+            if month is None:
+                month = months[commit.date] = month_index(commit.date)
+            self.add(commit.author, month)
+
+    def arrivals(self) -> dict[int, list[Any]]:
+        cohorts: dict[int, list[Any]] = {}
+        for author, first in self.first_seen.items():
+            cohorts.setdefault(first, []).append(author)
+        return cohorts
+
+    def retained(self, authors: list[Any], months_later: int) -> int:
+        """How many of ``authors`` committed again ``months_later`` or more months after their first month."""
+        return sum(1 for author in authors if self.activity[author] >> months_later)
+
+    def active_since(self, month: int) -> int:
+        return sum(1 for last in self.last_seen.values() if last >= month)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Co-change coupling: how often two files are touched by the same commit.
+
+Pairs are counted sparsely (only pairs that actually co-occur are stored, keyed by interned
+file ids). Commits touching more than ``max_files`` files are skipped, because a bulk
+rename or reformat would add a quadratic number of meaningless pairs. When the pair table
+grows past ``max_pairs``, the rarest pairs are evicted. Counts for pairs that survive
+eviction are then lower bounds, which is fine for ranking the strongly coupled ones.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import combinations
+from typing import Any, Callable, Iterable
+
+
+@dataclass
+class CouplingCounts:
+    paths: list[str] = field(default_factory=list)
+    file_commits: Counter[int] = field(default_factory=Counter)
+    pairs: Counter[tuple[int, int]] = field(default_factory=Counter)
+    commits: int = 0
+    skipped_commits: int = 0
+    # Pairs that co-changed at most this many times may have been evicted.
+    eviction_floor: int = 0
+    evictions: int = 0
+
+
+@dataclass
+class CoupledPair:
+    first: str
+    second: str
+    support: int
+    confidence: float
+
+
+def count_cochanges(
+    changes: Iterable[Any],
+    max_files: int,
+    max_pairs: int,
+    keep: Callable[[str], bool] = lambda filename: True,
+) -> CouplingCounts:
+    """Count per-file and per-pair commit occurrences over rows grouped by ``commit``."""
+    counts = CouplingCounts()
+    path_ids: dict[str, int] = {}
+
+    def flush(files: set[int]) -> None:
+        if not files:
+            return
+        counts.commits += 1
+        if len(files) > max_files:
+            counts.skipped_commits += 1
+            return
+        counts.file_commits.update(files)
+        if len(files) > 1:
+            counts.pairs.update(combinations(sorted(files), 2))
+        if len(counts.pairs) > max_pairs:
+            # Evict down to half the budget so sweeps stay rare.
+            evict(counts, max_pairs // 2)
+
+    current_commit = None
+    current_files: set[int] = set()
+    for change in changes:
+        if change.commit != current_commit:
+            flush(current_files)
+            current_commit = change.commit
+            current_files = set()
+        if not keep(change.filename):
+            continue
+        path_id = path_ids.get(change.filename)
+        if path_id is None:
+            path_id = path_ids[change.filename] = len(counts.paths)
+            counts.paths.append(change.filename)
+        current_files.add(path_id)
+    flush(current_files)
+
+    return counts
+
+
+def evict(counts: CouplingCounts, target: int) -> None:
+    """Keep only the ``target`` most frequent pairs and remember the highest evicted count."""
+    ranked = counts.pairs.most_common()
+    if len(ranked) <= target:
+        return
+    counts.eviction_floor = max(counts.eviction_floor, ranked[target][1])
+    counts.evictions += 1
+    counts.pairs = Counter(dict(ranked[:target]))
+
+
+def coupled_pairs(counts: CouplingCounts, min_support: int, min_confidence: float) -> list[CoupledPair]:
+    """Pairs meeting both thresholds, strongest first.
+
+    Confidence is ``support / min(commits(a), commits(b))``. It is the share of the less
+    frequently changed file's commits that also touched the other file.
+    """
+    pairs: list[CoupledPair] = []
+    for (first, second), support in counts.pairs.items():
+        if support < min_support:
+            continue
+        confidence = support / min(counts.file_commits[first], counts.file_commits[second])
+        if confidence < min_confidence:
+            continue
+        # Path ids follow ingestion order, so order each pair by path to keep tables stable across rebuilds.
+        first_path, second_path = sorted((counts.paths[first], counts.paths[second]))
+        pairs.append(CoupledPair(first_path, second_path, support, confidence))
+    pairs.sort(key=lambda pair: (-pair.confidence, -pair.support, pair.first, pair.second))
+    return pairs
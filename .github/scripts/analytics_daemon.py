@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Serve repository analytics as JSON and refresh them when git refs change."""
+
+from __future__ import annotations
+
+import datetime as dt
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable
+
+ENDPOINTS = ("overview", "languages", "commits", "pulse")
+
+
+class RefWatcher:
+    """Detect ref updates by fingerprinting HEAD, packed-refs and every loose ref file."""
+
+    def __init__(self, paths: list[Path]) -> None:
+        self.paths = paths
+        self._fingerprint = self._scan()
+
+    def _scan(self) -> tuple[tuple[str, int, int], ...]:
+        entries: list[tuple[str, int, int]] = []
+        for root in self.paths:
+            candidates = root.rglob("*") if root.is_dir() else [root]
+            for path in candidates:
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                if path.is_file():
+                    entries.append((str(path), stat.st_mtime_ns, stat.st_size))
+        return tuple(sorted(entries))
+
+    def changed(self) -> bool:
+        fingerprint = self._scan()
+        if fingerprint == self._fingerprint:
+            return False
+        self._fingerprint = fingerprint
+        return True
+
+
+class AnalyticsState:
+    def __init__(self, payloads: dict[str, Any]) -> None:
+        self._lock = threading.Lock()
+        self._payloads = payloads
+
+    def get(self, name: str) -> Any:
+        with self._lock:
+            return self._payloads.get(name)
+
+    def replace(self, payloads: dict[str, Any]) -> None:
+        with self._lock:
+            self._payloads = payloads
+
+
+def make_handler(state: AnalyticsState) -> type[BaseHTTPRequestHandler]:
+    class AnalyticsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802 - http.server naming
+            name = self.path.split("?", 1)[0].strip("/")
+            if not name:
+                self._send_json(200, {"endpoints": [f"/{endpoint}" for endpoint in ENDPOINTS]})
+                return
+
+            payload = state.get(name) if name in ENDPOINTS else None
+            if payload is None:
+                self._send_json(404, {"error": f"unknown endpoint: /{name}"})
+                return
+            self._send_json(200, payload)
+
+        def _send_json(self, status: int, payload: Any) -> None:
+            body = json.dumps(payload, indent=2).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+            return
+
+    return AnalyticsHandler
+
+
+def watch_refs(
+    watcher: RefWatcher,
+    state: AnalyticsState,
+    refresh: Callable[[], dict[str, Any] | None],
+    poll_interval: float,
+    stop: threading.Event,
+) -> None:
+    current_day = dt.date.today()
+    while not stop.wait(poll_interval):
+        # Rolling windows also slide at midnight even when no ref moved.
+        today = dt.date.today()
+        if not watcher.changed() and today == current_day:
+            continue
+        current_day = today
+
+        try:
+            payloads = refresh()
+        except Exception as exc:  # keep serving the last good snapshot
+            print(f"WARNING: Analytics refresh failed ({exc}).")
+            continue
+        if payloads is not None:
+            state.replace(payloads)
+
+
+def serve_analytics(
+    watched_paths: list[Path],
+    initial_payloads: dict[str, Any],
+    refresh: Callable[[], dict[str, Any] | None],
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    poll_interval: float = 2.0,
+) -> None:
+    """Serve ``initial_payloads`` and swap in ``refresh()`` results whenever refs change.
+
+    ``refresh`` is called after a ref update (or a date change) and returns the new
+    payloads, or None when nothing needs to be republished.
+    """
+    state = AnalyticsState(initial_payloads)
+    watcher = RefWatcher(watched_paths)
+    stop = threading.Event()
+
+    thread = threading.Thread(
+        target=watch_refs,
+        args=(watcher, state, refresh, poll_interval, stop),
+        name="ref-watcher",
+        daemon=True,
+    )
+    thread.start()
+
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    print(f"OK: Serving analytics on http://{host}:{server.server_port}/ (Ctrl+C to stop).")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Write machine-readable analytics exports (JSON, CSV, optional Parquet) next to the charts.
+
+Every file is streamed to a temporary sibling while its SHA-256 is computed, and only
+replaces the existing file when the content actually changed, so unchanged exports keep
+their mtime and never show up as diffs.
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+Table = tuple[Sequence[str], Iterable[Sequence[Any]]]
+
+_ARROW_MODULES: tuple[Any, Any] | None = None
+_ARROW_IMPORT_ATTEMPTED = False
+
+
+def get_arrow_modules() -> tuple[Any, Any] | None:
+    global _ARROW_MODULES, _ARROW_IMPORT_ATTEMPTED
+    if _ARROW_MODULES is not None:
+        return _ARROW_MODULES
+    if _ARROW_IMPORT_ATTEMPTED:
+        return None
+
+    _ARROW_IMPORT_ATTEMPTED = True
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        _ARROW_MODULES = (pa, pq)
+    except Exception:
+        _ARROW_MODULES = None
+
+    return _ARROW_MODULES
+
+
+class HashingWriter:
+    """Text sink that encodes, hashes and writes in one pass."""
+
+    def __init__(self, handle: Any) -> None:
+        self.handle = handle
+        self.digest = hashlib.sha256()
+
+    def write(self, text: str) -> int:
+        data = text.encode("utf-8")
+        self.digest.update(data)
+        self.handle.write(data)
+        return len(text)
+
+
+def file_digest(path: Path) -> str | None:
+    if not path.exists():
+        return None
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _commit_temp(temp_name: str, path: Path, new_digest: str) -> bool:
+    if file_digest(path) == new_digest:
+        os.unlink(temp_name)
+        return False
+    os.replace(temp_name, path)
+    return True
+
+
+def _open_temp(path: Path) -> tuple[Any, str]:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    os.chmod(temp_name, 0o644)  # mkstemp defaults to 0600
+    return os.fdopen(fd, "wb"), temp_name
+
+
+def write_json_if_changed(path: Path, document: Any) -> bool:
+    """Stream ``document`` as JSON; returns True when the file on disk was replaced."""
+    handle, temp_name = _open_temp(path)
+    with handle:
+        writer = HashingWriter(handle)
+        for chunk in json.JSONEncoder(indent=2).iterencode(document):
+            writer.write(chunk)
+        writer.write("\n")
+    return _commit_temp(temp_name, path, writer.digest.hexdigest())
+
+
+def write_csv_if_changed(path: Path, header: Sequence[str], rows: Iterable[Sequence[Any]]) -> bool:
+    handle, temp_name = _open_temp(path)
+    with handle:
+        writer = HashingWriter(handle)
+        csv_writer = csv.writer(writer, lineterminator="\n")
+        csv_writer.writerow(header)
+        for row in rows:
+            csv_writer.writerow(row)
+    return _commit_temp(temp_name, path, writer.digest.hexdigest())
+
+
+def write_parquet_if_changed(path: Path, header: Sequence[str], rows: Iterable[Sequence[Any]]) -> bool:
+    modules = get_arrow_modules()
+    if modules is None:
+        return False
+    pa, pq = modules
+
+    materialized = list(rows)
+    columns = {name: [row[idx] for row in materialized] for idx, name in enumerate(header)}
+    handle, temp_name = _open_temp(path)
+    handle.close()
+    pq.write_table(pa.table(columns), temp_name)
+    return _commit_temp(temp_name, path, file_digest(Path(temp_name)) or "")
+
+
+def export_tables(
+    output_dir: Path,
+    document: Any,
+    tables: dict[str, Table],
+    prefix: str = "analytics",
+    csv_enabled: bool = True,
+    parquet_enabled: bool = True,
+) -> list[Path]:
+    """Write ``<prefix>.json`` plus one CSV (and Parquet, if pyarrow is installed) per table.
+
+    Returns the paths that were actually rewritten.
+    """
+    written: list[Path] = []
+
+    json_path = output_dir / f"{prefix}.json"
+    if write_json_if_changed(json_path, document):
+        written.append(json_path)
+
+    for name, (header, rows) in tables.items():
+        if csv_enabled and parquet_enabled:
+            rows = list(rows)  # consumed twice
+        if csv_enabled:
+            csv_path = output_dir / f"{prefix}_{name}.csv"
+            if write_csv_if_changed(csv_path, header, rows):
+                written.append(csv_path)
+        if parquet_enabled:
+            parquet_path = output_dir / f"{prefix}_{name}.parquet"
+            if write_parquet_if_changed(parquet_path, header, rows):
+                written.append(parquet_path)
+
+    return written
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Author identity resolution, interned to dense integer ids.
+
+git already applies .mailmap when the log format asks for ``%aN``/``%aE``. Two config
+tables are layered on top of that:
+
+- ``aliases`` maps a name or an email address (case-insensitive) to a display name
+- ``domains`` maps an email domain to one group name, so every address at that domain
+  counts as a single contributor
+
+Each resolved name gets a small integer id. Commit rows and every counter built from them
+key on that id, and the name is looked up again only when a table is rendered.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any
+
+
+class IdentityTable:
+    def __init__(self, aliases: dict[str, str], domains: dict[str, str], mailmap: bool, mailmap_blob: str = "") -> None:
+        self.aliases = {key.strip().lower(): value for key, value in aliases.items()}
+        self.domains = {domain.strip().lower().lstrip("@"): group for domain, group in domains.items()}
+        self.mailmap = mailmap
+        # Blob id of .mailmap at HEAD; part of the fingerprint because it changes every stored name.
+        self.mailmap_blob = mailmap_blob if mailmap else ""
+        self.names: list[str] = []
+        self._ids: dict[str, int] = {}
+        self._memo: dict[tuple[str, str], int] = {}
+
+    @property
+    def active(self) -> bool:
+        return bool(self.aliases or self.domains or self.mailmap_blob)
+
+    def canonical_name(self, name: str, email: str = "") -> str:
+        email = email.strip().lower()
+        alias = self.aliases.get(email) if email else None
+        if alias is None:
+            alias = self.aliases.get(name.strip().lower())
+        if alias:
+            return alias
+        _, at, domain = email.rpartition("@")
+        return (self.domains.get(domain) if at else None) or name
+
+    def intern(self, name: str) -> int:
+        identity = self._ids.get(name)
+        if identity is None:
+            identity = self._ids[name] = len(self.names)
+            self.names.append(name)
+        return identity
+
+    def resolve(self, name: str, email: str = "") -> int:
+        """Id of the identity behind a raw ``(name, email)`` pair, memoized per pair."""
+        identity = self._memo.get((name, email))
+        if identity is None:
+            identity = self._memo[(name, email)] = self.intern(self.canonical_name(name, email))
+        return identity
+
+    def name(self, identity: int) -> str:
+        return self.names[identity]
+
+    @property
+    def fingerprint(self) -> str:
+        payload = json.dumps([sorted(self.aliases.items()), sorted(self.domains.items()), self.mailmap_blob])
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+
+def build_identity_table(identities_cfg: dict[str, Any], mailmap_blob: str = "") -> IdentityTable:
+    def table(key: str) -> dict[str, str]:
+        value = identities_cfg.get(key) or {}
+        if not isinstance(value, dict):
+            return {}
+        return {str(source): str(target) for source, target in value.items() if str(source).strip()}
+
+    return IdentityTable(
+        table("aliases"),
+        table("domains"),
+        mailmap=bool(identities_cfg.get("mailmap", True)),
+        mailmap_blob=mailmap_blob,
+    )
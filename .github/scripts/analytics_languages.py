@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""Path -> language classification compiled once from a rule table.
+
+Rules are checked in this order:
+0. ``linguist-language`` from .gitattributes
+1. path globs (a pattern without ``/`` matches the basename)
+2. exact filenames
+3. extensions
+4. the interpreter from a shebang line, for extensionless files whose first line was sniffed
+
+Anything else falls back to the upper-cased extension, or "Other". Results are memoized
+per distinct path, so classifying a long history costs one lookup per row. Paths marked
+``linguist-generated`` or ``linguist-vendored`` are collected in ``excluded``.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import subprocess
+from pathlib import Path
+from typing import Any, Iterable
+
+LINGUIST_ATTRIBUTES = ("linguist-generated", "linguist-vendored", "linguist-language")
+
+DEFAULT_LANGUAGE_RULES: dict[str, dict[str, str]] = {
+    "extensions": {
+        ".py": "Python",
+        ".js": "JavaScript",
+        ".jsx": "JavaScript",
+        ".ts": "TypeScript",
+        ".tsx": "TypeScript",
+        ".java": "Java",
+        ".go": "Go",
+        ".rb": "Ruby",
+        ".php": "PHP",
+        ".cs": "C#",
+        ".cpp": "C++",
+        ".c": "C",
+        ".rs": "Rust",
+        ".swift": "Swift",
+        ".kt": "Kotlin",
+        ".scala": "Scala",
+        ".html": "HTML",
+        ".css": "CSS",
+        ".scss": "SCSS",
+        ".less": "LESS",
+        ".md": "Markdown",
+        ".json": "JSON",
+        ".yml": "YAML",
+        ".yaml": "YAML",
+        ".xml": "XML",
+        ".sql": "SQL",
+        ".sh": "Shell",
+        ".bash": "Shell",
+        ".zsh": "Shell",
+        ".mk": "Makefile",
+        ".dockerfile": "Dockerfile",
+    },
+    "filenames": {
+        "Dockerfile": "Dockerfile",
+        "Containerfile": "Dockerfile",
+        "Makefile": "Makefile",
+        "makefile": "Makefile",
+        "GNUmakefile": "Makefile",
+        "CMakeLists.txt": "CMake",
+        "Gemfile": "Ruby",
+        "Rakefile": "Ruby",
+        "Vagrantfile": "Ruby",
+        "Jenkinsfile": "Groovy",
+    },
+    "globs": {
+        "Dockerfile.*": "Dockerfile",
+        "*.Dockerfile": "Dockerfile",
+        "Makefile.*": "Makefile",
+    },
+    "interpreters": {
+        "python": "Python",
+        "sh": "Shell",
+        "bash": "Shell",
+        "zsh": "Shell",
+        "dash": "Shell",
+        "ksh": "Shell",
+        "node": "JavaScript",
+        "deno": "TypeScript",
+        "ruby": "Ruby",
+        "perl": "Perl",
+        "php": "PHP",
+    },
+}
+
+
+def split_extension(filename: str) -> tuple[str, str]:
+    """``(basename, lower-cased extension)``; dotfiles such as ``.bashrc`` have no extension."""
+    basename = filename.rsplit("/", 1)[-1]
+    ext = os.path.splitext(basename)[1].lower()
+    return basename, "" if ext == "." else ext
+
+
+def shebang_interpreter(content: bytes) -> str:
+    """Interpreter named on a ``#!`` first line (``env`` is looked through), or ""."""
+    if not content.startswith(b"#!"):
+        return ""
+    first_line = content[2:].split(b"\n", 1)[0].decode("utf-8", errors="replace")
+    words = first_line.split()
+    if not words:
+        return ""
+    program = words[0].rsplit("/", 1)[-1]
+    if program == "env":
+        arguments = [word for word in words[1:] if not word.startswith("-") and "=" not in word]
+        program = arguments[0].rsplit("/", 1)[-1] if arguments else ""
+    return program
+
+
+def read_linguist_attributes(
+    git_prefix: list[str],
+    paths: Iterable[str],
+    source: str | None = None,
+    cwd: Path | None = None,
+) -> dict[str, list[Any]] | None:
+    """``[generated, vendored, language]`` per path from a single ``check-attr --stdin -z``.
+
+    ``source`` reads .gitattributes from a tree (needed for bare repositories; git >= 2.40).
+    Returns None when git cannot answer.
+    """
+    paths = list(paths)
+    if not paths:
+        return {}
+    command = [*git_prefix, "check-attr", "--stdin", "-z"]
+    if source:
+        command.append(f"--source={source}")
+    completed = subprocess.run(
+        [*command, *LINGUIST_ATTRIBUTES],
+        input="\0".join(paths).encode("utf-8") + b"\0",
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        cwd=cwd,
+        check=False,
+    )
+    if completed.returncode != 0:
+        return None
+
+    attributes = {path: [False, False, ""] for path in paths}
+    fields = completed.stdout.decode("utf-8", errors="replace").split("\0")
+    for offset in range(0, len(fields) - 2, 3):
+        path, name, value = fields[offset : offset + 3]
+        entry = attributes.setdefault(path, [False, False, ""])
+        if name == "linguist-language":
+            entry[2] = "" if value in ("unspecified", "unset", "set") else value
+        else:
+            entry[LINGUIST_ATTRIBUTES.index(name)] = value in ("set", "true")
+    return attributes
+
+
+class LanguageClassifier:
+    def __init__(self, rules: dict[str, dict[str, str]]) -> None:
+        self.rules = rules
+        self.filenames = dict(rules.get("filenames", {}))
+        self.extensions = {
+            "." + ext.lower().lstrip("."): language for ext, language in rules.get("extensions", {}).items()
+        }
+        self.interpreters = dict(rules.get("interpreters", {}))
+        self.globs = [
+            (re.compile(fnmatch.translate(pattern)), "/" in pattern, language)
+            for pattern, language in rules.get("globs", {}).items()
+        ]
+        self.sniffed: dict[str, str] = {}
+        self.attribute_languages: dict[str, str] = {}
+        self.excluded: set[str] = set()
+        self._memo: dict[str, str] = {}
+
+    def apply_attributes(self, attributes: dict[str, list[Any]]) -> None:
+        """Use ``[generated, vendored, language]`` per path from .gitattributes."""
+        self.excluded = {path for path, (generated, vendored, _) in attributes.items() if generated or vendored}
+        self.attribute_languages = {path: language for path, (_, _, language) in attributes.items() if language}
+        self._memo.clear()
+
+    def add_shebangs(self, interpreters_by_path: dict[str, str]) -> None:
+        """Register sniffed interpreters for extensionless paths; clears affected memo entries."""
+        for path, interpreter in interpreters_by_path.items():
+            language = self.interpreter_language(interpreter)
+            if language and self.sniffed.get(path) != language:
+                self.sniffed[path] = language
+                self._memo.pop(path, None)
+
+    def interpreter_language(self, interpreter: str) -> str:
+        if not interpreter:
+            return ""
+        language = self.interpreters.get(interpreter)
+        if language is None:
+            # python3.11 -> python
+            language = self.interpreters.get(interpreter.rstrip("0123456789.") or interpreter, "")
+        return language
+
+    def needs_sniffing(self, filename: str) -> bool:
+        basename, ext = split_extension(filename)
+        return not ext and basename not in self.filenames and not self._glob_language(filename, basename)
+
+    def _glob_language(self, filename: str, basename: str) -> str:
+        for pattern, full_path, language in self.globs:
+            if pattern.match(filename if full_path else basename):
+                return language
+        return ""
+
+    def classify(self, filename: str) -> str:
+        language = self._memo.get(filename)
+        if language is not None:
+            return language
+
+        basename, ext = split_extension(filename)
+        language = (
+            self.attribute_languages.get(filename)
+            or self._glob_language(filename, basename)
+            or self.filenames.get(basename)
+            or self.extensions.get(ext)
+            or (self.sniffed.get(filename, "") if not ext else "")
+            or (ext.lstrip(".").upper() if ext else "Other")
+        )
+        self._memo[filename] = language
+        return language
+
+    @property
+    def fingerprint(self) -> str:
+        """Changes whenever a rule or a sniffed shebang would change some classification."""
+        payload = json.dumps(
+            [self.rules, sorted(self.sniffed.items()), sorted(self.attribute_languages.items()), sorted(self.excluded)],
+            sort_keys=True,
+        )
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def build_classifier(overrides: dict[str, Any] | None = None) -> LanguageClassifier:
+    """Compile the default rules with ``overrides`` (same four tables) layered on top."""
+    rules = {table: dict(entries) for table, entries in DEFAULT_LANGUAGE_RULES.items()}
+    for table, entries in (overrides or {}).items():
+        if table in rules and isinstance(entries, dict):
+            rules[table].update({str(key): str(value) for key, value in entries.items()})
+    return LanguageClassifier(rules)
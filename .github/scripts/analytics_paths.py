@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""``paths.exclude`` / ``paths.include`` with gitignore-style patterns.
+
+Each list is compiled into one alternation regex, and verdicts are memoized per distinct
+path. Pattern semantics follow .gitignore:
+
+- a pattern with a slash at the start or in the middle is anchored to the repository root
+- otherwise it matches at any depth
+- a trailing ``/`` only matches directories
+- ``**`` spans directories
+- ``!pattern`` in ``exclude`` re-includes paths that an earlier pattern excluded
+
+When every pattern can be expressed as a pathspec, ``pathspecs()`` returns
+``:(exclude,glob)`` magic so git skips the excluded trees entirely.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from typing import Any
+
+
+def _translate(body: str) -> str:
+    """Glob body (no leading/trailing slash) -> regex; ``*`` and ``?`` stop at ``/``."""
+    out: list[str] = []
+    idx = 0
+    while idx < len(body):
+        if body.startswith("**/", idx):
+            out.append("(?:.*/)?")
+            idx += 3
+        elif body.startswith("/**", idx) and idx + 3 == len(body):
+            out.append("/.*")
+            idx += 3
+        elif body.startswith("**", idx):
+            out.append(".*")
+            idx += 2
+        elif body[idx] == "*":
+            out.append("[^/]*")
+            idx += 1
+        elif body[idx] == "?":
+            out.append("[^/]")
+            idx += 1
+        elif body[idx] == "[" and "]" in body[idx + 2 :]:
+            end = body.index("]", idx + 2)
+            char_class = body[idx + 1 : end]
+            if char_class.startswith("!"):
+                char_class = "^" + char_class[1:]
+            out.append(f"[{char_class}]")
+            idx = end + 1
+        else:
+            out.append(re.escape(body[idx]))
+            idx += 1
+    return "".join(out)
+
+
+def pattern_regex(pattern: str) -> str:
+    dir_only = pattern.endswith("/")
+    body = pattern.strip("/")
+    anchored = pattern.startswith("/") or "/" in body
+    prefix = "" if anchored else "(?:.*/)?"
+    # A match on a directory covers everything below it; a directory-only pattern needs something below.
+    suffix = "/.+" if dir_only else "(?:/.+)?"
+    return prefix + _translate(body) + suffix
+
+
+def pattern_pathspecs(pattern: str) -> list[str]:
+    dir_only = pattern.endswith("/")
+    body = pattern.strip("/")
+    anchored = pattern.startswith("/") or "/" in body
+    glob = body if anchored else f"**/{body}"
+    variants = [f"{glob}/**"] if dir_only else [glob, f"{glob}/**"]
+    return [f":(exclude,glob){variant}" for variant in variants]
+
+
+def _compile(patterns: list[str]) -> re.Pattern[str] | None:
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{pattern_regex(pattern)})" for pattern in patterns))
+
+
+class PathFilter:
+    def __init__(self, exclude: list[str], include: list[str]) -> None:
+        self.exclude = [pattern for pattern in exclude if pattern and not pattern.startswith("!")]
+        self.reinclude = [pattern[1:] for pattern in exclude if pattern.startswith("!") and len(pattern) > 1]
+        self.include = [pattern for pattern in include if pattern]
+        self._exclude_re = _compile(self.exclude)
+        self._reinclude_re = _compile(self.reinclude)
+        self._include_re = _compile(self.include)
+        self._memo: dict[str, bool] = {}
+
+    @property
+    def active(self) -> bool:
+        return bool(self.exclude or self.include)
+
+    def allows(self, path: str) -> bool:
+        verdict = self._memo.get(path)
+        if verdict is None:
+            verdict = True
+            if self._include_re is not None and not self._include_re.fullmatch(path):
+                verdict = False
+            elif self._exclude_re is not None and self._exclude_re.fullmatch(path):
+                verdict = self._reinclude_re is not None and bool(self._reinclude_re.fullmatch(path))
+            self._memo[path] = verdict
+        return verdict
+
+    def pathspecs(self) -> list[str]:
+        """``:(exclude)`` pathspecs equivalent to the filter, or [] when it cannot be pushed down.
+
+        Re-includes and include lists are only applied in-process, so they disable pushdown.
+        """
+        if not self.exclude or self.reinclude or self.include:
+            return []
+        return [":/", *(spec for pattern in self.exclude for spec in pattern_pathspecs(pattern))]
+
+    @property
+    def fingerprint(self) -> str:
+        payload = json.dumps([self.exclude, self.reinclude, self.include])
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+
+def build_path_filter(paths_cfg: dict[str, Any]) -> PathFilter:
+    def patterns(key: str) -> list[str]:
+        value = paths_cfg.get(key) or []
+        if isinstance(value, str):
+            value = [value]
+        return [str(pattern).strip() for pattern in value if str(pattern).strip()]
+
+    return PathFilter(patterns("exclude"), patterns("include"))
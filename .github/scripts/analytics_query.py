@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Filtered aggregations over the cached commit/change rows, without running git."""
+
+from __future__ import annotations
+
+import datetime as dt
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable
+
+GROUP_BY_CHOICES = ("author", "language", "path", "category", "day", "week", "month")
+
+
+@dataclass
+class QueryFilters:
+    authors: set[str] = field(default_factory=set)
+    path_prefixes: tuple[str, ...] = ()
+    languages: set[str] = field(default_factory=set)
+    categories: set[str] = field(default_factory=set)
+    start: dt.date | None = None
+    end: dt.date | None = None
+
+    @property
+    def row_level(self) -> bool:
+        """Path/language filters select file rows rather than whole commits."""
+        return bool(self.path_prefixes or self.languages)
+
+
+def path_group(filename: str, depth: int) -> str:
+    parts = filename.split("/")
+    if len(parts) <= depth:
+        return filename
+    return "/".join(parts[:depth]) + "/"
+
+
+def date_group(day: dt.date, granularity: str) -> str:
+    if granularity == "week":
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    if granularity == "month":
+        return f"{day.year}-{day.month:02d}"
+    return day.isoformat()
+
+
+def run_query(
+    commits: Iterable[Any],
+    changes: Iterable[Any],
+    filters: QueryFilters,
+    language_of: Callable[[str], str],
+    category_of: Callable[[Any], str],
+    group_by: str | None = None,
+    depth: int = 2,
+    author_name: Callable[[Any], str] = str,
+) -> dict[str, Any]:
+    """Aggregate commits/churn for rows matching ``filters``, optionally grouped.
+
+    ``commits`` and ``changes`` are the history index rows (``commit``/``author``/``date``
+    plus ``filename``/``additions``/``deletions`` on changes). ``author_name`` turns a row's
+    ``author`` into the name that is filtered on and reported.
+    """
+    authors = {author.lower() for author in filters.authors}
+    languages = {language.lower() for language in filters.languages}
+    categories = {category.lower() for category in filters.categories}
+
+    def date_ok(day: dt.date) -> bool:
+        return (filters.start is None or day >= filters.start) and (filters.end is None or day <= filters.end)
+
+    selected_commits: dict[str, Any] = {}
+    commit_categories: dict[str, str] = {}
+    for commit in commits:
+        if not date_ok(commit.date):
+            continue
+        if authors and author_name(commit.author).lower() not in authors:
+            continue
+        category = category_of(commit)
+        if categories and category not in categories:
+            continue
+        selected_commits[commit.commit] = commit
+        commit_categories[commit.commit] = category
+
+    language_cache: dict[str, str] = {}
+
+    def language_for(filename: str) -> str:
+        language = language_cache.get(filename)
+        if language is None:
+            language = language_cache[filename] = language_of(filename)
+        return language
+
+    group_commits: dict[str, set[str]] = {}
+    group_additions: Counter[str] = Counter()
+    group_deletions: Counter[str] = Counter()
+    matched_commits: set[str] = set()
+    files: set[str] = set()
+    additions = deletions = 0
+
+    def group_key(change: Any) -> str:
+        if group_by == "author":
+            return author_name(change.author)
+        if group_by == "language":
+            return language_for(change.filename)
+        if group_by == "path":
+            return path_group(change.filename, depth)
+        if group_by == "category":
+            return commit_categories[change.commit]
+        return date_group(change.date, group_by or "day")
+
+    for change in changes:
+        if change.commit not in selected_commits:
+            continue
+        if filters.path_prefixes and not change.filename.startswith(filters.path_prefixes):
+            continue
+        if languages and language_for(change.filename).lower() not in languages:
+            continue
+
+        matched_commits.add(change.commit)
+        files.add(change.filename)
+        additions += change.additions
+        deletions += change.deletions
+
+        if group_by:
+            key = group_key(change)
+            group_commits.setdefault(key, set()).add(change.commit)
+            group_additions[key] += change.additions
+            group_deletions[key] += change.deletions
+
+    commit_ids = matched_commits if filters.row_level else set(selected_commits)
+    result: dict[str, Any] = {
+        "commits": len(commit_ids),
+        "authors": len({selected_commits[commit_id].author for commit_id in commit_ids}),
+        "additions": additions,
+        "deletions": deletions,
+        "churn": additions + deletions,
+        "files": len(files),
+    }
+
+    if group_by:
+        rows = [
+            {
+                "group": key,
+                "commits": len(group_commits[key]),
+                "additions": group_additions[key],
+                "deletions": group_deletions[key],
+                "churn": group_additions[key] + group_deletions[key],
+            }
+            for key in group_commits
+        ]
+        if group_by in {"day", "week", "month"}:
+            rows.sort(key=lambda row: row["group"])
+        else:
+            rows.sort(key=lambda row: (-row["churn"], row["group"]))
+        result["group_by"] = group_by
+        result["groups"] = rows
+
+    return result
+
+
+def format_query_table(result: dict[str, Any], limit: int | None = None) -> str:
+    lines = [
+        "| Commits | Authors | +Add | -Del | Churn | Files |",
+        "|---------|---------|------|------|-------|-------|",
+        f"| {result['commits']} | {result['authors']} | {result['additions']} | {result['deletions']} | "
+        f"{result['churn']} | {result['files']} |",
+    ]
+
+    groups = result.get("groups")
+    if groups is not None:
+        title = str(result["group_by"]).capitalize()
+        lines.extend([
+            "",
+            f"| {title} | Commits | +Add | -Del | Churn |",
+            f"|{'-' * (len(title) + 2)}|---------|------|------|-------|",
+        ])
+        shown = groups[:limit] if limit else groups
+        for row in shown:
+            safe_group = str(row["group"]).replace("|", "\\|")
+            lines.append(
+                f"| {safe_group} | {row['commits']} | {row['additions']} | {row['deletions']} | {row['churn']} |"
+            )
+        if not groups:
+            lines.append("| _No matching rows_ | 0 | 0 | 0 | 0 |")
+        elif len(shown) < len(groups):
+            lines.append(f"\n_... {len(groups) - len(shown)} more group(s); raise --limit to see them._")
+
+    return "\n".join(lines)
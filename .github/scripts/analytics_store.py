@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""SQLite-backed analytics store (stdlib ``sqlite3``).
+
+The schema is normalized so analysts can run their own SQL against the same file the
+README generator reads:
+
+- ``authors(id, name)``
+- ``paths(id, path, language, ext, excluded)`` (``excluded`` marks generated/vendored paths)
+- ``commits(id, hash, author_id, day, subject, authored, committed)`` (``day`` is the
+  reporting-timezone date; ``authored``/``committed`` are UTC epoch seconds)
+- ``file_changes(commit_id, path_id, additions, deletions)``
+- ``meta(key, value)`` holding the format version and the indexed HEAD.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import re
+import sqlite3
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS authors (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS paths (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    language TEXT NOT NULL,
+    ext TEXT NOT NULL,
+    excluded INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS commits (
+    id INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL UNIQUE,
+    author_id INTEGER NOT NULL REFERENCES authors(id),
+    day TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    authored INTEGER NOT NULL DEFAULT 0,
+    committed INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS file_changes (
+    commit_id INTEGER NOT NULL REFERENCES commits(id),
+    path_id INTEGER NOT NULL REFERENCES paths(id),
+    additions INTEGER NOT NULL,
+    deletions INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_commits_day ON commits(day);
+CREATE INDEX IF NOT EXISTS idx_commits_author_day ON commits(author_id, day);
+CREATE INDEX IF NOT EXISTS idx_file_changes_commit ON file_changes(commit_id);
+CREATE INDEX IF NOT EXISTS idx_file_changes_path ON file_changes(path_id);
+CREATE INDEX IF NOT EXISTS idx_paths_language ON paths(language);
+"""
+# Created after the column migrations in connect_store(), since older stores lack these columns.
+TIME_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_commits_authored ON commits(authored);
+CREATE INDEX IF NOT EXISTS idx_commits_committed ON commits(committed);
+"""
+TIME_COLUMNS = ("authored", "committed")
+
+
+def connect_store(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.executescript(SCHEMA)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(paths)")}
+    if "excluded" not in columns:  # stores written before .gitattributes support
+        conn.execute("ALTER TABLE paths ADD COLUMN excluded INTEGER NOT NULL DEFAULT 0")
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(commits)")}
+    for column in TIME_COLUMNS:
+        if column not in columns:  # stores written before epoch timestamps
+            conn.execute(f"ALTER TABLE commits ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+    conn.executescript(TIME_INDEXES)
+    return conn
+
+
+def connect_store_readonly(path: Path) -> sqlite3.Connection:
+    """Open an existing store for ad-hoc queries; any write fails at the SQLite level."""
+    conn = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+    conn.execute("PRAGMA query_only=ON")
+    return conn
+
+
+def get_meta(conn: sqlite3.Connection, key: str) -> str | None:
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def clear_store(conn: sqlite3.Connection) -> None:
+    with conn:
+        conn.execute("DELETE FROM file_changes")
+        conn.execute("DELETE FROM commits")
+        conn.execute("DELETE FROM paths")
+        conn.execute("DELETE FROM authors")
+        conn.execute("DELETE FROM meta")
+
+
+def _max_id(conn: sqlite3.Connection, table: str) -> int:
+    return conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+
+
+def _intern(
+    conn: sqlite3.Connection,
+    table: str,
+    column: str,
+    names: set[str],
+    extra_columns: Callable[[str], tuple[Any, ...]] = lambda name: (),
+) -> dict[str, int]:
+    """Return ids for ``names``, inserting the missing ones with one executemany."""
+    ids = dict(conn.execute(f"SELECT {column}, id FROM {table}"))
+    missing = sorted(names - ids.keys())
+    if missing:
+        before = _max_id(conn, table)
+        rows = [(name, *extra_columns(name)) for name in missing]
+        placeholders = ", ".join("?" for _ in rows[0])
+        conn.executemany(f"INSERT INTO {table} VALUES (NULL, {placeholders})", rows)
+        ids.update(conn.execute(f"SELECT {column}, id FROM {table} WHERE id > ?", (before,)))
+    return ids
+
+
+def append_rows(
+    conn: sqlite3.Connection,
+    commits: Iterable[Any],
+    changes: Iterable[Any],
+    head: str,
+    version: str,
+    classify: Callable[[str], tuple[str, str, int]],
+    author_name: Callable[[Any], str] = str,
+    extra_meta: dict[str, str] | None = None,
+) -> None:
+    """Bulk-load commit/change rows in a single transaction and record the new HEAD.
+
+    ``classify`` maps a path to ``(language, ext, excluded)`` and only runs for paths not yet stored.
+    ``author_name`` turns a row's ``author`` (an interned id) into the name that is stored.
+    ``extra_meta`` entries are written to ``meta`` in the same transaction.
+    """
+    commits = list(commits)
+    changes = list(changes)
+
+    with conn:
+        author_ids = _intern(conn, "authors", "name", {author_name(commit.author) for commit in commits})
+        path_ids = _intern(conn, "paths", "path", {change.filename for change in changes}, classify)
+
+        before = _max_id(conn, "commits")
+        conn.executemany(
+            """
+            INSERT OR IGNORE INTO commits (hash, author_id, day, subject, authored, committed)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (
+                (
+                    commit.commit,
+                    author_ids[author_name(commit.author)],
+                    commit.date.isoformat(),
+                    commit.subject,
+                    commit.authored,
+                    commit.committed,
+                )
+                for commit in commits
+            ),
+        )
+        # Only commits inserted now get change rows, so a replayed batch cannot double count.
+        commit_ids = dict(conn.execute("SELECT hash, id FROM commits WHERE id > ?", (before,)))
+        conn.executemany(
+            "INSERT INTO file_changes (commit_id, path_id, additions, deletions) VALUES (?, ?, ?, ?)",
+            (
+                (commit_ids[change.commit], path_ids[change.filename], change.additions, change.deletions)
+                for change in changes
+                if change.commit in commit_ids
+            ),
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            [("head", head), ("version", version), *(extra_meta or {}).items()],
+        )
+
+
+def reclassify_paths(
+    conn: sqlite3.Connection,
+    classify: Callable[[str], tuple[str, str, int]],
+    fingerprint: str,
+) -> None:
+    """Recompute ``paths.language``/``ext``/``excluded`` for every stored path and record the rule fingerprint."""
+    with conn:
+        rows = conn.execute("SELECT id, path FROM paths").fetchall()
+        conn.executemany(
+            "UPDATE paths SET language = ?, ext = ?, excluded = ? WHERE id = ?",
+            ((*classify(path), path_id) for path_id, path in rows),
+        )
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('classifier', ?)", (fingerprint,))
+
+
+def iter_commit_rows(conn: sqlite3.Connection) -> Iterable[tuple[str, str, int, int, str]]:
+    """``(hash, author name, authored, committed, subject)`` in insertion order."""
+    query = """
+        SELECT c.hash, a.name, c.authored, c.committed, c.subject
+        FROM commits c JOIN authors a ON a.id = c.author_id
+        ORDER BY c.id
+    """
+    return conn.execute(query)
+
+
+def iter_change_rows(conn: sqlite3.Connection) -> Iterable[tuple[str, str, int, int]]:
+    """``(commit hash, path, additions, deletions)``; author and time come from the commit row."""
+    query = """
+        SELECT c.hash, p.path, f.additions, f.deletions
+        FROM file_changes f
+        JOIN commits c ON c.id = f.commit_id
+        JOIN paths p ON p.id = f.path_id
+        ORDER BY f.rowid
+    """
+    return conn.execute(query)
+
+
+def iter_commit_times(conn: sqlite3.Connection, start: int | None, time_column: str = "authored") -> list[int]:
+    """Epoch seconds of every commit on ``time_column`` at or after ``start``, for calendar bucketing."""
+    if time_column not in TIME_COLUMNS:
+        raise ValueError(f"unknown time column {time_column!r}")
+    query = f"SELECT {time_column} FROM commits WHERE {time_column} >= ? ORDER BY id"
+    return [row[0] for row in conn.execute(query, (start if start is not None else -(2**62),))]
+
+
+def iter_commit_churn(
+    conn: sqlite3.Connection, start: int | None, time_column: str = "authored"
+) -> list[tuple[int, str, int, int]]:
+    """``(time, author, additions, deletions)`` per commit on ``time_column`` at or after ``start``."""
+    if time_column not in TIME_COLUMNS:
+        raise ValueError(f"unknown time column {time_column!r}")
+    query = f"""
+        SELECT c.{time_column}, a.name, SUM(f.additions), SUM(f.deletions)
+        FROM file_changes f
+        JOIN commits c ON c.id = f.commit_id
+        JOIN authors a ON a.id = c.author_id
+        WHERE c.{time_column} >= ? GROUP BY f.commit_id ORDER BY f.commit_id
+    """
+    return conn.execute(query, (start if start is not None else -(2**62),)).fetchall()
+
+
+def summarize_store(
+    conn: sqlite3.Connection,
+    start: int | None,
+    ignored_values: set[str],
+    author_key: Callable[[str], Any] = str,
+    time_column: str = "authored",
+) -> dict[str, Any]:
+    """Compute every ``Summary`` aggregate with indexed SQL over ``commits.<time_column> >= start``.
+
+    ``start`` is in epoch seconds, so sub-day windows are exact. Author names are mapped through
+    ``author_key`` so contributor counters match the in-memory ones.
+    """
+    if time_column not in TIME_COLUMNS:
+        raise ValueError(f"unknown time column {time_column!r}")
+    day_from = start if start is not None else -(2**62)
+    ignored = sorted(ignored_values)
+    ignore_marks = ", ".join("?" for _ in ignored)
+    ignore_clause = "AND p.excluded = 0" + (
+        f" AND LOWER(p.language) NOT IN ({ignore_marks}) AND p.ext NOT IN ({ignore_marks})" if ignored else ""
+    )
+
+    def counter(query: str, params: tuple[Any, ...] = ()) -> Counter[Any]:
+        return Counter(dict(conn.execute(query, (day_from, *params))))
+
+    def author_counter(query: str) -> Counter[Any]:
+        return Counter({author_key(name): value for name, value in conn.execute(query, (day_from,))})
+
+    commits, contributors = conn.execute(
+        f"SELECT COUNT(*), COUNT(DISTINCT author_id) FROM commits WHERE {time_column} >= ?",
+        (day_from,),
+    ).fetchone()
+    additions, deletions, files_changed = conn.execute(
+        f"""
+        SELECT COALESCE(SUM(f.additions), 0), COALESCE(SUM(f.deletions), 0), COUNT(DISTINCT f.path_id)
+        FROM file_changes f JOIN commits c ON c.id = f.commit_id
+        WHERE c.{time_column} >= ?
+        """,
+        (day_from,),
+    ).fetchone()
+
+    # Groups are ordered by first row so Counter tie-breaking matches the in-memory summarize().
+    file_author_churn: dict[str, Counter[Any]] = {}
+    for path, author, churn in conn.execute(
+        f"""
+        SELECT p.path, a.name, SUM(f.additions + f.deletions)
+        FROM file_changes f
+        JOIN commits c ON c.id = f.commit_id
+        JOIN authors a ON a.id = c.author_id
+        JOIN paths p ON p.id = f.path_id
+        WHERE c.{time_column} >= ? GROUP BY f.path_id, c.author_id ORDER BY MIN(f.rowid)
+        """,
+        (day_from,),
+    ):
+        file_author_churn.setdefault(path, Counter())[author_key(author)] = churn
+
+    language_daily_net: dict[str, Counter[dt.date]] = {}
+    for language, day, net in conn.execute(
+        f"""
+        SELECT p.language, c.day, SUM(f.additions - f.deletions)
+        FROM file_changes f
+        JOIN commits c ON c.id = f.commit_id
+        JOIN paths p ON p.id = f.path_id
+        WHERE c.{time_column} >= ? {ignore_clause}
+        GROUP BY p.language, c.day ORDER BY MIN(f.rowid)
+        """,
+        (day_from, *ignored, *ignored),
+    ):
+        language_daily_net.setdefault(language, Counter())[dt.date.fromisoformat(day)] = net
+
+    daily = counter(f"SELECT day, COUNT(*) FROM commits WHERE {time_column} >= ? GROUP BY day ORDER BY MIN(id)")
+    return {
+        "commits": commits,
+        "contributors": contributors,
+        "additions": additions,
+        "deletions": deletions,
+        "churn": additions + deletions,
+        "files_changed": files_changed,
+        "contributor_commits": author_counter(
+            f"""
+            SELECT a.name, COUNT(*) FROM commits c JOIN authors a ON a.id = c.author_id
+            WHERE c.{time_column} >= ? GROUP BY c.author_id ORDER BY MIN(c.id)
+            """
+        ),
+        "contributor_churn": author_counter(
+            f"""
+            SELECT a.name, SUM(f.additions + f.deletions)
+            FROM file_changes f
+            JOIN commits c ON c.id = f.commit_id
+            JOIN authors a ON a.id = c.author_id
+            WHERE c.{time_column} >= ? GROUP BY c.author_id ORDER BY MIN(f.rowid)
+            """
+        ),
+        "language_churn": counter(
+            f"""
+            SELECT p.language, SUM(f.additions + f.deletions)
+            FROM file_changes f
+            JOIN commits c ON c.id = f.commit_id
+            JOIN paths p ON p.id = f.path_id
+            WHERE c.{time_column} >= ? {ignore_clause}
+            GROUP BY p.language ORDER BY MIN(f.rowid)
+            """,
+            (*ignored, *ignored),
+        ),
+        "file_churn": counter(
+            f"""
+            SELECT p.path, SUM(f.additions + f.deletions)
+            FROM file_changes f
+            JOIN commits c ON c.id = f.commit_id
+            JOIN paths p ON p.id = f.path_id
+            WHERE c.{time_column} >= ? GROUP BY f.path_id ORDER BY MIN(f.rowid)
+            """
+        ),
+        "daily_commits": Counter({dt.date.fromisoformat(day): count for day, count in daily.items()}),
+        "file_author_churn": file_author_churn,
+        "language_daily_net": language_daily_net,
+    }
+
+
+READ_STATEMENT_RE = re.compile(r"(?:\s|--[^\n]*\n?|/\*.*?\*/)*(SELECT|WITH|VALUES)\b", re.IGNORECASE | re.DOTALL)
+
+
+def execute_sql(conn: sqlite3.Connection, statement: str) -> tuple[list[str], list[tuple[Any, ...]]]:
+    """Run one read-only statement; anything but SELECT / WITH / VALUES is rejected before it reaches SQLite."""
+    if not READ_STATEMENT_RE.match(statement):
+        raise sqlite3.ProgrammingError("only SELECT statements are allowed")
+    cursor = conn.execute(statement)
+    header = [column[0] for column in cursor.description or []]
+    return header, cursor.fetchall()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Bucket UTC epoch timestamps into days, hours and weeks of one reporting timezone.
+
+Commits are stored as epoch seconds (author and committer time). Calendar buckets are
+derived here, so every committer's activity lands on the reporting timezone's calendar
+instead of their own.
+
+A UTC offset is looked up once per UTC hour and reused for every timestamp in that hour.
+The few hours that contain a DST transition are resolved per timestamp. The batch helpers
+(``day_ordinals``, ``hours``, ``day_hours``, ``week_ordinals``) are then plain integer
+arithmetic over whole lists.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import re
+from typing import Sequence
+
+EPOCH_ORDINAL = dt.date(1970, 1, 1).toordinal()
+FIXED_OFFSET_RE = re.compile(r"(?:UTC|GMT)?([+-])(\d{1,2})(?::?(\d{2}))?", re.IGNORECASE)
+
+
+def parse_timezone(name: str) -> dt.tzinfo:
+    """``UTC``, a fixed offset such as ``+05:30`` / ``UTC-3``, or an IANA name like ``Europe/Berlin``.
+
+    Raises ``ValueError`` for names that cannot be resolved.
+    """
+    name = (name or "UTC").strip()
+    if name.upper() in ("UTC", "GMT", "Z"):
+        return dt.timezone.utc
+    match = FIXED_OFFSET_RE.fullmatch(name)
+    if match:
+        sign, hours, minutes = match.groups()
+        offset = dt.timedelta(hours=int(hours), minutes=int(minutes or 0))
+        return dt.timezone(-offset if sign == "-" else offset)
+    try:
+        from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+    except ImportError as exc:  # Python < 3.9
+        raise ValueError(f"IANA timezones need Python 3.9+ ({name})") from exc
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError) as exc:
+        raise ValueError(f"unknown timezone {name!r}") from exc
+
+
+class ReportingClock:
+    def __init__(self, timezone: str = "UTC", source: str = "author") -> None:
+        self.timezone = timezone or "UTC"
+        self.tz = parse_timezone(self.timezone)
+        # Which of the two stored timestamps buckets and windows use.
+        self.source = "commit" if source == "commit" else "author"
+        self._hour_offsets: dict[int, int | None] = {}
+        self._dates: dict[int, dt.date] = {}
+
+    def pick(self, authored: int, committed: int) -> int:
+        return committed if self.source == "commit" else authored
+
+    def _exact_offset(self, ts: int) -> int:
+        offset = dt.datetime.fromtimestamp(ts, self.tz).utcoffset()
+        return int(offset.total_seconds()) if offset else 0
+
+    def offset(self, ts: int) -> int:
+        """UTC offset in seconds at ``ts``."""
+        hour = ts // 3600
+        offset = self._hour_offsets.get(hour, -1)
+        if offset == -1:
+            start = self._exact_offset(hour * 3600)
+            offset = start if start == self._exact_offset(hour * 3600 + 3599) else None
+            self._hour_offsets[hour] = offset
+        return self._exact_offset(ts) if offset is None else offset
+
+    def local_seconds(self, times: Sequence[int]) -> list[int]:
+        offset = self.offset
+        return [ts + offset(ts) for ts in times]
+
+    def day_hours(self, times: Sequence[int]) -> tuple[list[int], list[int]]:
+        """Day ordinals and local hours of day from a single offset pass."""
+        local = self.local_seconds(times)
+        return [seconds // 86400 + EPOCH_ORDINAL for seconds in local], [seconds % 86400 // 3600 for seconds in local]
+
+    def day_ordinals(self, times: Sequence[int]) -> list[int]:
+        return [local // 86400 + EPOCH_ORDINAL for local in self.local_seconds(times)]
+
+    def hours(self, times: Sequence[int]) -> list[int]:
+        """Local hour of day (0-23)."""
+        return [local % 86400 // 3600 for local in self.local_seconds(times)]
+
+    def week_ordinals(self, times: Sequence[int]) -> list[int]:
+        """Ordinal of the Monday that starts each timestamp's local week."""
+        return [ordinal - (ordinal - 1) % 7 for ordinal in self.day_ordinals(times)]
+
+    def dates(self, times: Sequence[int]) -> list[dt.date]:
+        cache = self._dates
+        dates = []
+        for ordinal in self.day_ordinals(times):
+            day = cache.get(ordinal)
+            if day is None:
+                day = cache[ordinal] = dt.date.fromordinal(ordinal)
+            dates.append(day)
+        return dates
+
+    def date(self, ts: int) -> dt.date:
+        return self.dates((ts,))[0]
+
+    def midnight(self, day: dt.date) -> int:
+        """Epoch seconds at the start of ``day`` in the reporting timezone."""
+        naive = (day.toordinal() - EPOCH_ORDINAL) * 86400
+        # The offset at local midnight equals the offset at (naive - offset) except across a transition.
+        return naive - self.offset(naive - self.offset(naive))
+
+    @property
+    def fingerprint(self) -> str:
+        return f"{self.timezone}/{self.source}"
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""Per-timeframe totals that can be updated one commit at a time.
+
+A full run summarizes every window from the whole history and persists the resulting
+counters (keyed by author name, path, language, ISO day or week, or punchcard slot). The
+hook folds only the new commits into them. Windows with a start (``90d``) also fold out
+the commits that have aged past it.
+
+Counters of those bounded windows keep a row count per key next to the value. A key is
+then dropped exactly when its last row leaves the window, even if its value is 0 (a
+binary file churns nothing but still counts as changed).
+
+The DIRECTORY / OWNERSHIP rollups are kept the same way, per configured depth: author
+churn per directory row (``directory_authors:<depth>``) and how many files are in it
+(``directory_files:<depth>``), so the hook never rebuilds a trie over every path.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+COUNTERS = (
+    "contributor_commits",
+    "contributor_churn",
+    "language_churn",
+    "file_churn",
+    "daily_commits",
+    "weekly_additions",
+    "weekly_deletions",
+    "punchcard",
+)
+NESTED_COUNTERS = ("file_author_churn", "language_daily_net", "author_weekly_churn")
+
+
+def empty_counters() -> dict[str, dict[str, Any]]:
+    return {name: {} for name in (*COUNTERS, *NESTED_COUNTERS)}
+
+
+def directory_group(filename: str, depth: int) -> str:
+    """The directory row ``filename`` rolls up into at ``depth`` (``./`` for top-level files)."""
+    directories = filename.split("/")[:-1][:depth]
+    return "/".join(directories) + "/" if directories else "./"
+
+
+@dataclass
+class WindowTotals:
+    # Epoch second the window starts at; None for all history, which only ever grows.
+    start: int | None = None
+    commits: int = 0
+    additions: int = 0
+    deletions: int = 0
+    values: dict[str, dict[str, Any]] = field(default_factory=empty_counters)
+    # Rows behind each entry of ``values``, same shape; bounded windows only.
+    rows: dict[str, dict[str, Any]] | None = None
+    # Depths whose directory rollups are kept alongside the counters.
+    depths: list[int] = field(default_factory=list)
+    # ``file_author_churn`` is the largest counter and only needed to re-roll restricted paths.
+    file_authors: bool = True
+
+    def __post_init__(self) -> None:
+        if self.start is not None and self.rows is None:
+            self.rows = empty_counters()
+        for depth in self.depths:
+            for name in (f"directory_authors:{depth}", f"directory_files:{depth}"):
+                self.values.setdefault(name, {})
+                if self.rows is not None:
+                    self.rows.setdefault(name, {})
+
+    def add_commit(self, author: str, day: str, slot: str, sign: int = 1) -> None:
+        """Count one commit by ``author`` on ``day`` in punchcard ``slot`` (``weekday * 24 + hour``)."""
+        self.commits += sign
+        self._bump("contributor_commits", author, 1, sign)
+        self._bump("daily_commits", day, 1, sign)
+        self._bump("punchcard", slot, 1, sign)
+
+    def add_change(
+        self,
+        author: str,
+        day: str,
+        week: str,
+        filename: str,
+        language: str | None,
+        additions: int,
+        deletions: int,
+        sign: int = 1,
+    ) -> None:
+        """Count one file change; ``language`` is None when the path is ignored for language totals."""
+        churn = additions + deletions
+        self.additions += sign * additions
+        self.deletions += sign * deletions
+        self._bump("contributor_churn", author, churn, sign)
+        present = filename in self.values["file_churn"]
+        self._bump("file_churn", filename, churn, sign)
+        # +1 when the file just entered the window, -1 when its last row just left.
+        moved = (filename in self.values["file_churn"]) - present
+        if self.file_authors:
+            self._bump_nested("file_author_churn", filename, author, churn, sign)
+        for depth in self.depths:
+            group = directory_group(filename, depth)
+            self._bump_nested(f"directory_authors:{depth}", group, author, churn, sign)
+            if moved:
+                files = self.values[f"directory_files:{depth}"]
+                files[group] = files.get(group, 0) + moved
+                if not files[group]:
+                    del files[group]
+        if language is not None:
+            self._bump("language_churn", language, churn, sign)
+            self._bump_nested("language_daily_net", language, day, additions - deletions, sign)
+        self._bump("weekly_additions", week, additions, sign)
+        self._bump("weekly_deletions", week, deletions, sign)
+        self._bump_nested("author_weekly_churn", author, week, churn, sign)
+
+    def roll_up_directories(self, file_authors: dict[str, dict[str, int]]) -> None:
+        """Rebuild the directory rollups from per-file author churn (all-history totals taken from a summary)."""
+        for depth in self.depths:
+            group_authors: dict[str, dict[str, int]] = {}
+            group_files: dict[str, int] = {}
+            for filename, authors in file_authors.items():
+                group = directory_group(filename, depth)
+                group_files[group] = group_files.get(group, 0) + 1
+                merged = group_authors.setdefault(group, {})
+                for author, churn in authors.items():
+                    merged[author] = merged.get(author, 0) + churn
+            self.values[f"directory_authors:{depth}"] = group_authors
+            self.values[f"directory_files:{depth}"] = group_files
+
+    def _bump(self, name: str, key: str, amount: int, sign: int) -> None:
+        values = self.values[name]
+        if self.rows is None:
+            values[key] = values.get(key, 0) + sign * amount
+            return
+        rows = self.rows[name]
+        count = rows.get(key, 0) + sign
+        if count > 0:
+            rows[key] = count
+            values[key] = values.get(key, 0) + sign * amount
+        else:
+            rows.pop(key, None)
+            values.pop(key, None)
+
+    def _bump_nested(self, name: str, outer: str, inner: str, amount: int, sign: int) -> None:
+        values = self.values[name].setdefault(outer, {})
+        if self.rows is None:
+            values[inner] = values.get(inner, 0) + sign * amount
+            return
+        rows = self.rows[name].setdefault(outer, {})
+        count = rows.get(inner, 0) + sign
+        if count > 0:
+            rows[inner] = count
+            values[inner] = values.get(inner, 0) + sign * amount
+            return
+        rows.pop(inner, None)
+        values.pop(inner, None)
+        if not rows:
+            del self.rows[name][outer]
+            del self.values[name][outer]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "start": self.start,
+            "commits": self.commits,
+            "additions": self.additions,
+            "deletions": self.deletions,
+            "values": self.values,
+            "rows": self.rows,
+            "depths": self.depths,
+            "file_authors": self.file_authors,
+        }
+
+    @classmethod
+    def from_dict(cls, payload: dict[str, Any]) -> WindowTotals:
+        return cls(
+            start=payload.get("start"),
+            commits=int(payload.get("commits", 0)),
+            additions=int(payload.get("additions", 0)),
+            deletions=int(payload.get("deletions", 0)),
+            values={**empty_counters(), **payload.get("values", {})},
+            rows={**empty_counters(), **payload["rows"]} if payload.get("rows") is not None else None,
+            depths=[int(depth) for depth in payload.get("depths", [])],
+            file_authors=bool(payload.get("file_authors", True)),
+        )
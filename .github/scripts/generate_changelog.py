@@ -7,6 +7,7 @@ import datetime as dt
 import subprocess
 from collections import Counter, defaultdict
 from dataclasses import dataclass
+from typing import Callable
 
 
 @dataclass
@@ -18,9 +19,10 @@ class CommitEntry:
     category: str
 
 
-def _run_git(args: list[str]) -> str:
+def _run_git(args: list[str], git_dir: str | None = None) -> str:
+    command = ["git", f"--git-dir={git_dir}", *args] if git_dir else ["git", *args]
     result = subprocess.run(
-        ["git", *args],
+        command,
         capture_output=True,
         text=True,
         check=False,
@@ -30,7 +32,7 @@ def _run_git(args: list[str]) -> str:
     return result.stdout
 
 
-def _categorize(subject: str) -> str:
+def categorize_subject(subject: str) -> str:
     lowered = subject.strip().lower()
 
     if lowered.startswith(("feat:", "feature:", "add:")):
@@ -58,38 +60,57 @@ def _strip_prefix(subject: str) -> str:
     return subject.split(":", 1)[1].strip() if ":" in subject else subject.strip()
 
 
-def collect_commits(max_entries: int = 80, max_days: int = 45) -> list[CommitEntry]:
+def collect_commits(
+    max_entries: int = 80,
+    max_days: int = 45,
+    git_dir: str | None = None,
+    mailmap: bool = True,
+    resolve_author: Callable[[str, str], str] | None = None,
+    skip_commit: Callable[[str, str, str], bool] | None = None,
+) -> list[CommitEntry]:
+    """Recent commits; ``resolve_author(name, email)`` may map raw identities to display names.
+
+    Commits for which ``skip_commit(name, email, subject)`` is true (bots) are left out
+    before ``max_entries`` is applied, so they never take the place of human commits.
+    """
+    ident = "%aN|%aE" if mailmap else "%an|%ae"
     since_date = (dt.datetime.utcnow() - dt.timedelta(days=max_days)).strftime("%Y-%m-%d")
     args = [
         "log",
         f"--since={since_date}",
-        f"--max-count={max_entries}",
         "--date=short",
-        "--pretty=format:%ad|%h|%an|%s",
+        f"--pretty=format:%ad|%h|{ident}|%s",
         "--no-merges",
     ]
-    output = _run_git(args)
+    if skip_commit is None:
+        # Nothing is filtered out afterwards, so git can stop at the cap.
+        args.append(f"--max-count={max_entries}")
+    output = _run_git(args, git_dir=git_dir)
 
     entries: list[CommitEntry] = []
     for line in output.splitlines():
-        parts = line.split("|", 3)
-        if len(parts) != 4:
+        parts = line.split("|", 4)
+        if len(parts) != 5:
             continue
-        date_text, short_hash, author, subject = parts
+        date_text, short_hash, author, email, subject = parts
         try:
             commit_date = dt.datetime.strptime(date_text, "%Y-%m-%d").date()
         except ValueError:
             continue
+        if skip_commit and skip_commit(author, email, subject):
+            continue
 
         entries.append(
             CommitEntry(
                 date=commit_date,
                 short_hash=short_hash,
-                author=author,
+                author=resolve_author(author, email) if resolve_author else author,
                 subject=subject,
-                category=_categorize(subject),
+                category=categorize_subject(subject),
             )
         )
+        if len(entries) >= max_entries:
+            break
 
     return entries
 
@@ -99,8 +120,19 @@ def build_changelog_markdown(
     max_days: int = 45,
     max_per_day: int = 8,
     include_authors: bool = True,
+    git_dir: str | None = None,
+    mailmap: bool = True,
+    resolve_author: Callable[[str, str], str] | None = None,
+    skip_commit: Callable[[str, str, str], bool] | None = None,
 ) -> str:
-    entries = collect_commits(max_entries=max_entries, max_days=max_days)
+    entries = collect_commits(
+        max_entries=max_entries,
+        max_days=max_days,
+        git_dir=git_dir,
+        mailmap=mailmap,
+        resolve_author=resolve_author,
+        skip_commit=skip_commit,
+    )
     generated = dt.datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC")
 
     if not entries:
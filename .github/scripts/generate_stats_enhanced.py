@@ -8,25 +8,113 @@ This script updates existing README block markers in-place:
 - <!-- STATS BREAKDOWN START:LANGUAGE --> ... <!-- STATS BREAKDOWN END:LANGUAGE -->
 - <!-- STATS BREAKDOWN START:CHANGELOG --> ... <!-- STATS BREAKDOWN END:CHANGELOG -->
 
+Opt-in sections (rendered when listed in ``sections.include`` or when their marker exists):
+- <!-- STATS BREAKDOWN START:SCOPES --> ... per-directory scopes from the ``scopes`` config
+- <!-- STATS BREAKDOWN START:LANGUAGE_GROWTH --> ... cumulative net lines per language over time
+- <!-- STATS BREAKDOWN START:DIRECTORY --> ... churn rolled up to ``directories.depth``
+- <!-- STATS BREAKDOWN START:OWNERSHIP --> ... top-author share and bus factor per directory
+- <!-- STATS BREAKDOWN START:HOTSPOTS --> ... recent churn weighted by complexity at HEAD
+- <!-- STATS BREAKDOWN START:COUPLING --> ... file pairs that are usually changed together
+- <!-- STATS BREAKDOWN START:SURVIVING --> ... blame-based share of the lines at HEAD
+- <!-- STATS BREAKDOWN START:ACTIVITY --> ... weekday x hour punchcard and 53-week calendar per window
+- <!-- STATS BREAKDOWN START:CODE_FREQUENCY --> ... weekly additions vs deletions per window
+- <!-- STATS BREAKDOWN START:CONTRIBUTOR_ACTIVITY --> ... top contributors' weekly churn, stacked, per window
+- <!-- STATS BREAKDOWN START:COHORTS --> ... new contributors per month and their 3/6/12-month retention
+
 It intentionally does NOT remove markers or the Analytics Config block so future runs
 remain template-compatible.
+
+Bare mirrors are supported without a checkout: pass ``--git-dir`` to point git at the
+repository, ``--readme-ref`` to read the template blob from a ref (``HEAD:README.md`` by
+default when ``--git-dir`` is given) and ``--output-dir`` to choose where README.md and
+``stats/`` are written.
+
+``daemon`` keeps the parsed history in memory, ingests only new commits when refs move and
+serves the overview, language, commit and pulse data as JSON over HTTP. ``hook`` is the
+post-commit/post-merge entry point: it appends only the new commits to the persisted index
+(kept under ``<git-dir>/analytics``), folds them into the saved per-window totals and rewrites
+the text blocks without re-rendering charts.
+``query`` answers filtered aggregations (author, path prefix, language, dates, commit
+category) straight from that index. With ``--store sqlite`` the index lives in a normalized
+SQLite database instead, window summaries are computed in SQL, and ``sql`` runs ad-hoc
+statements against it.
 """
 
 from __future__ import annotations
 
+import argparse
+import bisect
 import datetime as dt
+import hashlib
 import json
+import os
 import re
+import sqlite3
 import subprocess
+import time
 from collections import Counter
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from itertools import accumulate
 from pathlib import Path
 from typing import Any
 
-from generate_changelog import build_changelog_markdown
+from analytics_blame import BLAME_CACHE_VERSION, BlameResult, blame_tree, default_workers
+from analytics_bots import AutomationTally, BotFilter, build_bot_filter
+from analytics_blobs import iter_blob_contents, load_blob_cache, measure_blobs, save_blob_cache
+from analytics_charts import ChartCache, chart_digest
+from analytics_cohorts import CohortIndex, month_index, month_label
+from analytics_coupling import CouplingCounts, count_cochanges, coupled_pairs
+from analytics_export import Table, export_tables, get_arrow_modules
+from analytics_identity import IdentityTable, build_identity_table
+from analytics_languages import (
+    LanguageClassifier,
+    build_classifier,
+    read_linguist_attributes,
+    shebang_interpreter,
+    split_extension,
+)
+from analytics_paths import PathFilter, build_path_filter
+from analytics_query import GROUP_BY_CHOICES, QueryFilters, format_query_table, run_query
+from analytics_time import ReportingClock
+from analytics_store import (
+    append_rows,
+    clear_store,
+    connect_store,
+    connect_store_readonly,
+    execute_sql,
+    get_meta,
+    iter_change_rows,
+    iter_commit_churn,
+    iter_commit_rows,
+    iter_commit_times,
+    reclassify_paths,
+    summarize_store,
+)
+from analytics_windows import WindowTotals
+from generate_changelog import build_changelog_markdown, categorize_subject
 
 README_PATH = Path("README.md")
 STATS_DIR = Path("stats")
+GIT_DIR: str | None = None
+STORE_BACKEND = "jsonl"
+STORE_PATH: Path | None = None
+DEFAULT_README_REF = "HEAD:README.md"
+INDEX_VERSION = 4
+BLOB_METRICS_VERSION = 1
+SHEBANG_CACHE_VERSION = 1
+ATTRIBUTES_CACHE_VERSION = 1
+DEFERRED_CACHE_VERSION = 2
+WINDOW_STATE_VERSION = 2
+# The subject goes last because it may itself contain "|"; {ident} is filled in by commit_format().
+COMMIT_FORMAT = "__COMMIT__|%H|{ident}|%at|%ct|%s"
+ANALYTICS_CONFIG_RE = re.compile(
+    r"<details>\s*<summary>.*?Analytics Config.*?</summary>\s*```json(.*?)```.*?</details>",
+    re.DOTALL | re.IGNORECASE,
+)
+CALENDAR_WEEKS = 53
+WEEKDAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+RENAME_BRACE_RE = re.compile(r"\{([^{}]*) => ([^{}]*)\}")
+HOOK_MARKER = "# generate_stats_enhanced.py analytics hook"
 
 DEFAULT_BLOCKS = ["PULSE", "OVERVIEW", "COMMITS", "LANGUAGE", "CHANGELOG"]
 DEFAULT_CONFIG: dict[str, Any] = {
@@ -45,10 +133,17 @@ DEFAULT_CONFIG: dict[str, Any] = {
     "languages": {
         "show_breakdown": True,
         "ignore": ["lock", "json"],
+        "snapshot": True,
+        "growth_max": 8,
+        "shebangs": True,
+        "gitattributes": True,
+        "rules": {},
     },
     "contributors": {
         "show": True,
         "max": 10,
+        "stream_top": 6,
+        "cohort_months": 12,
     },
     "changelog": {
         "show": True,
@@ -60,10 +155,87 @@ DEFAULT_CONFIG: dict[str, Any] = {
     "sections": {
         "include": DEFAULT_BLOCKS,
     },
+    "export": {
+        "enabled": True,
+        "csv": True,
+        "parquet": True,
+    },
+    "paths": {
+        "head_only": False,
+        "exclude": [],
+        "include": [],
+    },
+    "time": {
+        "timezone": "UTC",
+        "clock": "author",
+    },
+    "identities": {
+        "mailmap": True,
+        "aliases": {},
+        "domains": {},
+    },
+    "bots": {
+        "enabled": True,
+        "authors": [r"\[bot\]$", r"^dependabot", r"^renovate"],
+        "emails": [r"\[bot\]@users\.noreply\.github\.com$"],
+        "messages": [r"^Update (README|repo) analytics"],
+        "automation_row": False,
+    },
+    "scopes": {},
+    "directories": {
+        "depth": 2,
+        "max": 15,
+    },
+    "ownership": {
+        "depth": 2,
+        "max": 15,
+        "coverage": [0.5, 0.8],
+        "half_life_days": None,
+    },
+    "hotspots": {
+        "window": None,
+        "metric": "complexity",
+        "max": 15,
+        "workers": 0,
+    },
+    "coupling": {
+        "window": None,
+        "max": 15,
+        "min_support": 3,
+        "min_confidence": 0.5,
+        "max_files_per_commit": 30,
+        "max_pairs": 200_000,
+    },
+    "surviving": {
+        "max": 10,
+        "workers": 0,
+        "time_budget": 60,
+        "max_file_bytes": 1_000_000,
+    },
 }
 
 _PLOT_MODULES: tuple[Any, Any] | None = None
 _PLOT_IMPORT_ATTEMPTED = False
+# Digest manifest for charts rendered through cached_chart(); loaded on first use.
+_CHART_CACHE: ChartCache | None = None
+# ls-tree output for the most recently listed commit; commits are immutable, so it never goes stale.
+_TREE_ENTRIES: dict[str, list[TreeEntry]] = {}
+# Path sets keyed by tree hash; commits that leave the tree untouched reuse the same set.
+_TREE_PATHS: dict[str, frozenset[str]] = {}
+# Looked up once per process by git_version() / repository_layout() / index_cache_dir().
+_GIT_VERSION: tuple[int, ...] | None = None
+_REPO_LAYOUTS: dict[str | None, tuple[bool, Path | None]] = {}
+_CACHE_DIRS: dict[str | None, Path] = {}
+# Rebuilt from ``languages.rules`` by configure_classifier() once the config is known.
+CLASSIFIER: LanguageClassifier = build_classifier()
+# Compiled from ``paths.exclude`` / ``paths.include`` by configure_path_filter().
+PATH_FILTER: PathFilter = build_path_filter({})
+# Author id <-> name table; rebuilt from ``identities`` by configure_identities() before any parsing.
+IDENTITIES: IdentityTable = build_identity_table({})
+# Compiled from ``bots`` by configure_bot_filter(); matching commits never reach a Summary.
+BOT_FILTER: BotFilter = build_bot_filter({})
+# Reporting timezone and author/commit time choice from ``time``, set by configure_clock().
+CLOCK: ReportingClock = ReportingClock()
 
 
 def get_plot_modules() -> tuple[Any, Any] | None:
@@ -92,18 +264,25 @@ def get_plot_modules() -> tuple[Any, Any] | None:
 @dataclass
 class CommitMeta:
     commit: str
-    author: str
+    author: int
+    # Calendar day of ``time`` in the reporting timezone.
     date: dt.date
+    subject: str = ""
+    # UTC epoch seconds on the configured clock (author or commit time), then both raw values.
+    time: int = 0
+    authored: int = 0
+    committed: int = 0
 
 
 @dataclass
 class FileChange:
     commit: str
-    author: str
+    author: int
     date: dt.date
     filename: str
     additions: int
     deletions: int
+    time: int = 0
 
 
 @dataclass
@@ -114,16 +293,178 @@ class Summary:
     deletions: int
     churn: int
     files_changed: int
-    contributor_commits: Counter[str]
-    contributor_churn: Counter[str]
+    contributor_commits: Counter[int]
+    contributor_churn: Counter[int]
     language_churn: Counter[str]
     file_churn: Counter[str]
     daily_commits: Counter[dt.date]
+    # Compact per-path author counters; directory rollups read these instead of the rows.
+    file_author_churn: dict[str, Counter[int]] = field(default_factory=dict)
+    # Net lines (additions - deletions) per language per day; cumulative sums give growth.
+    language_daily_net: dict[str, Counter[dt.date]] = field(default_factory=dict)
+    # Commits per weekday (Mon=0) x hour, and per week x weekday over the CALENDAR_WEEKS ending today.
+    punchcard: list[list[int]] = field(default_factory=list)
+    calendar: list[list[int]] = field(default_factory=list)
+    calendar_start: dt.date | None = None
+    # Lines added / deleted per week, keyed by the Monday that starts the week.
+    weekly_additions: Counter[dt.date] = field(default_factory=Counter)
+    weekly_deletions: Counter[dt.date] = field(default_factory=Counter)
+    # Sparse author x week churn matrix: one counter per author over the weeks they were active.
+    author_weekly_churn: dict[int, Counter[dt.date]] = field(default_factory=dict)
+    # ``directory_rows`` output per depth when carried over from persisted totals instead of a trie.
+    directories: dict[int, list[tuple[str, int, int, Counter[int]]]] = field(default_factory=dict)
+
+
+@dataclass
+class DirectoryNode:
+    """Path-trie node; subtree totals plus the share held by files directly inside it.
+
+    Authors are only tracked per node for its direct files. The trie stops at the rendered
+    depth, so a node at that depth already holds its whole subtree directly.
+    """
+
+    churn: int = 0
+    files: int = 0
+    direct_churn: int = 0
+    direct_files: int = 0
+    direct_authors: Counter[int] = field(default_factory=Counter)
+    children: dict[str, DirectoryNode] = field(default_factory=dict)
+
+
+@dataclass
+class TreeEntry:
+    path: str
+    blob: str
+    size: int
+
+
+@dataclass
+class CodeSnapshot:
+    """Lines and bytes of every text blob at HEAD, grouped by language."""
+
+    language_lines: Counter[str] = field(default_factory=Counter)
+    language_bytes: Counter[str] = field(default_factory=Counter)
+    language_files: Counter[str] = field(default_factory=Counter)
+    blobs_read: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "lines": self.language_lines,
+            "bytes": self.language_bytes,
+            "files": self.language_files,
+            "blobs_read": self.blobs_read,
+        }
+
+    @classmethod
+    def from_dict(cls, payload: dict[str, Any]) -> CodeSnapshot:
+        return cls(
+            Counter(payload.get("lines", {})),
+            Counter(payload.get("bytes", {})),
+            Counter(payload.get("files", {})),
+            int(payload.get("blobs_read", 0)),
+        )
+
+
+@dataclass
+class PathIndex:
+    """Inverted index from file path to change-row positions.
+
+    Paths are also kept sorted, so every path under a directory prefix is one contiguous
+    ``bisect`` range and scope lookups never rescan the change rows.
+    """
+
+    rows_by_path: dict[str, list[int]] = field(default_factory=dict)
+    sorted_paths: list[str] = field(default_factory=list)
+
+    def add_rows(self, changes: list[FileChange], start: int = 0) -> None:
+        new_paths: list[str] = []
+        for row in range(start, len(changes)):
+            filename = changes[row].filename
+            rows = self.rows_by_path.get(filename)
+            if rows is None:
+                rows = self.rows_by_path[filename] = []
+                new_paths.append(filename)
+            rows.append(row)
+
+        if len(new_paths) > 64:
+            self.sorted_paths = sorted(self.rows_by_path)
+        else:
+            for filename in new_paths:
+                bisect.insort(self.sorted_paths, filename)
+
+    def paths_with_prefix(self, prefix: str) -> list[str]:
+        start = bisect.bisect_left(self.sorted_paths, prefix)
+        matched = []
+        for filename in self.sorted_paths[start:]:
+            if not filename.startswith(prefix):
+                break
+            matched.append(filename)
+        return matched
+
+    def rows_with_prefixes(self, prefixes: list[str]) -> list[int]:
+        """Change-row positions under any prefix, in history order."""
+        rows: set[int] = set()
+        for prefix in prefixes:
+            for filename in self.paths_with_prefix(prefix):
+                rows.update(self.rows_by_path[filename])
+        return sorted(rows)
+
+
+@dataclass
+class HistoryIndex:
+    """Full parsed history kept in memory so windows can be sliced without re-running git."""
+
+    head: str
+    commits: list[CommitMeta]
+    changes: list[FileChange]
+    # Rows already written to the on-disk cache; anything after them is appended on save.
+    stored_commits: int = 0
+    stored_changes: int = 0
+    paths: PathIndex = field(default_factory=PathIndex)
+    # Commits dropped by the bot filter, reduced to per-day totals.
+    automation: AutomationTally = field(default_factory=AutomationTally)
+    # First/last month and monthly activity bitmap per author, kept in step with ``commits``.
+    cohorts: CohortIndex = field(default_factory=CohortIndex)
+    # Hook runs hold only the commits since the stored head (see ``WindowState``); saves always append.
+    partial: bool = False
+
+    def __post_init__(self) -> None:
+        self.paths.add_rows(self.changes)
+        self.cohorts.add_rows(self.commits)
 
 
-def run_git(args: list[str]) -> str:
+@dataclass
+class WindowState:
+    """Per-window totals as of ``head``, persisted so hook runs only fold in the commits since.
+
+    ``fingerprint`` covers everything the totals depend on besides the rows themselves
+    (index version, timeframes, language settings and scopes); a mismatch means a full load.
+    """
+
+    head: str
+    fingerprint: str
+    windows: dict[str, WindowTotals]
+    # Commits at or after the earliest bounded window start, oldest first, as
+    # ``[time, author, [[path, additions, deletions, language], ...]]``. Windows fold these
+    # out again once their start moves past them.
+    recent: list[list[Any]] = field(default_factory=list)
+    commit_dates: tuple[str, str] = ("n/a", "n/a")
+    automation: AutomationTally = field(default_factory=AutomationTally)
+    cohorts: CohortIndex = field(default_factory=CohortIndex)
+    # The same totals per configured scope and window, over the files under its prefixes.
+    scopes: dict[str, dict[str, WindowTotals]] = field(default_factory=dict)
+
+
+def git_command(args: list[str]) -> list[str]:
+    if GIT_DIR:
+        return ["git", f"--git-dir={GIT_DIR}", *args]
+    return ["git", *args]
+
+
+def run_git(args: list[str], input_text: str | None = None) -> str:
     result = subprocess.run(
-        ["git", *args],
+        git_command(args),
+        input=input_text,
         capture_output=True,
         text=True,
         check=False,
@@ -136,6 +477,36 @@ def run_git(args: list[str]) -> str:
     return result.stdout
 
 
+def git_succeeds(args: list[str]) -> bool:
+    result = subprocess.run(git_command(args), capture_output=True, text=True, check=False)
+    return result.returncode == 0
+
+
+def git_version() -> tuple[int, ...]:
+    """Installed git version, e.g. ``(2, 43, 0)``; ``()`` when it cannot be parsed."""
+    global _GIT_VERSION
+    if _GIT_VERSION is None:
+        match = re.search(r"(\d+)\.(\d+)(?:\.(\d+))?", run_git(["--version"]))
+        _GIT_VERSION = tuple(int(part or 0) for part in match.groups()) if match else ()
+    return _GIT_VERSION
+
+
+def repository_layout() -> tuple[bool, Path | None]:
+    """``(is_bare, work_tree_root)`` for the analysed repository, resolved once per GIT_DIR."""
+    layout = _REPO_LAYOUTS.get(GIT_DIR)
+    if layout is None:
+        bare = run_git(["rev-parse", "--is-bare-repository"]).strip() == "true"
+        top_level = None if bare else Path(run_git(["rev-parse", "--show-toplevel"]).strip())
+        layout = _REPO_LAYOUTS[GIT_DIR] = (bare, top_level)
+    return layout
+
+
+def check_attr_supported() -> bool:
+    """Bare repositories need ``check-attr --source``, which git only has since 2.40."""
+    bare, _ = repository_layout()
+    return not bare or git_version() >= (2, 40)
+
+
 def deep_merge(base: dict[str, Any], override: dict[str, Any]) -> dict[str, Any]:
     merged: dict[str, Any] = {}
 
@@ -158,11 +529,7 @@ def deep_merge(base: dict[str, Any], override: dict[str, Any]) -> dict[str, Any]
 
 
 def parse_analytics_config(readme_text: str) -> dict[str, Any]:
-    pattern = re.compile(
-        r"<details>\s*<summary>.*?Analytics Config.*?</summary>\s*```json(.*?)```.*?</details>",
-        re.DOTALL | re.IGNORECASE,
-    )
-    match = pattern.search(readme_text)
+    match = ANALYTICS_CONFIG_RE.search(readme_text)
     if not match:
         print("INFO: No Analytics Config block found. Using defaults.")
         return DEFAULT_CONFIG
@@ -203,7 +570,7 @@ def normalize_since_value(value: Any) -> str | None:
         unit = unit_match.group(2)
         if unit == "h":
             delta = dt.timedelta(hours=amount)
-            return (now - delta).strftime("%Y-%m-%d %H:%M")
+            return (now - delta).strftime("%Y-%m-%d %H:%M:%S")
         if unit == "d":
             return (now - dt.timedelta(days=amount)).strftime("%Y-%m-%d")
         if unit == "w":
@@ -217,7 +584,7 @@ def normalize_since_value(value: Any) -> str | None:
         amount = int(long_unit.group(1))
         word = long_unit.group(2)
         if word.startswith("hour"):
-            return (now - dt.timedelta(hours=amount)).strftime("%Y-%m-%d %H:%M")
+            return (now - dt.timedelta(hours=amount)).strftime("%Y-%m-%d %H:%M:%S")
         if word.startswith("day"):
             return (now - dt.timedelta(days=amount)).strftime("%Y-%m-%d")
         if word.startswith("week"):
@@ -230,30 +597,63 @@ def normalize_since_value(value: Any) -> str | None:
     return raw
 
 
-def parse_history(since_value: Any = None) -> tuple[list[CommitMeta], list[FileChange]]:
-    try:
-        since = normalize_since_value(since_value)
-    except TypeError as exc:
-        print(f"WARNING: Invalid timeframe {since_value!r}: {exc}. Using full history.")
-        since = None
+def parse_history(revision_range: str) -> tuple[list[CommitMeta], list[FileChange], AutomationTally]:
+    if PATH_FILTER.pathspecs():
+        # git log would drop commits that only touch excluded paths; diff-tree --always keeps them.
+        return parse_commits_diff_tree(revision_range)
 
     args = [
         "log",
         "--numstat",
-        "--date=short",
-        "--pretty=format:__COMMIT__|%H|%an|%ad",
+        f"--pretty=format:{commit_format()}",
         "--no-merges",
+        revision_range,
     ]
-    if since:
-        args.insert(1, f"--since={since}")
 
-    stdout = run_git(args)
+    return parse_numstat_log(run_git(args))
+
+
+def commit_format() -> str:
+    """Log format with mailmap-resolved (``%aN``/``%aE``) or raw author identity."""
+    return COMMIT_FORMAT.format(ident="%aN|%aE" if IDENTITIES.mailmap else "%an|%ae")
+
+
+def author_name(identity: int) -> str:
+    return IDENTITIES.name(identity)
+
+
+def top_counts(counter: dict[Any, int], limit: int | None = None, by_name: bool = False) -> list[tuple[Any, int]]:
+    """Largest counts first; ties go by key (author name when ``by_name``), so hook and full runs agree.
+
+    ``Counter.most_common`` breaks ties by insertion order, which differs between a history
+    scan and persisted totals.
+    """
+    if by_name:
+        return sorted(counter.items(), key=lambda item: (-item[1], author_name(item[0])))[:limit]
+    return sorted(counter.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+
+def rename_target(filename: str) -> str:
+    """Map numstat rename notation (``a/{old => new}/b`` or ``old => new``) to the new path."""
+    if " => " not in filename:
+        return filename
+    if "{" in filename:
+        path = RENAME_BRACE_RE.sub(lambda match: match.group(2), filename)
+        return path.replace("//", "/").lstrip("/")
+    return filename.split(" => ", 1)[1]
+
+
+def parse_numstat_log(stdout: str) -> tuple[list[CommitMeta], list[FileChange], AutomationTally]:
+    """Commit and change rows, with bot commits diverted into an ``AutomationTally``."""
     commits: list[CommitMeta] = []
     changes: list[FileChange] = []
+    automation = AutomationTally()
 
     current_commit = ""
-    current_author = ""
+    current_author = 0
     current_date: dt.date | None = None
+    current_time = 0
+    current_bot = ""
 
     for raw_line in stdout.splitlines():
         line = raw_line.strip()
@@ -261,15 +661,22 @@ def parse_history(since_value: Any = None) -> tuple[list[CommitMeta], list[FileC
             continue
 
         if line.startswith("__COMMIT__|"):
-            _, commit_hash, author, date_text = line.split("|", 3)
+            _, commit_hash, name, email, authored_text, committed_text, subject = line.split("|", 6)
             try:
-                commit_date = dt.datetime.strptime(date_text, "%Y-%m-%d").date()
+                authored, committed = int(authored_text), int(committed_text)
             except ValueError:
                 continue
-            commits.append(CommitMeta(commit_hash, author, commit_date))
             current_commit = commit_hash
+            current_time = CLOCK.pick(authored, committed)
+            commit_date = current_date = CLOCK.date(current_time)
+            if BOT_FILTER.is_automated(name, email, subject):
+                current_bot = name
+                automation.add(commit_date, name, commits=1)
+                continue
+            current_bot = ""
+            author = IDENTITIES.resolve(name, email)
+            commits.append(CommitMeta(commit_hash, author, commit_date, subject, current_time, authored, committed))
             current_author = author
-            current_date = commit_date
             continue
 
         if "\t" not in line or current_date is None:
@@ -279,6 +686,9 @@ def parse_history(since_value: Any = None) -> tuple[list[CommitMeta], list[FileC
         if added_raw == "-" or deleted_raw == "-":
             # Binary files have '-' placeholders.
             continue
+        filename = rename_target(filename)
+        if not PATH_FILTER.allows(filename):
+            continue
 
         try:
             additions = int(added_raw)
@@ -286,6 +696,9 @@ def parse_history(since_value: Any = None) -> tuple[list[CommitMeta], list[FileC
         except ValueError:
             continue
 
+        if current_bot:
+            automation.add(current_date, current_bot, additions, deletions)
+            continue
         changes.append(
             FileChange(
                 commit=current_commit,
@@ -294,45 +707,161 @@ def parse_history(since_value: Any = None) -> tuple[list[CommitMeta], list[FileC
                 filename=filename,
                 additions=additions,
                 deletions=deletions,
+                time=current_time,
             )
         )
 
-    return commits, changes
+    return commits, changes, automation
 
 
 def detect_language(filename: str) -> str:
-    ext = Path(filename).suffix.lower()
-    mapping = {
-        ".py": "Python",
-        ".js": "JavaScript",
-        ".jsx": "JavaScript",
-        ".ts": "TypeScript",
-        ".tsx": "TypeScript",
-        ".java": "Java",
-        ".go": "Go",
-        ".rb": "Ruby",
-        ".php": "PHP",
-        ".cs": "C#",
-        ".cpp": "C++",
-        ".c": "C",
-        ".rs": "Rust",
-        ".swift": "Swift",
-        ".kt": "Kotlin",
-        ".scala": "Scala",
-        ".html": "HTML",
-        ".css": "CSS",
-        ".scss": "SCSS",
-        ".less": "LESS",
-        ".md": "Markdown",
-        ".json": "JSON",
-        ".yml": "YAML",
-        ".yaml": "YAML",
-        ".xml": "XML",
-        ".sql": "SQL",
-        ".sh": "Shell",
-        ".dockerfile": "Dockerfile",
-    }
-    return mapping.get(ext, ext.lstrip(".").upper() if ext else "Other")
+    return CLASSIFIER.classify(filename)
+
+
+def sniff_shebangs(head: str, paths: list[str] | None = None) -> dict[str, str]:
+    """Interpreter named by the shebang of each extensionless file at ``head`` (or among ``paths``), cached per blob."""
+    if paths is None:
+        entries = [entry for entry in list_tree_entries(head) if CLASSIFIER.needs_sniffing(entry.path)]
+    else:
+        candidates = [path for path in paths if CLASSIFIER.needs_sniffing(path)]
+        entries = list_path_entries(head, candidates) if candidates else []
+    if not entries:
+        return {}
+
+    cache_path = index_cache_dir() / "shebangs.json"
+    cache = load_blob_cache(cache_path, SHEBANG_CACHE_VERSION)
+    missing = sorted({entry.blob for entry in entries if entry.blob not in cache})
+    for blob, content in iter_blob_contents(git_command([]), missing):
+        cache[blob] = shebang_interpreter(content)
+    if missing:
+        save_blob_cache(cache_path, cache, keep={entry.blob for entry in entries}, version=SHEBANG_CACHE_VERSION)
+
+    return {entry.path: cache.get(entry.blob, "") for entry in entries}
+
+
+def configure_path_filter(config: dict[str, Any]) -> None:
+    global PATH_FILTER
+    PATH_FILTER = build_path_filter(config.get("paths", {}))
+
+
+def mailmap_blob(head: str) -> str:
+    """Blob id of ``.mailmap`` at ``head`` ("" when there is none)."""
+    if not head:
+        return ""
+    result = subprocess.run(
+        git_command(["rev-parse", "--verify", "--quiet", f"{head}:.mailmap"]),
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    return result.stdout.strip() if result.returncode == 0 else ""
+
+
+def configure_identities(config: dict[str, Any], head: str) -> None:
+    global IDENTITIES
+    identities_cfg = config.get("identities", {})
+    mailmap = mailmap_blob(head) if identities_cfg.get("mailmap", True) else ""
+    IDENTITIES = build_identity_table(identities_cfg, mailmap)
+
+
+def configure_clock(config: dict[str, Any]) -> None:
+    global CLOCK
+    time_cfg = config.get("time", {})
+    try:
+        CLOCK = ReportingClock(str(time_cfg.get("timezone") or "UTC"), str(time_cfg.get("clock", "author")).lower())
+    except ValueError as exc:
+        print(f"WARNING: Invalid time.timezone ({exc}). Reporting in UTC.")
+        CLOCK = ReportingClock("UTC", str(time_cfg.get("clock", "author")).lower())
+
+
+def configure_bot_filter(config: dict[str, Any]) -> None:
+    global BOT_FILTER
+    try:
+        BOT_FILTER = build_bot_filter(config.get("bots", {}))
+    except re.error as exc:
+        print(f"WARNING: Invalid bots pattern ({exc}). Bot filtering disabled.")
+        BOT_FILTER = build_bot_filter({"enabled": False})
+
+
+def configure_classifier(config: dict[str, Any], head: str, paths: list[str] | None = None) -> None:
+    """Compile ``languages.rules`` and register shebang languages for extensionless files at HEAD.
+
+    With ``paths`` (hook runs) only those files are sniffed instead of the whole tree.
+    """
+    global CLASSIFIER
+    languages_cfg = config.get("languages", {})
+    CLASSIFIER = build_classifier(languages_cfg.get("rules"))
+    if head and languages_cfg.get("shebangs", True):
+        CLASSIFIER.add_shebangs(sniff_shebangs(head, paths))
+
+
+def attributes_fingerprint(head: str) -> str:
+    """Hash of every attributes source check-attr would read, so cached answers stay valid."""
+    digest = hashlib.sha1()
+    bare, top_level = repository_layout()
+    tree = list_tree_entries(head) if head else []
+    attribute_files = [entry for entry in tree if entry.path.rsplit("/", 1)[-1] == ".gitattributes"]
+    if bare:
+        for entry in attribute_files:
+            digest.update(f"{entry.path}\0{entry.blob}\0".encode("utf-8"))
+    else:
+        # check-attr reads the working tree, so hash the checked-out files rather than HEAD's blobs.
+        for relative in sorted({entry.path for entry in attribute_files} | {".gitattributes"}):
+            path = top_level / relative
+            if path.is_file():
+                digest.update(relative.encode("utf-8") + b"\0" + path.read_bytes() + b"\0")
+    info_attributes = Path(run_git(["rev-parse", "--git-path", "info/attributes"]).strip() or "-")
+    if info_attributes.is_file():
+        digest.update(info_attributes.read_bytes())
+    return digest.hexdigest()
+
+
+def load_path_attributes(paths: list[str], head: str, revalidate: bool = True) -> dict[str, list[Any]]:
+    """linguist attributes for ``paths``, cached per path until an attributes file changes.
+
+    With ``revalidate=False`` (hook mode) cached answers are trusted without recomputing the
+    fingerprint; only new paths are asked, and the next full run revalidates everything.
+    """
+    cache_path = index_cache_dir() / "attributes.json"
+    cached: dict[str, Any] = {}
+    try:
+        payload = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        payload = {}
+    if not isinstance(payload, dict) or payload.get("version") != ATTRIBUTES_CACHE_VERSION:
+        payload = {}
+    fingerprint = attributes_fingerprint(head) if revalidate else str(payload.get("fingerprint", ""))
+    if payload.get("fingerprint") == fingerprint:
+        cached = payload.get("paths", {})
+
+    missing = [path for path in paths if path not in cached]
+    if missing:
+        bare, top_level = repository_layout()
+        answered = read_linguist_attributes(git_command([]), missing, source=head if bare else None, cwd=top_level)
+        if answered is None:
+            print("WARNING: git check-attr failed; .gitattributes linguist settings are ignored.")
+            return cached
+        cached.update(answered)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = cache_path.with_suffix(".tmp")
+        temp_path.write_text(
+            json.dumps(
+                {"version": ATTRIBUTES_CACHE_VERSION, "fingerprint": fingerprint, "paths": cached},
+                separators=(",", ":"),
+            ),
+            encoding="utf-8",
+        )
+        os.replace(temp_path, cache_path)
+    return cached
+
+
+def apply_gitattributes(config: dict[str, Any], index: HistoryIndex, revalidate: bool = True) -> None:
+    """Exclude linguist-generated/vendored paths and honor linguist-language for every indexed path."""
+    if not config.get("languages", {}).get("gitattributes", True) or not check_attr_supported():
+        return
+    paths = index.paths.sorted_paths
+    attributes = load_path_attributes(paths, index.head, revalidate=revalidate)
+    CLASSIFIER.apply_attributes({path: attributes[path] for path in paths if path in attributes})
 
 
 def normalize_ignore_values(values: list[Any]) -> set[str]:
@@ -345,16 +874,78 @@ def normalize_ignore_values(values: list[Any]) -> set[str]:
 
 
 def should_ignore(filename: str, language: str, ignored_values: set[str]) -> bool:
-    ext = Path(filename).suffix.lower().lstrip(".")
-    return language.lower() in ignored_values or ext in ignored_values
+    ext = split_extension(filename)[1].lstrip(".")
+    return language.lower() in ignored_values or ext in ignored_values or filename in CLASSIFIER.excluded
+
+
+def calendar_first_monday() -> int:
+    """Day ordinal of the Monday that starts the CALENDAR_WEEKS ending today."""
+    today = CLOCK.day_ordinals([int(time.time())])[0]
+    return today - (today - 1) % 7 - 7 * (CALENDAR_WEEKS - 1)
+
+
+def activity_matrices(times: list[int]) -> tuple[list[list[int]], list[list[int]], dt.date]:
+    """Weekday x hour punchcard and week x weekday calendar from one bucketing pass over commit times."""
+    first_monday = calendar_first_monday()
+    punchcard = [[0] * 24 for _ in range(7)]
+    calendar = [[0] * 7 for _ in range(CALENDAR_WEEKS)]
+    ordinals, hours = CLOCK.day_hours(times)
+    for ordinal, hour in zip(ordinals, hours):
+        weekday = (ordinal - 1) % 7
+        punchcard[weekday][hour] += 1
+        offset = ordinal - first_monday
+        if 0 <= offset < CALENDAR_WEEKS * 7:
+            calendar[offset // 7][weekday] += 1
+    return punchcard, calendar, dt.date.fromordinal(first_monday)
+
+
+def calendar_matrix(daily_commits: Counter[dt.date]) -> tuple[list[list[int]], dt.date]:
+    """The week x weekday calendar from per-day commit counts (same grid as ``activity_matrices``)."""
+    first_monday = calendar_first_monday()
+    calendar = [[0] * 7 for _ in range(CALENDAR_WEEKS)]
+    for day, count in daily_commits.items():
+        offset = day.toordinal() - first_monday
+        if 0 <= offset < CALENDAR_WEEKS * 7:
+            calendar[offset // 7][offset % 7] += count
+    return calendar, dt.date.fromordinal(first_monday)
+
+
+def weekly_aggregates(
+    times: list[int], authors: list[int], additions: list[int], deletions: list[int]
+) -> tuple[Counter[dt.date], Counter[dt.date], dict[int, Counter[dt.date]]]:
+    """Weekly additions, deletions and per-author churn, binned from one week-ordinal pass over ``times``."""
+    added: Counter[int] = Counter()
+    deleted: Counter[int] = Counter()
+    author_weeks: dict[int, Counter[int]] = {}
+    for week, author, add, delete in zip(CLOCK.week_ordinals(times), authors, additions, deletions):
+        added[week] += add
+        deleted[week] += delete
+        weeks = author_weeks.get(author)
+        if weeks is None:
+            weeks = author_weeks[author] = Counter()
+        weeks[week] += add + delete
+    week_dates = {week: dt.date.fromordinal(week) for week in added}
+    return (
+        Counter({week_dates[week]: value for week, value in added.items()}),
+        Counter({week_dates[week]: value for week, value in deleted.items()}),
+        {
+            author: Counter({week_dates[week]: churn for week, churn in weeks.items()})
+            for author, weeks in author_weeks.items()
+        },
+    )
 
 
 def summarize(commits: list[CommitMeta], changes: list[FileChange], ignored_values: set[str]) -> Summary:
     contributor_commits = Counter(commit.author for commit in commits)
-    contributor_churn: Counter[str] = Counter()
+    contributor_churn: Counter[int] = Counter()
     language_churn: Counter[str] = Counter()
     file_churn: Counter[str] = Counter()
+    file_author_churn: dict[str, Counter[int]] = {}
+    language_daily_net: dict[str, Counter[dt.date]] = {}
     daily_commits = Counter(commit.date for commit in commits)
+    punchcard, calendar, calendar_start = activity_matrices([commit.time for commit in commits])
+    # Language (None when ignored) per distinct path, so rows only cost a dict lookup.
+    path_languages: dict[str, str | None] = {}
 
     additions = 0
     deletions = 0
@@ -365,12 +956,32 @@ def summarize(commits: list[CommitMeta], changes: list[FileChange], ignored_valu
         deletions += change.deletions
         contributor_churn[change.author] += churn
         file_churn[change.filename] += churn
+        file_authors = file_author_churn.get(change.filename)
+        if file_authors is None:
+            file_authors = file_author_churn[change.filename] = Counter()
+        file_authors[change.author] += churn
 
-        language = detect_language(change.filename)
-        if not should_ignore(change.filename, language, ignored_values):
+        if change.filename in path_languages:
+            language = path_languages[change.filename]
+        else:
+            language = detect_language(change.filename)
+            if should_ignore(change.filename, language, ignored_values):
+                language = None
+            path_languages[change.filename] = language
+        if language is not None:
             language_churn[language] += churn
+            language_net = language_daily_net.get(language)
+            if language_net is None:
+                language_net = language_daily_net[language] = Counter()
+            language_net[change.date] += change.additions - change.deletions
 
     changed_files = {change.filename for change in changes}
+    weekly_additions, weekly_deletions, author_weekly_churn = weekly_aggregates(
+        [change.time for change in changes],
+        [change.author for change in changes],
+        [change.additions for change in changes],
+        [change.deletions for change in changes],
+    )
 
     return Summary(
         commits=len(commits),
@@ -384,286 +995,2331 @@ def summarize(commits: list[CommitMeta], changes: list[FileChange], ignored_valu
         language_churn=language_churn,
         file_churn=file_churn,
         daily_commits=daily_commits,
+        file_author_churn=file_author_churn,
+        language_daily_net=language_daily_net,
+        punchcard=punchcard,
+        calendar=calendar,
+        calendar_start=calendar_start,
+        weekly_additions=weekly_additions,
+        weekly_deletions=weekly_deletions,
+        author_weekly_churn=author_weekly_churn,
     )
 
 
-def slugify(label: str) -> str:
-    slug = re.sub(r"[^a-zA-Z0-9]+", "_", label.strip().lower())
-    return slug.strip("_") or "window"
+def build_directory_trie(file_authors: dict[str, Counter[int]], max_depth: int) -> DirectoryNode:
+    """Roll per-file author churn up into a directory trie, one pass over distinct filenames."""
+    root = DirectoryNode()
+    for filename, authors in file_authors.items():
+        churn = sum(authors.values())
+        directories = filename.split("/")[:-1][:max_depth]
+
+        node = root
+        path_nodes = [root]
+        for part in directories:
+            child = node.children.get(part)
+            if child is None:
+                child = node.children[part] = DirectoryNode()
+            node = child
+            path_nodes.append(node)
+
+        for ancestor in path_nodes:
+            ancestor.churn += churn
+            ancestor.files += 1
+        node.direct_churn += churn
+        node.direct_files += 1
+        node.direct_authors.update(authors)
+
+    return root
+
+
+def directory_rows(root: DirectoryNode, depth: int) -> list[tuple[str, int, int, Counter[int]]]:
+    """Partition the trie at ``depth``: whole subtrees at that depth, direct files above it."""
+    rows: list[tuple[str, int, int, Counter[int]]] = []
+
+    def walk(node: DirectoryNode, prefix: str, level: int) -> None:
+        if level == depth:
+            rows.append((prefix or "./", node.churn, node.files, node.direct_authors))
+            return
+        if node.direct_files:
+            rows.append((prefix or "./", node.direct_churn, node.direct_files, node.direct_authors))
+        for name, child in node.children.items():
+            walk(child, f"{prefix}{name}/", level + 1)
+
+    walk(root, "", 0)
+    rows.sort(key=lambda row: (-row[1], row[0]))
+    return rows
+
+
+def summary_directory_rows(summary: Summary, depth: int) -> list[tuple[str, int, int, Counter[int]]]:
+    rows = summary.directories.get(depth)
+    if rows is None:
+        rows = directory_rows(build_directory_trie(summary.file_author_churn, depth), depth)
+    return rows
+
+
+def decayed_file_authors(
+    changes: list[FileChange],
+    start: int | None,
+    half_life_days: float,
+    today: dt.date,
+) -> dict[str, Counter[int]]:
+    """Per-path author churn where each change is weighted ``0.5 ** (age / half_life)``."""
+    weights: dict[dt.date, float] = {}
+    file_authors: dict[str, Counter[int]] = {}
+    for change in changes:
+        if start is not None and change.time < start:
+            continue
+        weight = weights.get(change.date)
+        if weight is None:
+            age = max((today - change.date).days, 0)
+            weight = weights[change.date] = 0.5 ** (age / half_life_days)
+        authors = file_authors.get(change.filename)
+        if authors is None:
+            authors = file_authors[change.filename] = Counter()
+        authors[change.author] += (change.additions + change.deletions) * weight
+    return file_authors
+
+
+def bus_factor(authors: Counter[int], coverage: float) -> int:
+    """Minimum number of authors whose combined churn reaches ``coverage`` of the total."""
+    total = sum(authors.values())
+    if total <= 0:
+        return 0
+    covered = 0.0
+    for count, (_, churn) in enumerate(authors.most_common(), start=1):
+        covered += churn
+        if covered >= total * coverage:
+            return count
+    return len(authors)
+
+
+def read_readme_template(readme_ref: str | None) -> str:
+    """Read the README template from a git blob (``<rev>:<path>``) or from README_PATH."""
+    if readme_ref:
+        text = run_git(["cat-file", "blob", readme_ref])
+        if text:
+            return text
+        if not README_PATH.exists():
+            raise SystemExit(f"ERROR: Could not read README template from {readme_ref!r}.")
+        print(f"WARNING: Could not read {readme_ref!r}; falling back to {README_PATH}.")
 
+    return README_PATH.read_text(encoding="utf-8")
 
-def compute_rolling(values: list[int], window: int) -> list[float]:
-    out: list[float] = []
-    for idx in range(len(values)):
-        start = max(0, idx - window + 1)
-        segment = values[start : idx + 1]
-        out.append(sum(segment) / len(segment))
-    return out
 
+def readme_link(path: Path) -> str:
+    """Return a chart path relative to the README being written, for markdown links."""
+    return Path(os.path.relpath(path, README_PATH.parent)).as_posix()
 
-def figure_size(graph_cfg: dict[str, Any], default_width: float, default_height: float) -> tuple[float, float]:
-    width = graph_cfg.get("width", default_width)
-    height = graph_cfg.get("height", default_height)
 
-    try:
-        width_value = float(width)
-    except (TypeError, ValueError):
-        width_value = default_width
+def resolve_head() -> str:
+    return run_git(["rev-parse", "--verify", "--quiet", "HEAD"]).strip()
 
-    try:
-        height_value = float(height)
-    except (TypeError, ValueError):
-        height_value = default_height
 
-    # If values look like pixels, normalize to inches for matplotlib.
-    if width_value > 50:
-        width_value = width_value / 100
-    if height_value > 50:
-        height_value = height_value / 100
+def build_history_index() -> HistoryIndex:
+    head = resolve_head()
+    if not head:
+        return HistoryIndex(head="", commits=[], changes=[])
 
-    return max(width_value, 5.5), max(height_value, 2.6)
+    commits, changes, automation = parse_history(revision_range=head)
+    return HistoryIndex(head=head, commits=commits, changes=changes, automation=automation)
 
 
-def build_daily_series(daily_counter: Counter[dt.date]) -> tuple[list[dt.date], list[int]]:
-    if not daily_counter:
-        return [], []
+def parse_commits_diff_tree(revision_range: str) -> tuple[list[CommitMeta], list[FileChange], AutomationTally]:
+    """Parse new commits with one ``git diff-tree --stdin`` call (cheaper than ``git log``)."""
+    hashes = run_git(["rev-list", "--no-merges", revision_range])
+    if not hashes.strip():
+        return [], [], AutomationTally()
 
-    start_date = min(daily_counter)
-    end_date = max(daily_counter)
-    days = []
-    counts = []
+    stdout = run_git(
+        [
+            "diff-tree",
+            "--stdin",
+            "-r",
+            "-M",
+            "--root",
+            "--numstat",
+            "--always",
+            f"--pretty=format:{commit_format()}",
+            *(["--", *PATH_FILTER.pathspecs()] if PATH_FILTER.pathspecs() else []),
+        ],
+        input_text=hashes,
+    )
+    return parse_numstat_log(stdout)
 
-    cursor = start_date
-    while cursor <= end_date:
-        days.append(cursor)
-        counts.append(daily_counter.get(cursor, 0))
-        cursor += dt.timedelta(days=1)
 
-    return days, counts
+def update_history_index(index: HistoryIndex, use_diff_tree: bool = False) -> int:
+    """Ingest commits added since ``index.head``; returns how many commits were added.
 
+    When the previous head is no longer an ancestor (force-push, reset), the index is
+    rebuilt from scratch instead.
+    """
+    head = resolve_head()
+    if head == index.head:
+        return 0
 
-def plot_commit_activity(label: str, summary: Summary, graph_cfg: dict[str, Any]) -> Path | None:
-    if not summary.daily_commits:
-        return None
+    if index.head and head and git_succeeds(["merge-base", "--is-ancestor", index.head, head]):
+        revision_range = f"{index.head}..{head}"
+        if use_diff_tree:
+            commits, changes, automation = parse_commits_diff_tree(revision_range)
+        else:
+            commits, changes, automation = parse_history(revision_range=revision_range)
+        first_new_row = len(index.changes)
+        first_new_commit = len(index.commits)
+        index.commits.extend(commits)
+        index.changes.extend(changes)
+        index.automation.merge(automation)
+        index.paths.add_rows(index.changes, start=first_new_row)
+        index.cohorts.add_rows(index.commits, start=first_new_commit)
+        index.head = head
+        return len(commits)
+
+    rebuilt = build_history_index()
+    index.head, index.commits, index.changes = rebuilt.head, rebuilt.commits, rebuilt.changes
+    index.paths = rebuilt.paths
+    index.automation = rebuilt.automation
+    index.cohorts = rebuilt.cohorts
+    index.stored_commits = index.stored_changes = 0
+    return len(index.commits)
+
+
+def parse_tree_listing(listing: str) -> list[TreeEntry]:
+    """Blob entries of ``ls-tree -r -l -z`` output (submodules and symlinks skipped)."""
+    entries: list[TreeEntry] = []
+    for record in listing.split("\0"):
+        if not record:
+            continue
+        info, _, path = record.partition("\t")
+        mode, object_type, blob, size = info.split()
+        if object_type != "blob" or mode == "120000" or not PATH_FILTER.allows(path):
+            continue
+        entries.append(TreeEntry(path=path, blob=blob, size=int(size)))
+    return entries
 
-    modules = get_plot_modules()
-    if modules is None:
-        return None
-    mdates, plt = modules
 
-    days, counts = build_daily_series(summary.daily_commits)
-    rolling = compute_rolling(counts, window=7)
+def list_tree_entries(rev: str) -> list[TreeEntry]:
+    """Blobs reachable from ``rev`` with their sizes (submodules and symlinks skipped)."""
+    if rev in _TREE_ENTRIES:
+        return _TREE_ENTRIES[rev]
 
-    fig_w, fig_h = figure_size(graph_cfg, default_width=8.2, default_height=3.2)
-    fig, ax = plt.subplots(figsize=(fig_w, fig_h))
+    entries = parse_tree_listing(run_git(["ls-tree", "-r", "-l", "-z", rev]))
+    _TREE_ENTRIES.clear()
+    _TREE_ENTRIES[rev] = entries
+    return entries
 
-    base_color = graph_cfg.get("color", "#4e79a7")
-    ax.bar(days, counts, color=base_color, alpha=0.35, label="Daily commits")
-    ax.plot(days, rolling, color="#e15759", linewidth=2.0, label="7-day rolling avg")
 
-    ax.set_title(f"Commit Activity - {label}")
-    ax.set_ylabel("Commits")
-    ax.grid(True, axis="y", linestyle="--", alpha=0.25)
-    ax.legend(loc="upper right")
+def list_path_entries(rev: str, paths: list[str]) -> list[TreeEntry]:
+    """Like ``list_tree_entries`` for just ``paths``; those no longer in ``rev`` are left out."""
+    return parse_tree_listing(run_git(["--literal-pathspecs", "ls-tree", "-r", "-l", "-z", "--full-tree", rev, "--", *paths]))
 
-    locator = mdates.AutoDateLocator(minticks=4, maxticks=8)
-    formatter = mdates.ConciseDateFormatter(locator)
-    ax.xaxis.set_major_locator(locator)
-    ax.xaxis.set_major_formatter(formatter)
 
-    fig.tight_layout()
-    output = STATS_DIR / f"commits_{slugify(label)}.png"
-    fig.savefig(output, dpi=160)
-    plt.close(fig)
-    return output
+def head_paths(head: str) -> frozenset[str]:
+    """Every path in ``head``'s tree, listed once per distinct tree hash."""
+    tree = run_git(["rev-parse", f"{head}^{{tree}}"]).strip()
+    paths = _TREE_PATHS.get(tree)
+    if paths is None:
+        listing = run_git(["ls-tree", "-r", "--name-only", "-z", tree])
+        paths = frozenset(path for path in listing.split("\0") if path and PATH_FILTER.allows(path))
+        _TREE_PATHS.clear()
+        _TREE_PATHS[tree] = paths
+    return paths
 
 
-def plot_language_breakdown(label: str, summary: Summary) -> Path | None:
-    if not summary.language_churn:
-        return None
+def restrict_to_paths(summary: Summary, paths: frozenset[str]) -> None:
+    """Drop file-level entries for paths outside ``paths`` (e.g. files deleted before HEAD)."""
+    summary.file_churn = Counter({name: churn for name, churn in summary.file_churn.items() if name in paths})
+    summary.file_author_churn = {
+        name: authors for name, authors in summary.file_author_churn.items() if name in paths
+    }
+    summary.files_changed = len(summary.file_churn)
+    # Persisted rollups cover every path, so rebuild them from the restricted files.
+    summary.directories = {}
+
+
+def load_blob_metrics(
+    blobs: set[str],
+    tree_blobs: set[str],
+    workers: int,
+) -> tuple[dict[str, list[int] | None], int]:
+    """``[lines, complexity]`` per blob (None for binaries); returns the metrics and how many blobs were read.
+
+    Only blobs missing from ``<git-dir>/analytics/blob_metrics.json`` are read. The cache
+    keeps every blob of the current tree, so the snapshot and hotspot passes share it.
+    """
+    cache_path = index_cache_dir() / "blob_metrics.json"
+    cache = load_blob_cache(cache_path, BLOB_METRICS_VERSION)
+    missing = sorted(blob for blob in blobs if blob not in cache)
+    for blob, metrics in measure_blobs(git_command([]), missing, workers):
+        cache[blob] = metrics
+    if missing:
+        save_blob_cache(cache_path, cache, keep=tree_blobs, version=BLOB_METRICS_VERSION)
+    return cache, len(missing)
+
+
+def build_code_snapshot(head: str, ignored_values: set[str]) -> CodeSnapshot:
+    """Count LOC per language at ``head``; only blobs missing from the cache are read."""
+    tree = list_tree_entries(head)
+    entries = []
+    for entry in tree:
+        language = detect_language(entry.path)
+        if not should_ignore(entry.path, language, ignored_values):
+            entries.append((entry, language))
+
+    metrics, blobs_read = load_blob_metrics(
+        {entry.blob for entry, _ in entries},
+        tree_blobs={entry.blob for entry in tree},
+        workers=default_workers(None),
+    )
+    snapshot = CodeSnapshot(blobs_read=blobs_read)
+    for entry, language in entries:
+        blob_metrics = metrics.get(entry.blob)
+        if blob_metrics is None:
+            continue
+        snapshot.language_lines[language] += blob_metrics[0]
+        snapshot.language_bytes[language] += entry.size
+        snapshot.language_files[language] += 1
+    return snapshot
+
+
+def rank_hotspots(
+    head: str,
+    file_churn: Counter[str],
+    ignored_values: set[str],
+    metric: str,
+    workers: int,
+) -> list[tuple[str, int, int, int, int]]:
+    """``(path, churn, lines, complexity, score)`` for churned files that still exist at ``head``."""
+    tree = list_tree_entries(head)
+    blobs_by_path = {entry.path: entry.blob for entry in tree}
+    candidates = [
+        (filename, churn, blobs_by_path[filename])
+        for filename, churn in file_churn.items()
+        if churn > 0
+        and filename in blobs_by_path
+        and not should_ignore(filename, detect_language(filename), ignored_values)
+    ]
+    metrics, _ = load_blob_metrics(
+        {blob for _, _, blob in candidates},
+        tree_blobs={entry.blob for entry in tree},
+        workers=workers,
+    )
 
-    modules = get_plot_modules()
-    if modules is None:
+    hotspots = []
+    for filename, churn, blob in candidates:
+        blob_metrics = metrics.get(blob)
+        if blob_metrics is None:
+            continue
+        lines, complexity = blob_metrics
+        # Flat files (config, SQL, CSV) have no indentation; a floor of 1 lets their churn still rank.
+        weight = max(lines if metric == "lines" else complexity, 1)
+        hotspots.append((filename, churn, lines, complexity, churn * weight))
+    hotspots.sort(key=lambda row: (-row[4], -row[1], row[0]))
+    return hotspots
+
+
+def compute_surviving_lines(
+    head: str,
+    ignored_values: set[str],
+    surviving_cfg: dict[str, Any],
+) -> tuple[Counter[int], Counter[str], BlameResult, int, int]:
+    """Blame every eligible file at ``head``.
+
+    Returns author lines, language lines, run stats, and how many of the eligible files are covered.
+    """
+    max_bytes = int(surviving_cfg.get("max_file_bytes", 1_000_000))
+    entries = []
+    for entry in list_tree_entries(head):
+        language = detect_language(entry.path)
+        if entry.size > max_bytes or should_ignore(entry.path, language, ignored_values):
+            continue
+        entries.append((entry, language))
+
+    cache_path = index_cache_dir() / "blame_cache.json"
+    cache = load_blob_cache(cache_path, BLAME_CACHE_VERSION)
+    result = blame_tree(
+        [(entry.path, entry.blob) for entry, _ in entries],
+        cache,
+        git_prefix=git_command([]),
+        rev=head,
+        workers=default_workers(surviving_cfg.get("workers")),
+        time_budget=float(surviving_cfg.get("time_budget", 60)),
+    )
+    save_blob_cache(cache_path, cache, keep={entry.blob for entry, _ in entries}, version=BLAME_CACHE_VERSION)
+
+    author_lines: Counter[int] = Counter()
+    language_lines: Counter[str] = Counter()
+    covered = 0
+    for entry, language in entries:
+        authors = result.blob_authors.get(entry.blob)
+        if authors is None:
+            continue
+        covered += 1
+        for ident, count in authors.items():
+            name, _, email = ident.rpartition("\t")
+            if BOT_FILTER.is_bot(name, email):
+                continue
+            author_lines[IDENTITIES.resolve(name, email)] += count
+            # Both counters skip bot lines, since language shares are divided by the author total.
+            language_lines[language] += count
+    return author_lines, language_lines, result, covered, len(entries)
+
+
+def index_cache_dir() -> Path:
+    """Cache location inside the git dir, so it is never committed and works for bare mirrors."""
+    cache_dir = _CACHE_DIRS.get(GIT_DIR)
+    if cache_dir is None:
+        common_dir = run_git(["rev-parse", "--git-common-dir"]).strip() or ".git"
+        cache_dir = _CACHE_DIRS[GIT_DIR] = Path(common_dir).resolve() / "analytics"
+    return cache_dir
+
+
+def index_version() -> str:
+    """Index format version, qualified by the path filter and identity rules so changing either forces a rebuild."""
+    version = str(INDEX_VERSION)
+    if PATH_FILTER.active:
+        version += f":{PATH_FILTER.fingerprint}"
+    if IDENTITIES.active:
+        version += f":identities={IDENTITIES.fingerprint}"
+    if BOT_FILTER.active:
+        version += f":bots={BOT_FILTER.fingerprint}"
+    if CLOCK.fingerprint != "UTC/author":
+        version += f":time={CLOCK.fingerprint}"
+    return version
+
+
+def read_index_meta(cache_dir: Path) -> dict[str, Any] | None:
+    try:
+        meta = json.loads((cache_dir / "history_meta.json").read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
         return None
-    _, plt = modules
+    if str(meta.get("version")) != index_version():
+        return None
+    return meta
 
-    ranked = summary.language_churn.most_common(8)
-    remainder = sum(summary.language_churn.values()) - sum(v for _, v in ranked)
-    if remainder > 0:
-        ranked.append(("Other", remainder))
 
-    labels = [name for name, _ in ranked]
-    values = [value for _, value in ranked]
+def sqlite_store_path(cache_dir: Path) -> Path:
+    return STORE_PATH or cache_dir / "history.sqlite"
 
-    fig, ax = plt.subplots(figsize=(6.4, 5.1))
-    wedges, texts, autotexts = ax.pie(
-        values,
-        labels=labels,
-        startangle=120,
-        autopct=lambda pct: f"{pct:.1f}%" if pct >= 3 else "",
-        wedgeprops={"width": 0.42},
-        pctdistance=0.8,
-        labeldistance=1.06,
-    )
 
-    for text in texts:
-        text.set_fontsize(8)
-    for auto in autotexts:
-        auto.set_fontsize(8)
+def cached_index_head(cache_dir: Path) -> str | None:
+    """HEAD recorded by the active store, or None when there is no usable cache."""
+    if STORE_BACKEND == "sqlite":
+        path = sqlite_store_path(cache_dir)
+        if not path.exists():
+            return None
+        conn = connect_store(path)
+        try:
+            if get_meta(conn, "version") != index_version():
+                return None
+            return get_meta(conn, "head")
+        finally:
+            conn.close()
 
-    ax.set_title(f"Language Churn Breakdown - {label}")
-    ax.axis("equal")
+    meta = read_index_meta(cache_dir)
+    return meta.get("head", "") if meta is not None else None
 
-    fig.tight_layout()
-    output = STATS_DIR / f"language_{slugify(label)}.png"
-    fig.savefig(output, dpi=160)
-    plt.close(fig)
-    return output
 
+def load_history_index(cache_dir: Path) -> HistoryIndex | None:
+    if STORE_BACKEND == "sqlite":
+        return load_sqlite_index(cache_dir)
+    return load_jsonl_index(cache_dir)
 
-def plot_contributor_churn(label: str, summary: Summary, max_contributors: int) -> Path | None:
-    if not summary.contributor_churn:
-        return None
 
-    modules = get_plot_modules()
-    if modules is None:
+def save_history_index(index: HistoryIndex, cache_dir: Path) -> None:
+    if STORE_BACKEND == "sqlite":
+        save_sqlite_index(index, cache_dir)
+    else:
+        save_jsonl_index(index, cache_dir)
+
+
+def load_sqlite_index(cache_dir: Path) -> HistoryIndex | None:
+    head = cached_index_head(cache_dir)
+    if head is None:
         return None
-    _, plt = modules
 
-    ranked = summary.contributor_churn.most_common(max_contributors)
-    names = [name for name, _ in reversed(ranked)]
-    values = [value for _, value in reversed(ranked)]
+    conn = connect_store(sqlite_store_path(cache_dir))
+    try:
+        automation = AutomationTally.from_dict(json.loads(get_meta(conn, "automation") or "{}"))
+        commits = build_commit_rows(iter_commit_rows(conn))
+        by_hash = {commit.commit: commit for commit in commits}
+        changes = []
+        for commit_hash, path, additions, deletions in iter_change_rows(conn):
+            commit = by_hash[commit_hash]
+            changes.append(
+                FileChange(commit_hash, commit.author, commit.date, path, additions, deletions, commit.time)
+            )
+    finally:
+        conn.close()
+
+    return HistoryIndex(
+        head=head,
+        commits=commits,
+        changes=changes,
+        stored_commits=len(commits),
+        stored_changes=len(changes),
+        automation=automation,
+    )
 
-    fig, ax = plt.subplots(figsize=(8.0, 4.2))
-    ax.barh(names, values, color="#76b7b2")
-    ax.set_title(f"Top Contributors by Churn - {label}")
-    ax.set_xlabel("Lines changed (+/-)")
-    ax.grid(True, axis="x", linestyle="--", alpha=0.25)
 
-    fig.tight_layout()
-    output = STATS_DIR / f"contributors_{slugify(label)}.png"
-    fig.savefig(output, dpi=160)
-    plt.close(fig)
-    return output
+def build_commit_rows(rows: Any) -> list[CommitMeta]:
+    """``CommitMeta`` from stored ``(hash, name, authored, committed, subject)`` rows, bucketed in one batch."""
+    rows = list(rows)
+    times = [CLOCK.pick(authored, committed) for _, _, authored, committed, _ in rows]
+    return [
+        CommitMeta(commit_hash, IDENTITIES.intern(name), day, subject, time_value, authored, committed)
+        for (commit_hash, name, authored, committed, subject), time_value, day in zip(rows, times, CLOCK.dates(times))
+    ]
 
 
-def build_overview_block(
-    ordered_labels: list[str],
-    summaries: dict[str, Summary],
-    primary_label: str,
-    max_contributors: int,
-) -> str:
-    lines = ["## Repository Analytics Overview", ""]
-    lines.append("| Window | Commits | Contributors | +Add | -Del | Churn | Files | Avg Churn/Commit |")
-    lines.append("|--------|---------|--------------|------|------|-------|-------|------------------|")
+def classify_path(filename: str) -> tuple[str, str, int]:
+    return detect_language(filename), split_extension(filename)[1].lstrip("."), int(filename in CLASSIFIER.excluded)
 
-    for label in ordered_labels:
-        summary = summaries[label]
-        avg_churn = (summary.churn / summary.commits) if summary.commits else 0.0
-        lines.append(
-            f"| {label} | {summary.commits} | {summary.contributors} | {summary.additions} | {summary.deletions} | "
-            f"{summary.churn} | {summary.files_changed} | {avg_churn:.1f} |"
-        )
 
-    primary = summaries[primary_label]
-    lines.extend([
-        "",
-        f"### Top Contributors ({primary_label})",
-        "",
-        "| Contributor | Commits | Churn | Share of Churn |",
-        "|-------------|---------|-------|----------------|",
-    ])
+def sync_store_classification(conn: sqlite3.Connection) -> None:
+    """Re-label stored paths when the language rules (or sniffed shebangs) changed since they were written."""
+    fingerprint = CLASSIFIER.fingerprint
+    if get_meta(conn, "classifier") != fingerprint:
+        reclassify_paths(conn, classify_path, fingerprint)
 
-    total_churn = max(primary.churn, 1)
-    for author, churn in primary.contributor_churn.most_common(max_contributors):
-        share = (churn / total_churn) * 100
-        lines.append(
-            f"| {author} | {primary.contributor_commits.get(author, 0)} | {churn} | {share:.1f}% |"
-        )
+
+def save_sqlite_index(index: HistoryIndex, cache_dir: Path) -> None:
+    """Insert rows ingested since the last save in one transaction (everything after a rebuild)."""
+    conn = connect_store(sqlite_store_path(cache_dir))
+    try:
+        append = (index.partial or index.stored_commits > 0) and get_meta(conn, "version") == index_version()
+        if not append:
+            clear_store(conn)
+        append_rows(
+            conn,
+            index.commits[index.stored_commits :] if append else index.commits,
+            index.changes[index.stored_changes :] if append else index.changes,
+            head=index.head,
+            version=index_version(),
+            classify=classify_path,
+            author_name=author_name,
+            extra_meta={"automation": json.dumps(index.automation.to_dict(), separators=(",", ":"))},
+        )
+    finally:
+        conn.close()
+
+    index.stored_commits = len(index.commits)
+    index.stored_changes = len(index.changes)
+
+
+def load_jsonl_index(cache_dir: Path) -> HistoryIndex | None:
+    """Load the persisted index; rows past the recorded size are a torn append and ignored."""
+    meta = read_index_meta(cache_dir)
+    if meta is None:
+        return None
+
+    try:
+        with (cache_dir / "history_index.jsonl").open("rb") as handle:
+            raw = handle.read(int(meta["size"]))
+    except (OSError, KeyError, ValueError):
+        return None
+
+    rows = [json.loads(line) for line in raw.decode("utf-8").splitlines()]
+    commits = build_commit_rows(row[:5] for row in rows)
+    changes: list[FileChange] = []
+    for commit, row in zip(commits, rows):
+        changes.extend(
+            FileChange(commit.commit, commit.author, commit.date, filename, additions, deletions, commit.time)
+            for filename, additions, deletions in row[5]
+        )
+
+    return HistoryIndex(
+        head=meta.get("head", ""),
+        commits=commits,
+        changes=changes,
+        stored_commits=len(commits),
+        stored_changes=len(changes),
+        automation=AutomationTally.from_dict(meta.get("automation")),
+    )
+
+
+def save_jsonl_index(index: HistoryIndex, cache_dir: Path) -> None:
+    """Append rows ingested since the last save (or rewrite after a rebuild), then commit the meta."""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    data_path = cache_dir / "history_index.jsonl"
+    meta = read_index_meta(cache_dir)
+
+    append = (index.partial or index.stored_commits > 0) and meta is not None and data_path.exists()
+    new_commits = index.commits[index.stored_commits :] if append else index.commits
+    new_changes = index.changes[index.stored_changes :] if append else index.changes
+
+    files_by_commit: dict[str, list[list[Any]]] = {}
+    for change in new_changes:
+        files_by_commit.setdefault(change.commit, []).append(
+            [change.filename, change.additions, change.deletions]
+        )
+
+    with data_path.open("r+b" if append else "wb") as handle:
+        if append:
+            handle.truncate(int(meta["size"]))
+            handle.seek(0, os.SEEK_END)
+        for commit in new_commits:
+            row = [
+                commit.commit,
+                author_name(commit.author),
+                commit.authored,
+                commit.committed,
+                commit.subject,
+                files_by_commit.get(commit.commit, []),
+            ]
+            handle.write(json.dumps(row, separators=(",", ":")).encode("utf-8") + b"\n")
+        size = handle.tell()
+
+    meta_path = cache_dir / "history_meta.json"
+    temp_path = meta_path.with_suffix(".tmp")
+    temp_path.write_text(
+        json.dumps(
+            {"version": index_version(), "head": index.head, "size": size, "automation": index.automation.to_dict()}
+        ),
+        encoding="utf-8",
+    )
+    temp_path.replace(meta_path)
+
+    index.stored_commits = len(index.commits)
+    index.stored_changes = len(index.changes)
+
+
+def load_or_build_index(use_diff_tree: bool = False) -> HistoryIndex:
+    """Return the cached index brought up to HEAD, persisting any newly ingested commits."""
+    cache_dir = index_cache_dir()
+    index = load_history_index(cache_dir)
+    if index is None:
+        index = build_history_index()
+    else:
+        update_history_index(index, use_diff_tree=use_diff_tree)
+
+    if index.stored_commits != len(index.commits) or cached_index_head(cache_dir) != index.head:
+        try:
+            save_history_index(index, cache_dir)
+        except OSError as exc:
+            print(f"WARNING: Could not persist analytics index ({exc}).")
+    return index
+
+
+def commit_date_range(index: HistoryIndex) -> tuple[str, str]:
+    if not index.commits:
+        return "n/a", "n/a"
+    dates = [commit.date for commit in index.commits]
+    return min(dates).isoformat(), max(dates).isoformat()
+
+
+def window_start_time(value: Any) -> int | None:
+    """Resolve a timeframe value to the epoch second it starts at (None = all history).
+
+    Hour-based windows are exact; day-based ones start at midnight in the reporting timezone.
+    """
+    try:
+        since = normalize_since_value(value)
+    except TypeError as exc:
+        print(f"WARNING: Invalid timeframe {value!r}: {exc}. Using full history.")
+        return None
+
+    if since is None:
+        return None
+
+    try:
+        return CLOCK.midnight(dt.datetime.strptime(since, "%Y-%m-%d").date())
+    except ValueError:
+        pass
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M"):
+        try:
+            return int(dt.datetime.strptime(since, fmt).timestamp())
+        except ValueError:
+            continue
+
+    # Relative expressions ("last monday") are resolved by git itself.
+    resolved = run_git(["rev-parse", f"--since={since}"]).strip()
+    if resolved.startswith("--max-age="):
+        return int(resolved.split("=", 1)[1])
+
+    print(f"WARNING: Could not resolve timeframe {value!r}. Using full history.")
+    return None
+
+
+def window_start_date(value: Any) -> dt.date | None:
+    """The reporting-timezone day a timeframe starts on (None = all history)."""
+    start = window_start_time(value)
+    return None if start is None else CLOCK.date(start)
+
+
+def summarize_window(index: HistoryIndex, start: int | None, ignored_values: set[str]) -> Summary:
+    if start is None:
+        return summarize(index.commits, index.changes, ignored_values)
+
+    commits = [commit for commit in index.commits if commit.time >= start]
+    changes = [change for change in index.changes if change.time >= start]
+    return summarize(commits, changes, ignored_values)
+
+
+def build_window_summaries(
+    index: HistoryIndex,
+    raw_timeframes: dict[str, Any],
+    ignored_values: set[str],
+) -> dict[str, Summary]:
+    if STORE_BACKEND == "sqlite":
+        # The store was synced by load_or_build_index, so SQL sees the same rows.
+        conn = connect_store(sqlite_store_path(index_cache_dir()))
+        time_column = "committed" if CLOCK.source == "commit" else "authored"
+        try:
+            sync_store_classification(conn)
+            summaries = {}
+            for label, value in raw_timeframes.items():
+                start = window_start_time(value)
+                summary = Summary(
+                    **summarize_store(
+                        conn, start, ignored_values, author_key=IDENTITIES.intern, time_column=time_column
+                    )
+                )
+                summary.punchcard, summary.calendar, summary.calendar_start = activity_matrices(
+                    iter_commit_times(conn, start, time_column)
+                )
+                commit_churn = iter_commit_churn(conn, start, time_column)
+                summary.weekly_additions, summary.weekly_deletions, summary.author_weekly_churn = weekly_aggregates(
+                    [row[0] for row in commit_churn],
+                    [IDENTITIES.intern(row[1]) for row in commit_churn],
+                    [row[2] for row in commit_churn],
+                    [row[3] for row in commit_churn],
+                )
+                summaries[label] = summary
+            return summaries
+        finally:
+            conn.close()
+
+    return {
+        label: summarize_window(index, window_start_time(value), ignored_values)
+        for label, value in raw_timeframes.items()
+    }
+
+
+def rollup_depths(config: dict[str, Any]) -> list[int]:
+    """Depths the DIRECTORY and OWNERSHIP tables roll up to."""
+    return sorted({max(int(config.get(section, {}).get("depth", 2)), 1) for section in ("directories", "ownership")})
+
+
+def window_state_fingerprint(config: dict[str, Any]) -> str:
+    raw_timeframes = config.get("timeframes") or DEFAULT_CONFIG["timeframes"]
+    payload = [
+        index_version(),
+        list(raw_timeframes.items()),
+        config.get("languages", {}),
+        rollup_depths(config),
+        bool(config.get("paths", {}).get("head_only")),
+        normalize_scopes(config.get("scopes", {})),
+    ]
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def foldable_rows(
+    commits: list[CommitMeta], changes: list[FileChange], ignored_values: set[str]
+) -> tuple[list[tuple[int, str]], list[tuple[int, str, str, int, int, str | None]]]:
+    """``(time, author)`` and ``(time, author, path, additions, deletions, language)`` rows, as persisted in ``recent``."""
+    names: dict[int, str] = {}
+    languages: dict[str, str | None] = {}
+    for change in changes:
+        if change.filename not in languages:
+            language = detect_language(change.filename)
+            ignored = should_ignore(change.filename, language, ignored_values)
+            languages[change.filename] = None if ignored else language
+    for row in (*commits, *changes):
+        if row.author not in names:
+            names[row.author] = author_name(row.author)
+    return (
+        [(commit.time, names[commit.author]) for commit in commits],
+        [
+            (
+                change.time,
+                names[change.author],
+                change.filename,
+                change.additions,
+                change.deletions,
+                languages[change.filename],
+            )
+            for change in changes
+        ],
+    )
+
+
+def fold_rows(
+    totals: WindowTotals,
+    commits: list[tuple[int, str]],
+    changes: list[tuple[int, str, str, int, int, str | None]],
+    sign: int = 1,
+) -> None:
+    """Add (``sign=1``) or remove (``sign=-1``) ``foldable_rows`` output, bucketed exactly as ``summarize`` does."""
+    days: dict[int, str] = {}
+
+    def iso_day(ordinal: int) -> str:
+        day = days.get(ordinal)
+        if day is None:
+            day = days[ordinal] = dt.date.fromordinal(ordinal).isoformat()
+        return day
+
+    ordinals, hours = CLOCK.day_hours([row[0] for row in commits])
+    for (_, author), ordinal, hour in zip(commits, ordinals, hours):
+        totals.add_commit(author, iso_day(ordinal), str((ordinal - 1) % 7 * 24 + hour), sign)
+    ordinals = CLOCK.day_ordinals([row[0] for row in changes])
+    for (_, author, filename, additions, deletions, language), ordinal in zip(changes, ordinals):
+        week = iso_day(ordinal - (ordinal - 1) % 7)
+        totals.add_change(author, iso_day(ordinal), week, filename, language, additions, deletions, sign)
+
+
+def totals_from_summary(summary: Summary, depths: list[int], file_authors: bool) -> WindowTotals:
+    """All-history totals taken from a full-run summary; they only ever grow, so no row counts are kept."""
+
+    def by_name(counter: dict[int, Any]) -> dict[str, Any]:
+        return {author_name(author): value for author, value in counter.items()}
+
+    def by_day(counter: dict[dt.date, Any]) -> dict[str, Any]:
+        return {day.isoformat(): value for day, value in counter.items()}
+
+    authors_by_file = {name: by_name(authors) for name, authors in summary.file_author_churn.items()}
+    totals = WindowTotals(
+        commits=summary.commits,
+        additions=summary.additions,
+        deletions=summary.deletions,
+        values={
+            "contributor_commits": by_name(summary.contributor_commits),
+            "contributor_churn": by_name(summary.contributor_churn),
+            "language_churn": dict(summary.language_churn),
+            "file_churn": dict(summary.file_churn),
+            "daily_commits": by_day(summary.daily_commits),
+            "weekly_additions": by_day(summary.weekly_additions),
+            "weekly_deletions": by_day(summary.weekly_deletions),
+            "punchcard": {
+                str(weekday * 24 + hour): count
+                for weekday, hours in enumerate(summary.punchcard)
+                for hour, count in enumerate(hours)
+                if count
+            },
+            "file_author_churn": authors_by_file if file_authors else {},
+            "language_daily_net": {language: by_day(net) for language, net in summary.language_daily_net.items()},
+            "author_weekly_churn": {
+                author_name(author): by_day(weeks) for author, weeks in summary.author_weekly_churn.items()
+            },
+        },
+        depths=depths,
+        file_authors=file_authors,
+    )
+    totals.roll_up_directories(authors_by_file)
+    return totals
+
+
+def summary_from_totals(totals: WindowTotals) -> Summary:
+    values = totals.values
+    days: dict[str, dt.date] = {}
+    authors = {name: IDENTITIES.intern(name) for name in values["contributor_commits"]}
+
+    def by_author(counter: dict[str, Any]) -> Counter[int]:
+        result: Counter[int] = Counter()
+        for name, value in counter.items():
+            author = authors.get(name)
+            if author is None:
+                author = authors[name] = IDENTITIES.intern(name)
+            result[author] = value
+        return result
+
+    def by_day(counter: dict[str, Any]) -> Counter[dt.date]:
+        result: Counter[dt.date] = Counter()
+        for text, value in counter.items():
+            day = days.get(text)
+            if day is None:
+                day = days[text] = dt.date.fromisoformat(text)
+            result[day] = value
+        return result
+
+    contributor_commits = by_author(values["contributor_commits"])
+    file_churn = Counter(values["file_churn"])
+    daily_commits = by_day(values["daily_commits"])
+    punchcard = [[0] * 24 for _ in range(7)]
+    for slot, count in values["punchcard"].items():
+        weekday, hour = divmod(int(slot), 24)
+        punchcard[weekday][hour] = count
+    calendar, calendar_start = calendar_matrix(daily_commits)
+    directories: dict[int, list[tuple[str, int, int, Counter[int]]]] = {}
+    for depth in totals.depths:
+        group_authors = values[f"directory_authors:{depth}"]
+        rows = [
+            (group, sum(group_authors[group].values()), files, by_author(group_authors[group]))
+            for group, files in values[f"directory_files:{depth}"].items()
+        ]
+        rows.sort(key=lambda row: (-row[1], row[0]))
+        directories[depth] = rows
+
+    return Summary(
+        commits=totals.commits,
+        contributors=len(contributor_commits),
+        additions=totals.additions,
+        deletions=totals.deletions,
+        churn=totals.additions + totals.deletions,
+        files_changed=len(file_churn),
+        contributor_commits=contributor_commits,
+        contributor_churn=by_author(values["contributor_churn"]),
+        language_churn=Counter(values["language_churn"]),
+        file_churn=file_churn,
+        daily_commits=daily_commits,
+        file_author_churn={name: by_author(authors) for name, authors in values["file_author_churn"].items()},
+        language_daily_net={language: by_day(net) for language, net in values["language_daily_net"].items()},
+        punchcard=punchcard,
+        calendar=calendar,
+        calendar_start=calendar_start,
+        weekly_additions=by_day(values["weekly_additions"]),
+        weekly_deletions=by_day(values["weekly_deletions"]),
+        author_weekly_churn={authors[name]: by_day(weeks) for name, weeks in values["author_weekly_churn"].items()},
+        directories=directories,
+    )
+
+
+def recent_entries(
+    commit_rows: list[tuple[int, str]],
+    change_rows: list[tuple[int, str, str, int, int, str | None]],
+    commits: list[CommitMeta],
+    changes: list[FileChange],
+) -> list[list[Any]]:
+    """``foldable_rows`` output regrouped per commit into ``WindowState.recent`` entries, oldest first."""
+    files_by_commit: dict[str, list[list[Any]]] = {}
+    for change, (_, _, filename, additions, deletions, language) in zip(changes, change_rows):
+        files_by_commit.setdefault(change.commit, []).append([filename, additions, deletions, language])
+    entries = [
+        [time_value, author, files_by_commit.get(commit.commit, [])]
+        for commit, (time_value, author) in zip(commits, commit_rows)
+    ]
+    entries.sort(key=lambda entry: entry[0])
+    return entries
+
+
+def expand_recent(
+    entries: list[list[Any]],
+) -> tuple[list[tuple[int, str]], list[tuple[int, str, str, int, int, str | None]]]:
+    commit_rows = [(entry[0], entry[1]) for entry in entries]
+    change_rows = [(entry[0], entry[1], *change) for entry in entries for change in entry[2]]
+    return commit_rows, change_rows
+
+
+def scope_entries(entries: list[list[Any]], prefixes: list[str]) -> list[list[Any]]:
+    """``recent`` entries cut down to the files under ``prefixes``; commits that touched none are dropped."""
+    under = tuple(prefixes)
+    scoped = []
+    for time_value, author, files in entries:
+        files = [change for change in files if change[0].startswith(under)]
+        if files:
+            scoped.append([time_value, author, files])
+    return scoped
+
+
+def build_window_state(
+    config: dict[str, Any],
+    index: HistoryIndex,
+    summaries: dict[str, Summary],
+    scope_summaries: dict[str, dict[str, Summary]],
+    raw_timeframes: dict[str, Any],
+    ignored_values: set[str],
+) -> WindowState:
+    """Totals for every window of a full run: all-history ones from the summaries, bounded ones from their rows."""
+    starts = {label: window_start_time(value) for label, value in raw_timeframes.items()}
+    depths = rollup_depths(config)
+    # Only paths.head_only needs per-file authors, to re-roll the directories of files still at HEAD.
+    file_authors = bool(config.get("paths", {}).get("head_only"))
+    bounded = [start for start in starts.values() if start is not None]
+    floor = min(bounded) if bounded else None
+    commits = [commit for commit in index.commits if commit.time >= floor] if floor is not None else []
+    changes = [change for change in index.changes if change.time >= floor] if floor is not None else []
+    commit_rows, change_rows = foldable_rows(commits, changes, ignored_values)
+    recent = recent_entries(commit_rows, change_rows, commits, changes)
+
+    windows: dict[str, WindowTotals] = {}
+    for label, start in starts.items():
+        if start is None:
+            windows[label] = totals_from_summary(summaries[label], depths, file_authors)
+            continue
+        windows[label] = WindowTotals(start=start, depths=depths, file_authors=file_authors)
+        fold_rows(
+            windows[label],
+            [row for row in commit_rows if row[0] >= start],
+            [row for row in change_rows if row[0] >= start],
+        )
+
+    # Scope tables need no directory rollups or per-file authors.
+    scope_windows: dict[str, dict[str, WindowTotals]] = {}
+    for scope, prefixes in normalize_scopes(config.get("scopes", {})).items():
+        scoped = scope_entries(recent, prefixes)
+        scope_windows[scope] = {}
+        for label, start in starts.items():
+            if start is None:
+                scope_windows[scope][label] = totals_from_summary(scope_summaries[scope][label], [], False)
+                continue
+            scope_windows[scope][label] = WindowTotals(start=start, file_authors=False)
+            fold_rows(scope_windows[scope][label], *expand_recent([entry for entry in scoped if entry[0] >= start]))
+
+    return WindowState(
+        head=index.head,
+        fingerprint=window_state_fingerprint(config),
+        windows=windows,
+        recent=recent,
+        commit_dates=commit_date_range(index),
+        automation=index.automation,
+        cohorts=index.cohorts,
+        scopes=scope_windows,
+    )
+
+
+def advance_totals(
+    totals: WindowTotals,
+    value: Any,
+    entries: list[list[Any]],
+    recent: list[list[Any]],
+    prefixes: list[str] | None = None,
+) -> None:
+    """Fold ``entries`` into ``totals`` after folding out the ``recent`` ones that aged past the start of ``value``.
+
+    ``prefixes`` restricts both to a scope. A start that would move back (a clock change)
+    stays where it was until the next full run.
+    """
+    start = window_start_time(value) if totals.start is not None else None
+    if start is not None and start > totals.start:
+        expired = [entry for entry in recent if totals.start <= entry[0] < start]
+        if prefixes is not None:
+            expired = scope_entries(expired, prefixes)
+        fold_rows(totals, *expand_recent(expired), sign=-1)
+        totals.start = start
+    if prefixes is not None:
+        entries = scope_entries(entries, prefixes)
+    fold_rows(totals, *expand_recent([entry for entry in entries if totals.start is None or entry[0] >= totals.start]))
+
+
+def advance_window_state(
+    state: WindowState,
+    index: HistoryIndex,
+    raw_timeframes: dict[str, Any],
+    ignored_values: set[str],
+    scopes: dict[str, list[str]],
+) -> None:
+    """Fold ``index`` (the commits since ``state.head``) into every window and scope, and fold out what aged past a start."""
+    commit_rows, change_rows = foldable_rows(index.commits, index.changes, ignored_values)
+    entries = recent_entries(commit_rows, change_rows, index.commits, index.changes)
+    for label, value in raw_timeframes.items():
+        advance_totals(state.windows[label], value, entries, state.recent)
+        for scope, prefixes in scopes.items():
+            advance_totals(state.scopes[scope][label], value, entries, state.recent, prefixes)
+
+    bounded = [totals.start for totals in state.windows.values() if totals.start is not None]
+    floor = min(bounded) if bounded else None
+    state.recent.extend(entries)
+    state.recent = sorted(
+        (entry for entry in state.recent if floor is not None and entry[0] >= floor), key=lambda entry: entry[0]
+    )
+
+    if index.commits:
+        first, last = commit_date_range(index)
+        if state.commit_dates[0] != "n/a":
+            first, last = min(first, state.commit_dates[0]), max(last, state.commit_dates[1])
+        state.commit_dates = (first, last)
+    state.head = index.head
+
+
+def load_window_state(head: str | None, fingerprint: str) -> WindowState | None:
+    """Persisted totals, if they were written for ``head`` with the current ``fingerprint``."""
+    if not head:
+        return None
+    try:
+        payload = json.loads((index_cache_dir() / "window_state.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if (
+        not isinstance(payload, dict)
+        or payload.get("version") != WINDOW_STATE_VERSION
+        or payload.get("head") != head
+        or payload.get("fingerprint") != fingerprint
+    ):
+        return None
+
+    cohorts = CohortIndex()
+    for name, first, last, activity in payload.get("cohorts", []):
+        author = IDENTITIES.intern(name)
+        cohorts.first_seen[author], cohorts.last_seen[author], cohorts.activity[author] = first, last, activity
+    first_commit, last_commit = payload.get("commit_dates", ["n/a", "n/a"])
+    return WindowState(
+        head=head,
+        fingerprint=fingerprint,
+        windows={label: WindowTotals.from_dict(totals) for label, totals in payload.get("windows", {}).items()},
+        recent=payload.get("recent", []),
+        commit_dates=(first_commit, last_commit),
+        automation=AutomationTally.from_dict(payload.get("automation")),
+        cohorts=cohorts,
+        scopes={
+            scope: {label: WindowTotals.from_dict(totals) for label, totals in windows.items()}
+            for scope, windows in payload.get("scopes", {}).items()
+        },
+    )
+
+
+def save_window_state(state: WindowState) -> None:
+    cohorts = state.cohorts
+    payload = {
+        "version": WINDOW_STATE_VERSION,
+        "head": state.head,
+        "fingerprint": state.fingerprint,
+        "windows": {label: totals.to_dict() for label, totals in state.windows.items()},
+        "recent": state.recent,
+        "commit_dates": list(state.commit_dates),
+        "automation": state.automation.to_dict(),
+        "cohorts": [
+            [author_name(author), first, cohorts.last_seen[author], cohorts.activity[author]]
+            for author, first in cohorts.first_seen.items()
+        ],
+        "scopes": {
+            scope: {label: totals.to_dict() for label, totals in windows.items()}
+            for scope, windows in state.scopes.items()
+        },
+    }
+    cache_path = index_cache_dir() / "window_state.json"
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = cache_path.with_suffix(".tmp")
+    temp_path.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+    os.replace(temp_path, cache_path)
+
+
+def resume_history_index(state: WindowState, head: str) -> HistoryIndex | None:
+    """Only the commits since ``state.head``; None when a full load is needed (HEAD is not a descendant).
+
+    The state's automation tally and cohorts are extended in place, so the returned index
+    carries the all-history values for those. Saving it appends the new rows to the store.
+    """
+    if not git_succeeds(["merge-base", "--is-ancestor", state.head, head]):
+        return None
+    commits, changes, automation = parse_commits_diff_tree(f"{state.head}..{head}")
+    state.automation.merge(automation)
+    index = HistoryIndex(
+        head=head,
+        commits=commits,
+        changes=changes,
+        automation=state.automation,
+        cohorts=state.cohorts,
+        partial=True,
+    )
+    return index
+
+
+def normalize_prefix(prefix: str) -> str:
+    """Drop leading ``./`` and ``/`` so prefixes match repo-relative paths; dot-directories are kept."""
+    prefix = prefix.strip()
+    while prefix.startswith("./"):
+        prefix = prefix.removeprefix("./")
+    return prefix.lstrip("/")
+
+
+def normalize_scopes(raw_scopes: Any) -> dict[str, list[str]]:
+    """Accept ``{"Billing": "services/billing/"}`` or a list of prefixes per scope."""
+    if not isinstance(raw_scopes, dict):
+        return {}
+
+    scopes: dict[str, list[str]] = {}
+    for label, value in raw_scopes.items():
+        values = value if isinstance(value, list) else [value]
+        prefixes = [normalize_prefix(str(prefix)) for prefix in values if str(prefix).strip()]
+        if prefixes:
+            scopes[str(label)] = prefixes
+    return scopes
+
+
+def summarize_scope(
+    index: HistoryIndex,
+    commit_lookup: dict[str, CommitMeta],
+    prefixes: list[str],
+    start: int | None,
+    ignored_values: set[str],
+) -> Summary:
+    changes = [
+        index.changes[row]
+        for row in index.paths.rows_with_prefixes(prefixes)
+        if start is None or index.changes[row].time >= start
+    ]
+    # A commit belongs to the scope when it touched at least one file under it.
+    commits = [commit_lookup[commit_hash] for commit_hash in dict.fromkeys(change.commit for change in changes)]
+    return summarize(commits, changes, ignored_values)
+
+
+def build_scope_summaries(
+    index: HistoryIndex,
+    scopes: dict[str, list[str]],
+    raw_timeframes: dict[str, Any],
+    ignored_values: set[str],
+) -> dict[str, dict[str, Summary]]:
+    if not scopes:
+        return {}
+
+    commit_lookup = {commit.commit: commit for commit in index.commits}
+    starts = {label: window_start_time(value) for label, value in raw_timeframes.items()}
+    return {
+        scope: {
+            label: summarize_scope(index, commit_lookup, prefixes, start, ignored_values)
+            for label, start in starts.items()
+        }
+        for scope, prefixes in scopes.items()
+    }
+
+
+def summary_to_dict(summary: Summary, max_items: int) -> dict[str, Any]:
+    return {
+        "commits": summary.commits,
+        "contributors": summary.contributors,
+        "additions": summary.additions,
+        "deletions": summary.deletions,
+        "churn": summary.churn,
+        "files_changed": summary.files_changed,
+        "top_contributors": [
+            {
+                "name": author_name(author),
+                "commits": summary.contributor_commits.get(author, 0),
+                "churn": churn,
+            }
+            for author, churn in top_counts(summary.contributor_churn, max_items, by_name=True)
+        ],
+        "top_files": [
+            {"file": filename, "churn": churn}
+            for filename, churn in top_counts(summary.file_churn, max_items)
+        ],
+    }
+
+
+def build_api_payloads(
+    index: HistoryIndex,
+    ordered_labels: list[str],
+    summaries: dict[str, Summary],
+    all_time_label: str,
+    max_contributors: int,
+) -> dict[str, Any]:
+    """Shape the in-memory summaries into the JSON documents served by the daemon."""
+    all_time = summaries[all_time_label]
+    first_commit, last_commit = commit_date_range(index)
+
+    commits_payload: dict[str, Any] = {}
+    for label in ordered_labels:
+        days, counts = build_daily_series(summaries[label].daily_commits)
+        commits_payload[label] = {
+            "commits": summaries[label].commits,
+            "active_days": sum(1 for count in counts if count > 0),
+            "daily": [{"date": day.isoformat(), "commits": count} for day, count in zip(days, counts)],
+        }
+
+    return {
+        "overview": {
+            label: summary_to_dict(summaries[label], max_contributors) for label in ordered_labels
+        },
+        "languages": {
+            label: dict(top_counts(summaries[label].language_churn)) for label in ordered_labels
+        },
+        "commits": commits_payload,
+        "pulse": {
+            "head": index.head,
+            "window": all_time_label,
+            "commits": all_time.commits,
+            "contributors": all_time.contributors,
+            "additions": all_time.additions,
+            "deletions": all_time.deletions,
+            "churn": all_time.churn,
+            "files_changed": all_time.files_changed,
+            "first_commit_date": first_commit,
+            "last_commit_date": last_commit,
+            "generated_at": dt.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC"),
+        },
+    }
+
+
+def build_export_document(
+    head: str,
+    commit_dates: tuple[str, str],
+    ordered_labels: list[str],
+    summaries: dict[str, Summary],
+) -> dict[str, Any]:
+    """Everything the README blocks are built from, minus timestamps so unchanged data hashes equal."""
+    first_commit, last_commit = commit_dates
+    windows: dict[str, Any] = {}
+    for label in ordered_labels:
+        summary = summaries[label]
+        days, counts = build_daily_series(summary.daily_commits)
+        windows[label] = {
+            "commits": summary.commits,
+            "contributors": summary.contributors,
+            "additions": summary.additions,
+            "deletions": summary.deletions,
+            "churn": summary.churn,
+            "files_changed": summary.files_changed,
+            "daily_commits": {day.isoformat(): count for day, count in zip(days, counts)},
+            "contributor_commits": {
+                author_name(author): count for author, count in top_counts(summary.contributor_commits, by_name=True)
+            },
+            "contributor_churn": {
+                author_name(author): churn for author, churn in top_counts(summary.contributor_churn, by_name=True)
+            },
+            "language_churn": dict(top_counts(summary.language_churn)),
+        }
+
+    return {
+        "head": head,
+        "first_commit_date": first_commit,
+        "last_commit_date": last_commit,
+        "windows": windows,
+    }
+
+
+def build_export_tables(ordered_labels: list[str], summaries: dict[str, Summary]) -> dict[str, Table]:
+    def window_rows() -> Any:
+        for label in ordered_labels:
+            summary = summaries[label]
+            yield (
+                label,
+                summary.commits,
+                summary.contributors,
+                summary.additions,
+                summary.deletions,
+                summary.churn,
+                summary.files_changed,
+            )
+
+    def daily_rows() -> Any:
+        for label in ordered_labels:
+            days, counts = build_daily_series(summaries[label].daily_commits)
+            for day, count in zip(days, counts):
+                yield (label, day.isoformat(), count)
+
+    def contributor_rows() -> Any:
+        for label in ordered_labels:
+            summary = summaries[label]
+            for author, churn in top_counts(summary.contributor_churn, by_name=True):
+                yield (label, author_name(author), summary.contributor_commits.get(author, 0), churn)
+
+    def language_rows() -> Any:
+        for label in ordered_labels:
+            for language, churn in top_counts(summaries[label].language_churn):
+                yield (label, language, churn)
+
+    return {
+        "windows": (
+            ["window", "commits", "contributors", "additions", "deletions", "churn", "files_changed"],
+            window_rows(),
+        ),
+        "daily": (["window", "date", "commits"], daily_rows()),
+        "contributors": (["window", "contributor", "commits", "churn"], contributor_rows()),
+        "languages": (["window", "language", "churn"], language_rows()),
+    }
+
+
+def slugify(label: str) -> str:
+    slug = re.sub(r"[^a-zA-Z0-9]+", "_", label.strip().lower())
+    return slug.strip("_") or "window"
+
+
+def chart_path(kind: str, label: str) -> Path:
+    return STATS_DIR / f"{kind}_{slugify(label)}.png"
+
+
+def existing_chart(kind: str, label: str) -> Path | None:
+    """Reuse a chart from the last full run when rendering is deferred (hook mode)."""
+    path = chart_path(kind, label)
+    return path if path.exists() else None
+
+
+def load_deferred() -> tuple[str | None, dict[str, Any]]:
+    """Output of the tree-wide passes (blame, blob metrics) from the last full run and the HEAD it ran at, for hook mode."""
+    try:
+        payload = json.loads((index_cache_dir() / "deferred.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None, {}
+    if not isinstance(payload, dict) or payload.get("version") != DEFERRED_CACHE_VERSION:
+        return None, {}
+    return payload.get("head"), payload.get("entries", {})
+
+
+def save_deferred(head: str, entries: dict[str, Any]) -> None:
+    cache_path = index_cache_dir() / "deferred.json"
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = cache_path.with_suffix(".tmp")
+    temp_path.write_text(
+        json.dumps({"version": DEFERRED_CACHE_VERSION, "head": head, "entries": entries}, separators=(",", ":")),
+        encoding="utf-8",
+    )
+    os.replace(temp_path, cache_path)
+
+
+def deferred_block(entries: dict[str, Any], name: str, as_of: str | None) -> str | None:
+    """Block ``name`` from the last full run, noting the commit it describes when that is not HEAD (``as_of``)."""
+    block = entries.get(name)
+    if not block or as_of is None:
+        return block
+    return block.rstrip("\n") + f"\n\n_As of {as_of[:12]}, the last full run; refreshed by the next one._\n"
+
+
+def chart_cache() -> ChartCache:
+    global _CHART_CACHE
+    if _CHART_CACHE is None:
+        _CHART_CACHE = ChartCache(STATS_DIR / "chart_cache.json")
+    return _CHART_CACHE
+
+
+def cached_chart(kind: str, label: str, payload: Any, draw: Any) -> Path | None:
+    """Render ``kind`` for ``label`` via ``draw(output) -> bool`` unless ``payload`` is unchanged since the last render."""
+    return chart_cache().render(chart_path(kind, label), chart_digest(kind, payload), draw)
+
+
+def compute_rolling(values: list[int], window: int) -> list[float]:
+    out: list[float] = []
+    for idx in range(len(values)):
+        start = max(0, idx - window + 1)
+        segment = values[start : idx + 1]
+        out.append(sum(segment) / len(segment))
+    return out
+
+
+def figure_size(graph_cfg: dict[str, Any], default_width: float, default_height: float) -> tuple[float, float]:
+    width = graph_cfg.get("width", default_width)
+    height = graph_cfg.get("height", default_height)
+
+    try:
+        width_value = float(width)
+    except (TypeError, ValueError):
+        width_value = default_width
+
+    try:
+        height_value = float(height)
+    except (TypeError, ValueError):
+        height_value = default_height
+
+    # If values look like pixels, normalize to inches for matplotlib.
+    if width_value > 50:
+        width_value = width_value / 100
+    if height_value > 50:
+        height_value = height_value / 100
+
+    return max(width_value, 5.5), max(height_value, 2.6)
+
+
+def build_daily_series(daily_counter: Counter[dt.date]) -> tuple[list[dt.date], list[int]]:
+    if not daily_counter:
+        return [], []
+
+    start_date = min(daily_counter)
+    end_date = max(daily_counter)
+    days = []
+    counts = []
+
+    cursor = start_date
+    while cursor <= end_date:
+        days.append(cursor)
+        counts.append(daily_counter.get(cursor, 0))
+        cursor += dt.timedelta(days=1)
+
+    return days, counts
+
+
+def build_language_growth(
+    language_daily_net: dict[str, Counter[dt.date]],
+    max_languages: int,
+) -> tuple[list[dt.date], dict[str, list[int]]]:
+    """Cumulative net lines per language over a continuous day range; the tail folds into "Other"."""
+    active = [daily for daily in language_daily_net.values() if daily]
+    if not active:
+        return [], {}
+
+    start_date = min(min(daily) for daily in active)
+    end_date = max(max(daily) for daily in active)
+    days = [start_date + dt.timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+
+    series: dict[str, list[int]] = {}
+    for language, daily in language_daily_net.items():
+        deltas = [0] * len(days)
+        for day, net in daily.items():
+            deltas[(day - start_date).days] += net
+        series[language] = list(accumulate(deltas))
+
+    ranked = sorted(series, key=lambda language: (-series[language][-1], language))
+    growth = {language: series[language] for language in ranked[:max_languages]}
+    rest = ranked[max_languages:]
+    if rest:
+        growth["Other"] = [sum(values) for values in zip(*(series[language] for language in rest))]
+    return days, growth
+
+
+def plot_language_growth(
+    label: str,
+    days: list[dt.date],
+    growth: dict[str, list[int]],
+    graph_cfg: dict[str, Any],
+) -> Path | None:
+    if not days:
+        return None
+
+    modules = get_plot_modules()
+    if modules is None:
+        return None
+    mdates, plt = modules
+
+    fig_w, fig_h = figure_size(graph_cfg, default_width=8.2, default_height=3.6)
+    fig, ax = plt.subplots(figsize=(fig_w, fig_h))
+
+    # Stacked areas cannot go below zero; a language that shrank past its start is drawn flat.
+    stacked = [[max(value, 0) for value in values] for values in growth.values()]
+    ax.stackplot(days, *stacked, labels=list(growth), alpha=0.85)
+
+    ax.set_title(f"Language Growth - {label}")
+    ax.set_ylabel("Net lines")
+    ax.grid(True, axis="y", linestyle="--", alpha=0.25)
+    ax.legend(loc="upper left", fontsize=8)
+
+    locator = mdates.AutoDateLocator(minticks=4, maxticks=8)
+    formatter = mdates.ConciseDateFormatter(locator)
+    ax.xaxis.set_major_locator(locator)
+    ax.xaxis.set_major_formatter(formatter)
+
+    fig.tight_layout()
+    output = chart_path("language_growth", label)
+    fig.savefig(output, dpi=160)
+    plt.close(fig)
+    return output
+
+
+def plot_punchcard(label: str, punchcard: list[list[int]]) -> Path | None:
+    if not any(map(any, punchcard)):
+        return None
+
+    def draw(output: Path) -> bool:
+        modules = get_plot_modules()
+        if modules is None:
+            return False
+        _, plt = modules
+        fig, ax = plt.subplots(figsize=(8.2, 2.6))
+        ax.imshow(punchcard, aspect="auto", cmap="Greens", interpolation="nearest")
+        ax.set_yticks(range(7))
+        ax.set_yticklabels(WEEKDAY_NAMES, fontsize=8)
+        ax.set_xticks(range(0, 24, 3))
+        ax.set_xticklabels([f"{hour:02d}:00" for hour in range(0, 24, 3)], fontsize=8)
+        ax.set_xlabel(f"Hour ({CLOCK.timezone})")
+        ax.set_title(f"Commit Punchcard - {label}")
+        fig.tight_layout()
+        fig.savefig(output, dpi=160)
+        plt.close(fig)
+        return True
+
+    return cached_chart("punchcard", label, [punchcard, CLOCK.timezone], draw)
+
+
+def plot_calendar(
+    label: str,
+    calendar: list[list[int]],
+    start: dt.date,
+) -> Path | None:
+    if not any(map(any, calendar)):
+        return None
+
+    def draw(output: Path) -> bool:
+        modules = get_plot_modules()
+        if modules is None:
+            return False
+        _, plt = modules
+        # One column per week, one row per weekday, like GitHub's contribution graph.
+        by_weekday = [list(row) for row in zip(*calendar)]
+        fig, ax = plt.subplots(figsize=(9.6, 1.9))
+        ax.imshow(by_weekday, aspect="equal", cmap="Greens", interpolation="nearest")
+        ax.set_yticks([0, 2, 4])
+        ax.set_yticklabels([WEEKDAY_NAMES[0], WEEKDAY_NAMES[2], WEEKDAY_NAMES[4]], fontsize=7)
+        month_ticks = [
+            (week, (start + dt.timedelta(weeks=week)).strftime("%b"))
+            for week in range(len(calendar))
+            if (start + dt.timedelta(weeks=week)).day <= 7
+        ]
+        ax.set_xticks([week for week, _ in month_ticks])
+        ax.set_xticklabels([name for _, name in month_ticks], fontsize=7)
+        ax.set_title(f"Contribution Calendar - {label}", fontsize=9)
+        fig.tight_layout()
+        fig.savefig(output, dpi=160)
+        plt.close(fig)
+        return True
+
+    return cached_chart("calendar", label, [calendar, start.isoformat()], draw)
+
+
+def weekly_series(summary: Summary) -> tuple[list[dt.date], list[int], list[int]]:
+    """Every week from the first to the last change, with empty weeks as zeros."""
+    if not summary.weekly_additions and not summary.weekly_deletions:
+        return [], [], []
+    weeks = set(summary.weekly_additions) | set(summary.weekly_deletions)
+    first, last = min(weeks), max(weeks)
+    span = [first + dt.timedelta(weeks=idx) for idx in range((last - first).days // 7 + 1)]
+    return (
+        span,
+        [summary.weekly_additions.get(week, 0) for week in span],
+        [summary.weekly_deletions.get(week, 0) for week in span],
+    )
+
+
+def contributor_stream(summary: Summary, top_n: int) -> tuple[list[dt.date], list[tuple[str, list[int]]]]:
+    """Weekly churn of the ``top_n`` contributors by window churn, with everyone else summed into "Others"."""
+    weeks, _, _ = weekly_series(summary)
+    if not weeks or not summary.author_weekly_churn:
+        return [], []
+    top = [author for author, _ in top_counts(summary.contributor_churn, top_n, by_name=True)]
+    empty: Counter[dt.date] = Counter()
+    layers = [
+        (author_name(author), [summary.author_weekly_churn.get(author, empty)[week] for week in weeks])
+        for author in top
+    ]
+    others = [0] * len(weeks)
+    positions = {week: idx for idx, week in enumerate(weeks)}
+    top_set = set(top)
+    for author, author_weeks in summary.author_weekly_churn.items():
+        if author in top_set:
+            continue
+        for week, churn in author_weeks.items():
+            others[positions[week]] += churn
+    if any(others):
+        layers.append(("Others", others))
+    return weeks, layers
+
+
+def plot_contributor_stream(
+    label: str,
+    weeks: list[dt.date],
+    layers: list[tuple[str, list[int]]],
+    graph_cfg: dict[str, Any],
+) -> Path | None:
+    # A stack needs at least two points to be an area.
+    if len(weeks) < 2 or not layers:
+        return None
+    fig_w, fig_h = figure_size(graph_cfg, default_width=8.2, default_height=3.6)
+
+    def draw(output: Path) -> bool:
+        modules = get_plot_modules()
+        if modules is None:
+            return False
+        mdates, plt = modules
+        fig, ax = plt.subplots(figsize=(fig_w, fig_h))
+        colors = [plt.get_cmap("tab10")(idx % 10) for idx in range(len(layers))]
+        if layers[-1][0] == "Others":
+            colors[-1] = "#bab0ac"
+        ax.stackplot(
+            weeks,
+            *[series for _, series in layers],
+            labels=[name for name, _ in layers],
+            colors=colors,
+            alpha=0.85,
+        )
+        ax.set_title(f"Contributor Activity - {label}")
+        ax.set_ylabel("Lines changed per week")
+        ax.grid(True, axis="y", linestyle="--", alpha=0.25)
+        ax.legend(loc="upper left", fontsize=7, ncol=2)
+
+        locator = mdates.AutoDateLocator(minticks=4, maxticks=8)
+        ax.xaxis.set_major_locator(locator)
+        ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+        fig.tight_layout()
+        fig.savefig(output, dpi=160)
+        plt.close(fig)
+        return True
+
+    payload = [[week.isoformat() for week in weeks], layers, [fig_w, fig_h]]
+    return cached_chart("contributor_stream", label, payload, draw)
+
+
+def plot_code_frequency(label: str, summary: Summary, graph_cfg: dict[str, Any]) -> Path | None:
+    weeks, additions, deletions = weekly_series(summary)
+    if not weeks:
+        return None
+    fig_w, fig_h = figure_size(graph_cfg, default_width=8.2, default_height=3.2)
+
+    def draw(output: Path) -> bool:
+        modules = get_plot_modules()
+        if modules is None:
+            return False
+        mdates, plt = modules
+        fig, ax = plt.subplots(figsize=(fig_w, fig_h))
+        ax.bar(weeks, additions, width=6, align="edge", color="#59a14f", label="Additions")
+        ax.bar(weeks, [-value for value in deletions], width=6, align="edge", color="#e15759", label="Deletions")
+        ax.axhline(0, color="#555555", linewidth=0.8)
+        ax.set_title(f"Code Frequency - {label}")
+        ax.set_ylabel("Lines per week")
+        ax.grid(True, axis="y", linestyle="--", alpha=0.25)
+        ax.legend(loc="upper right")
+
+        locator = mdates.AutoDateLocator(minticks=4, maxticks=8)
+        ax.xaxis.set_major_locator(locator)
+        ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+        fig.tight_layout()
+        fig.savefig(output, dpi=160)
+        plt.close(fig)
+        return True
+
+    payload = [[week.isoformat() for week in weeks], additions, deletions, [fig_w, fig_h]]
+    return cached_chart("code_frequency", label, payload, draw)
+
+
+def plot_commit_activity(label: str, summary: Summary, graph_cfg: dict[str, Any]) -> Path | None:
+    if not summary.daily_commits:
+        return None
+
+    modules = get_plot_modules()
+    if modules is None:
+        return None
+    mdates, plt = modules
+
+    days, counts = build_daily_series(summary.daily_commits)
+    rolling = compute_rolling(counts, window=7)
+
+    fig_w, fig_h = figure_size(graph_cfg, default_width=8.2, default_height=3.2)
+    fig, ax = plt.subplots(figsize=(fig_w, fig_h))
+
+    base_color = graph_cfg.get("color", "#4e79a7")
+    ax.bar(days, counts, color=base_color, alpha=0.35, label="Daily commits")
+    ax.plot(days, rolling, color="#e15759", linewidth=2.0, label="7-day rolling avg")
+
+    ax.set_title(f"Commit Activity - {label}")
+    ax.set_ylabel("Commits")
+    ax.grid(True, axis="y", linestyle="--", alpha=0.25)
+    ax.legend(loc="upper right")
+
+    locator = mdates.AutoDateLocator(minticks=4, maxticks=8)
+    formatter = mdates.ConciseDateFormatter(locator)
+    ax.xaxis.set_major_locator(locator)
+    ax.xaxis.set_major_formatter(formatter)
+
+    fig.tight_layout()
+    output = chart_path("commits", label)
+    fig.savefig(output, dpi=160)
+    plt.close(fig)
+    return output
+
+
+def plot_language_breakdown(label: str, summary: Summary) -> Path | None:
+    if not summary.language_churn:
+        return None
+
+    modules = get_plot_modules()
+    if modules is None:
+        return None
+    _, plt = modules
+
+    ranked = top_counts(summary.language_churn, 8)
+    remainder = sum(summary.language_churn.values()) - sum(v for _, v in ranked)
+    if remainder > 0:
+        ranked.append(("Other", remainder))
+
+    labels = [name for name, _ in ranked]
+    values = [value for _, value in ranked]
+
+    fig, ax = plt.subplots(figsize=(6.4, 5.1))
+    wedges, texts, autotexts = ax.pie(
+        values,
+        labels=labels,
+        startangle=120,
+        autopct=lambda pct: f"{pct:.1f}%" if pct >= 3 else "",
+        wedgeprops={"width": 0.42},
+        pctdistance=0.8,
+        labeldistance=1.06,
+    )
+
+    for text in texts:
+        text.set_fontsize(8)
+    for auto in autotexts:
+        auto.set_fontsize(8)
+
+    ax.set_title(f"Language Churn Breakdown - {label}")
+    ax.axis("equal")
+
+    fig.tight_layout()
+    output = chart_path("language", label)
+    fig.savefig(output, dpi=160)
+    plt.close(fig)
+    return output
+
+
+def plot_contributor_churn(label: str, summary: Summary, max_contributors: int) -> Path | None:
+    if not summary.contributor_churn:
+        return None
+
+    modules = get_plot_modules()
+    if modules is None:
+        return None
+    _, plt = modules
+
+    ranked = top_counts(summary.contributor_churn, max_contributors, by_name=True)
+    names = [author_name(author) for author, _ in reversed(ranked)]
+    values = [value for _, value in reversed(ranked)]
+
+    fig, ax = plt.subplots(figsize=(8.0, 4.2))
+    ax.barh(names, values, color="#76b7b2")
+    ax.set_title(f"Top Contributors by Churn - {label}")
+    ax.set_xlabel("Lines changed (+/-)")
+    ax.grid(True, axis="x", linestyle="--", alpha=0.25)
+
+    fig.tight_layout()
+    output = chart_path("contributors", label)
+    fig.savefig(output, dpi=160)
+    plt.close(fig)
+    return output
+
+
+def build_overview_block(
+    ordered_labels: list[str],
+    summaries: dict[str, Summary],
+    primary_label: str,
+    max_contributors: int,
+    automation: tuple[int, int, int, int] | None = None,
+) -> str:
+    lines = ["## Repository Analytics Overview", ""]
+    lines.append("| Window | Commits | Contributors | +Add | -Del | Churn | Files | Avg Churn/Commit |")
+    lines.append("|--------|---------|--------------|------|------|-------|-------|------------------|")
+
+    for label in ordered_labels:
+        summary = summaries[label]
+        avg_churn = (summary.churn / summary.commits) if summary.commits else 0.0
+        lines.append(
+            f"| {label} | {summary.commits} | {summary.contributors} | {summary.additions} | {summary.deletions} | "
+            f"{summary.churn} | {summary.files_changed} | {avg_churn:.1f} |"
+        )
+
+    if automation is not None:
+        # Bot commits are excluded from every row above; this row only reports their volume.
+        bot_commits, bots, bot_additions, bot_deletions = automation
+        bot_churn = bot_additions + bot_deletions
+        avg_churn = (bot_churn / bot_commits) if bot_commits else 0.0
+        lines.append(
+            f"| _Automation ({primary_label})_ | {bot_commits} | {bots} | {bot_additions} | {bot_deletions} | "
+            f"{bot_churn} | n/a | {avg_churn:.1f} |"
+        )
+
+    primary = summaries[primary_label]
+    lines.extend([
+        "",
+        f"### Top Contributors ({primary_label})",
+        "",
+        "| Contributor | Commits | Churn | Share of Churn |",
+        "|-------------|---------|-------|----------------|",
+    ])
+
+    total_churn = max(primary.churn, 1)
+    for author, churn in top_counts(primary.contributor_churn, max_contributors, by_name=True):
+        share = (churn / total_churn) * 100
+        lines.append(
+            f"| {author_name(author)} | {primary.contributor_commits.get(author, 0)} | {churn} | {share:.1f}% |"
+        )
 
     if not primary.contributor_churn:
         lines.append("| _No contributor activity_ | 0 | 0 | 0.0% |")
 
-    lines.extend([
-        "",
-        f"### Most Changed Files ({primary_label})",
-        "",
-        "| File | Churn |",
-        "|------|-------|",
-    ])
+    lines.extend([
+        "",
+        f"### Most Changed Files ({primary_label})",
+        "",
+        "| File | Churn |",
+        "|------|-------|",
+    ])
+
+    for filename, churn in top_counts(primary.file_churn, 10):
+        safe_name = filename.replace("|", "\\|")
+        lines.append(f"| `{safe_name}` | {churn} |")
+
+    if not primary.file_churn:
+        lines.append("| _No file-level changes_ | 0 |")
+
+    return "\n".join(lines)
+
+
+def build_commits_block(
+    ordered_labels: list[str],
+    summaries: dict[str, Summary],
+    commit_charts: dict[str, Path | None],
+) -> str:
+    lines = ["## Commit Activity Trends", ""]
+
+    for label in ordered_labels:
+        summary = summaries[label]
+        chart = commit_charts.get(label)
+
+        active_days = sum(1 for count in summary.daily_commits.values() if count > 0)
+        if summary.daily_commits:
+            peak_day, peak_count = max(summary.daily_commits.items(), key=lambda item: item[1])
+            peak_text = f"{peak_day.isoformat()} ({peak_count})"
+        else:
+            peak_text = "n/a"
+
+        lines.append(f"### {label}")
+        lines.append(
+            f"- Commits: **{summary.commits}** | Active days: **{active_days}** | Peak day: **{peak_text}**"
+        )
+        lines.append(
+            f"- Additions: **{summary.additions}** | Deletions: **{summary.deletions}** | Churn: **{summary.churn}**"
+        )
+        if chart:
+            lines.append(f"![{label} Commit Activity]({readme_link(chart)})")
+        else:
+            lines.append("_No commit activity in this window._")
+        lines.append("")
+
+    return "\n".join(lines).rstrip() + "\n"
+
+
+def build_language_block(
+    ordered_labels: list[str],
+    summaries: dict[str, Summary],
+    language_charts: dict[str, Path | None],
+    snapshot: CodeSnapshot | None = None,
+    snapshot_as_of: str | None = None,
+) -> str:
+    lines = ["## Language Breakdown", ""]
+
+    total_lines = sum(snapshot.language_lines.values()) if snapshot else 0
+    if snapshot and total_lines:
+        measured = sum(snapshot.language_files.values())
+        lines.append("### Code at HEAD")
+        if snapshot_as_of:
+            lines.append(f"_{measured} file(s) measured as of {snapshot_as_of[:12]}, the last full run._")
+        else:
+            lines.append(
+                f"_{measured} file(s) measured; {snapshot.blobs_read} blob(s) read this run, the rest from cache._"
+            )
+        lines.append("")
+        lines.append("| Language | Files | LOC | Bytes | Share |")
+        lines.append("|----------|-------|-----|-------|-------|")
+        for language, count in top_counts(snapshot.language_lines, 8):
+            share = (count / total_lines) * 100
+            lines.append(
+                f"| {language} | {snapshot.language_files[language]} | {count} | "
+                f"{snapshot.language_bytes[language]} | {share:.1f}% |"
+            )
+        lines.append("")
+
+    for label in ordered_labels:
+        summary = summaries[label]
+        total = sum(summary.language_churn.values())
+        lines.append(f"### {label}")
+
+        if total == 0:
+            lines.append("_No language churn data in this window._")
+            lines.append("")
+            continue
+
+        lines.append("| Language | Churn | Share |")
+        lines.append("|----------|-------|-------|")
+        for language, churn in top_counts(summary.language_churn, 8):
+            share = (churn / total) * 100
+            lines.append(f"| {language} | {churn} | {share:.1f}% |")
+
+        chart = language_charts.get(label)
+        if chart:
+            lines.append("")
+            lines.append(f"![{label} Language Breakdown]({readme_link(chart)})")
+
+        lines.append("")
+
+    return "\n".join(lines).rstrip() + "\n"
+
+
+def build_language_growth_block(
+    label: str,
+    days: list[dt.date],
+    growth: dict[str, list[int]],
+    chart: Path | None,
+) -> str:
+    lines = ["## Language Growth", "", f"### {label}"]
+
+    if not days:
+        lines.append("_No language history in this window._")
+        return "\n".join(lines).rstrip() + "\n"
 
-    for filename, churn in primary.file_churn.most_common(10):
-        safe_name = filename.replace("|", "\\|")
-        lines.append(f"| `{safe_name}` | {churn} |")
+    lines.append("| Language | Net Lines | Peak | Change (last 30 days) |")
+    lines.append("|----------|-----------|------|-----------------------|")
+    recent_idx = max(len(days) - 31, 0)
+    for language, values in growth.items():
+        recent = values[-1] - values[recent_idx] if len(values) > 30 else values[-1]
+        lines.append(f"| {language} | {values[-1]} | {max(values)} | {recent:+d} |")
 
-    if not primary.file_churn:
-        lines.append("| _No file-level changes_ | 0 |")
+    if chart:
+        lines.append("")
+        lines.append(f"![{label} Language Growth]({readme_link(chart)})")
 
-    return "\n".join(lines)
+    return "\n".join(lines).rstrip() + "\n"
 
 
-def build_commits_block(
+def build_activity_block(
     ordered_labels: list[str],
     summaries: dict[str, Summary],
-    commit_charts: dict[str, Path | None],
+    charts: dict[str, tuple[Path | None, Path | None]],
 ) -> str:
-    lines = ["## Commit Activity Trends", ""]
-
+    lines = ["## Activity Patterns", "", f"_Hours and weekdays in {CLOCK.timezone}._", ""]
+    blocks = [(0, 6), (6, 12), (12, 18), (18, 24)]
     for label in ordered_labels:
         summary = summaries[label]
-        chart = commit_charts.get(label)
-
-        active_days = sum(1 for count in summary.daily_commits.values() if count > 0)
-        if summary.daily_commits:
-            peak_day, peak_count = max(summary.daily_commits.items(), key=lambda item: item[1])
-            peak_text = f"{peak_day.isoformat()} ({peak_count})"
-        else:
-            peak_text = "n/a"
-
         lines.append(f"### {label}")
+        if not summary.commits or not summary.punchcard:
+            lines.append("_No commits in this window._")
+            lines.append("")
+            continue
+
+        weekday, hour = max(
+            ((day, hour) for day in range(7) for hour in range(24)),
+            key=lambda cell: summary.punchcard[cell[0]][cell[1]],
+        )
+        active_days = sum(1 for week in summary.calendar for count in week if count)
         lines.append(
-            f"- Commits: **{summary.commits}** | Active days: **{active_days}** | Peak day: **{peak_text}**"
+            f"_Busiest slot: {WEEKDAY_NAMES[weekday]} {hour:02d}:00-{hour + 1:02d}:00 "
+            f"({summary.punchcard[weekday][hour]} commits). "
+            f"Active days in the last {CALENDAR_WEEKS} weeks: {active_days}._"
         )
+        lines.append("")
+        lines.append("| Day | 00-06 | 06-12 | 12-18 | 18-24 | Total |")
+        lines.append("|-----|-------|-------|-------|-------|-------|")
+        for day, row in enumerate(summary.punchcard):
+            cells = " | ".join(str(sum(row[start:end])) for start, end in blocks)
+            lines.append(f"| {WEEKDAY_NAMES[day]} | {cells} | {sum(row)} |")
+
+        punchcard_chart, calendar_chart = charts.get(label, (None, None))
+        if punchcard_chart:
+            lines.append("")
+            lines.append(f"![{label} Punchcard]({readme_link(punchcard_chart)})")
+        if calendar_chart:
+            lines.append("")
+            lines.append(f"![{label} Contribution Calendar]({readme_link(calendar_chart)})")
+        lines.append("")
+
+    return "\n".join(lines).rstrip() + "\n"
+
+
+def build_code_frequency_block(
+    ordered_labels: list[str],
+    summaries: dict[str, Summary],
+    charts: dict[str, Path | None],
+    recent_weeks: int = 8,
+) -> str:
+    lines = ["## Code Frequency", "", f"_Weeks start on Monday in {CLOCK.timezone}._", ""]
+    for label in ordered_labels:
+        summary = summaries[label]
+        lines.append(f"### {label}")
+        weeks, additions, deletions = weekly_series(summary)
+        if not weeks:
+            lines.append("_No changes in this window._")
+            lines.append("")
+            continue
+
+        busiest = max(range(len(weeks)), key=lambda idx: additions[idx] + deletions[idx])
         lines.append(
-            f"- Additions: **{summary.additions}** | Deletions: **{summary.deletions}** | Churn: **{summary.churn}**"
+            f"_{len(weeks)} week(s), averaging +{sum(additions) / len(weeks):,.0f} / "
+            f"-{sum(deletions) / len(weeks):,.0f} lines per week. Busiest week: "
+            f"{weeks[busiest].isoformat()} (+{additions[busiest]:,} / -{deletions[busiest]:,})._"
         )
+        lines.append("")
+        lines.append("| Week of | +Add | -Del | Net |")
+        lines.append("|---------|------|------|-----|")
+        for idx in range(len(weeks) - 1, max(len(weeks) - recent_weeks, 0) - 1, -1):
+            lines.append(
+                f"| {weeks[idx].isoformat()} | {additions[idx]:,} | {deletions[idx]:,} | "
+                f"{additions[idx] - deletions[idx]:+,} |"
+            )
+
+        chart = charts.get(label)
         if chart:
-            lines.append(f"![{label} Commit Activity]({chart.as_posix()})")
-        else:
-            lines.append("_No commit activity in this window._")
+            lines.append("")
+            lines.append(f"![{label} Code Frequency]({readme_link(chart)})")
         lines.append("")
 
     return "\n".join(lines).rstrip() + "\n"
 
 
-def build_language_block(
+def build_contributor_activity_block(
+    ordered_labels: list[str],
+    streams: dict[str, tuple[list[dt.date], list[tuple[str, list[int]]]]],
+    charts: dict[str, Path | None],
+) -> str:
+    lines = ["## Contributor Activity", ""]
+    for label in ordered_labels:
+        weeks, layers = streams[label]
+        lines.append(f"### {label}")
+        if not layers:
+            lines.append("_No changes in this window._")
+            lines.append("")
+            continue
+
+        lines.append("| Contributor | Churn | Active Weeks | Peak Week |")
+        lines.append("|-------------|-------|--------------|-----------|")
+        for name, series in layers:
+            peak = max(range(len(series)), key=series.__getitem__)
+            lines.append(
+                f"| {name} | {sum(series):,} | {sum(1 for churn in series if churn)} of {len(weeks)} | "
+                f"{weeks[peak].isoformat()} ({series[peak]:,}) |"
+            )
+
+        chart = charts.get(label)
+        if chart:
+            lines.append("")
+            lines.append(f"![{label} Contributor Activity]({readme_link(chart)})")
+        lines.append("")
+
+    return "\n".join(lines).rstrip() + "\n"
+
+
+def build_cohorts_block(cohorts: CohortIndex, max_months: int, horizons: tuple[int, ...] = (3, 6, 12)) -> str:
+    lines = ["## Contributor Cohorts", ""]
+    if not cohorts.first_seen:
+        lines.append("_No commits yet._")
+        return "\n".join(lines) + "\n"
+
+    current = month_index(CLOCK.date(int(time.time())))
+    arrivals = cohorts.arrivals()
+    first_month = max(min(arrivals), current - max_months + 1)
+    lines.append(
+        f"_{len(cohorts.first_seen)} contributor(s) overall; {cohorts.active_since(current - 2)} committed in the "
+        f"last 3 months. Retention counts a cohort's contributors who committed again N or more months "
+        f"after their first month._"
+    )
+    lines.append("")
+    lines.append("| Cohort | New | " + " | ".join(f"{months} mo" for months in horizons) + " |")
+    lines.append("|--------|-----|" + "|".join("-" * (len(str(months)) + 5) for months in horizons) + "|")
+    for month in range(current, first_month - 1, -1):
+        authors = arrivals.get(month)
+        if not authors:
+            continue
+        cells = []
+        for months in horizons:
+            if month + months > current:
+                cells.append("-")
+                continue
+            retained = cohorts.retained(authors, months)
+            cells.append(f"{retained} ({retained / len(authors) * 100:.0f}%)")
+        lines.append(f"| {month_label(month)} | {len(authors)} | " + " | ".join(cells) + " |")
+
+    return "\n".join(lines) + "\n"
+
+
+def build_directory_block(
     ordered_labels: list[str],
     summaries: dict[str, Summary],
-    language_charts: dict[str, Path | None],
+    depth: int,
+    max_rows: int,
 ) -> str:
-    lines = ["## Language Breakdown", ""]
+    lines = ["## Directory Churn", "", f"_Directories rolled up to depth {depth}._", ""]
 
     for label in ordered_labels:
         summary = summaries[label]
-        total = sum(summary.language_churn.values())
         lines.append(f"### {label}")
 
-        if total == 0:
-            lines.append("_No language churn data in this window._")
+        if not summary.file_churn:
+            lines.append("_No file-level changes in this window._")
             lines.append("")
             continue
 
-        lines.append("| Language | Churn | Share |")
-        lines.append("|----------|-------|-------|")
-        for language, churn in summary.language_churn.most_common(8):
-            share = (churn / total) * 100
-            lines.append(f"| {language} | {churn} | {share:.1f}% |")
+        total = max(summary.churn, 1)
+        lines.append("| Directory | Churn | Share | Files | Top Contributor |")
+        lines.append("|-----------|-------|-------|-------|-----------------|")
+        for directory, churn, files, authors in summary_directory_rows(summary, depth)[:max_rows]:
+            safe_name = directory.replace("|", "\\|")
+            if authors and churn:
+                top_author, top_churn = top_counts(authors, 1, by_name=True)[0]
+                top_text = f"{author_name(top_author)} ({(top_churn / churn) * 100:.0f}%)"
+            else:
+                top_text = "n/a"
+            lines.append(
+                f"| `{safe_name}` | {churn} | {(churn / total) * 100:.1f}% | {files} | {top_text} |"
+            )
+        lines.append("")
 
-        chart = language_charts.get(label)
-        if chart:
+    return "\n".join(lines).rstrip() + "\n"
+
+
+def build_ownership_block(
+    ordered_labels: list[str],
+    window_directories: dict[str, list[tuple[str, Any, int, Counter[int]]]],
+    depth: int,
+    max_rows: int,
+    coverage: list[float],
+    half_life_days: float | None,
+) -> str:
+    lines = ["## Ownership", ""]
+    note = f"_Directories rolled up to depth {depth}; bus factor is the fewest authors covering each share of churn"
+    if half_life_days:
+        note += f", with churn halved every {half_life_days:g} days"
+    lines.extend([note + "._", ""])
+
+    coverage_headers = " | ".join(f"Bus Factor ({share * 100:.0f}%)" for share in coverage)
+    coverage_rule = "|".join("-" * (len(f"Bus Factor ({share * 100:.0f}%)") + 2) for share in coverage)
+
+    for label in ordered_labels:
+        lines.append(f"### {label}")
+
+        rows = [row for row in window_directories[label] if row[1] > 0]
+        if not rows:
+            lines.append("_No file-level changes in this window._")
             lines.append("")
-            lines.append(f"![{label} Language Breakdown]({chart.as_posix()})")
+            continue
+
+        lines.append(f"| Directory | Churn | Top Author | Top Share | {coverage_headers} | Authors |")
+        lines.append(f"|-----------|-------|------------|-----------|{coverage_rule}|---------|")
+        for directory, churn, _, authors in rows[:max_rows]:
+            safe_name = directory.replace("|", "\\|")
+            top_author, top_churn = top_counts(authors, 1, by_name=True)[0]
+            factors = " | ".join(str(bus_factor(authors, share)) for share in coverage)
+            active_authors = sum(1 for value in authors.values() if value > 0)
+            lines.append(
+                f"| `{safe_name}` | {churn:.0f} | {author_name(top_author)} | {(top_churn / churn) * 100:.0f}% | "
+                f"{factors} | {active_authors} |"
+            )
+        lines.append("")
+
+    return "\n".join(lines).rstrip() + "\n"
+
+
+def build_hotspots_block(
+    label: str,
+    hotspots: list[tuple[str, int, int, int, int]],
+    metric: str,
+    max_rows: int,
+) -> str:
+    weight = "line count" if metric == "lines" else "indentation complexity"
+    lines = [
+        "## Hotspots",
+        "",
+        f"### {label}",
+        f"_Churn in this window multiplied by {weight} at HEAD (at least 1), for files that still exist._",
+        "",
+    ]
+
+    ranked = [row for row in hotspots if row[4] > 0][:max_rows]
+    if not ranked:
+        lines.append("_No hotspots in this window._")
+        return "\n".join(lines).rstrip() + "\n"
+
+    lines.append("| File | Churn | Lines | Complexity | Score |")
+    lines.append("|------|-------|-------|------------|-------|")
+    for filename, churn, line_count, complexity, score in ranked:
+        safe_name = filename.replace("|", "\\|")
+        lines.append(f"| `{safe_name}` | {churn} | {line_count} | {complexity} | {score} |")
+
+    return "\n".join(lines).rstrip() + "\n"
+
+
+def build_coupling_block(
+    label: str,
+    counts: CouplingCounts,
+    max_files: int,
+    min_support: int,
+    min_confidence: float,
+    max_rows: int,
+) -> str:
+    lines = ["## Co-change Coupling", "", f"### {label}"]
+    note = f"_{counts.commits} commit(s) analysed"
+    if counts.skipped_commits:
+        note += f"; {counts.skipped_commits} skipped for touching more than {max_files} files"
+    if counts.evictions:
+        note += (
+            f"; the pair table was trimmed {counts.evictions} time(s), dropping pairs with at most "
+            f"{counts.eviction_floor} co-change(s), so counts may be low by up to "
+            f"{counts.eviction_floor * counts.evictions}"
+        )
+    lines.append(note + "._")
+    lines.append("")
+
+    pairs = coupled_pairs(counts, min_support, min_confidence)
+    if not pairs:
+        lines.append(
+            f"_No file pairs changed together at least {min_support} times "
+            f"with {min_confidence * 100:.0f}% coupling._"
+        )
+        return "\n".join(lines).rstrip() + "\n"
+
+    lines.append("| File | Coupled With | Co-changes | Coupling |")
+    lines.append("|------|--------------|------------|----------|")
+    for pair in pairs[:max_rows]:
+        first = pair.first.replace("|", "\\|")
+        second = pair.second.replace("|", "\\|")
+        lines.append(f"| `{first}` | `{second}` | {pair.support} | {pair.confidence * 100:.0f}% |")
+
+    return "\n".join(lines).rstrip() + "\n"
+
+
+def build_surviving_block(
+    author_lines: Counter[int],
+    language_lines: Counter[str],
+    result: BlameResult,
+    covered_files: int,
+    total_files: int,
+    max_rows: int,
+) -> str:
+    lines = ["## Surviving Code", ""]
+    total = sum(author_lines.values())
+    coverage = f"{covered_files} of {total_files} file(s) at HEAD"
+    if result.timed_out:
+        lines.append(
+            f"_Partial: blamed {coverage} before the time budget ran out; "
+            f"the remaining {total_files - covered_files} continue on the next run._"
+        )
+    else:
+        lines.append(f"_Blame over {coverage} ({result.blamed} re-blamed, {result.cached} from cache)._")
+    lines.append("")
+
+    if not total:
+        lines.append("_No blamed lines yet._")
+        return "\n".join(lines).rstrip() + "\n"
+
+    lines.append("| Author | Lines | Share |")
+    lines.append("|--------|-------|-------|")
+    for author, count in top_counts(author_lines, max_rows, by_name=True):
+        lines.append(f"| {author_name(author)} | {count} | {(count / total) * 100:.1f}% |")
+    lines.append("")
+
+    lines.append("| Language | Lines | Share |")
+    lines.append("|----------|-------|-------|")
+    for language, count in top_counts(language_lines, max_rows):
+        lines.append(f"| {language} | {count} | {(count / total) * 100:.1f}% |")
+
+    return "\n".join(lines).rstrip() + "\n"
+
 
+def build_scopes_block(
+    scopes: dict[str, list[str]],
+    ordered_labels: list[str],
+    scope_summaries: dict[str, dict[str, Summary]],
+    primary_label: str,
+    max_contributors: int,
+) -> str:
+    lines = ["## Scoped Analytics", ""]
+
+    for scope, prefixes in scopes.items():
+        summaries = scope_summaries[scope]
+        prefix_text = ", ".join(f"`{prefix}`" for prefix in prefixes)
+        lines.extend([
+            f"### {scope} ({prefix_text})",
+            "",
+            "| Window | Commits | Contributors | +Add | -Del | Churn | Files | Active Days |",
+            "|--------|---------|--------------|------|------|-------|-------|-------------|",
+        ])
+        for label in ordered_labels:
+            summary = summaries[label]
+            active_days = sum(1 for count in summary.daily_commits.values() if count > 0)
+            lines.append(
+                f"| {label} | {summary.commits} | {summary.contributors} | {summary.additions} | "
+                f"{summary.deletions} | {summary.churn} | {summary.files_changed} | {active_days} |"
+            )
+
+        primary = summaries[primary_label]
+        total_language = sum(primary.language_churn.values())
+        lines.extend([
+            "",
+            f"| Language ({primary_label}) | Churn | Share |",
+            "|----------|-------|-------|",
+        ])
+        for language, churn in top_counts(primary.language_churn, 8):
+            lines.append(f"| {language} | {churn} | {(churn / max(total_language, 1)) * 100:.1f}% |")
+        if not primary.language_churn:
+            lines.append("| _No language churn_ | 0 | 0.0% |")
+
+        lines.extend([
+            "",
+            f"| Contributor ({primary_label}) | Commits | Churn |",
+            "|-------------|---------|-------|",
+        ])
+        for author, churn in top_counts(primary.contributor_churn, max_contributors, by_name=True):
+            lines.append(f"| {author_name(author)} | {primary.contributor_commits.get(author, 0)} | {churn} |")
+        if not primary.contributor_churn:
+            lines.append("| _No contributor activity_ | 0 | 0 |")
         lines.append("")
 
     return "\n".join(lines).rstrip() + "\n"
@@ -675,9 +3331,9 @@ def build_pulse_block(
     all_time_summary: Summary,
     pulse_contributor_chart: Path | None,
     all_time_commit_chart: Path | None,
+    commit_dates: tuple[str, str] = ("n/a", "n/a"),
 ) -> str:
-    first_commit = run_git(["log", "--reverse", "--format=%ad", "--date=short", "-1"]).strip() or "n/a"
-    last_commit = run_git(["log", "-1", "--format=%ad", "--date=short"]).strip() or "n/a"
+    first_commit, last_commit = commit_dates
 
     lines = [
         "## Repository Pulse",
@@ -697,10 +3353,10 @@ def build_pulse_block(
     ]
 
     if pulse_contributor_chart:
-        lines.extend(["", f"![Top Contributor Churn]({pulse_contributor_chart.as_posix()})"])
+        lines.extend(["", f"![Top Contributor Churn]({readme_link(pulse_contributor_chart)})"])
 
     if all_time_commit_chart:
-        lines.extend(["", f"![All Time Commit Activity]({all_time_commit_chart.as_posix()})"])
+        lines.extend(["", f"![All Time Commit Activity]({readme_link(all_time_commit_chart)})"])
 
     return "\n".join(lines)
 
@@ -737,6 +3393,11 @@ def replace_block(text: str, block_type: str, inner_markdown: str) -> str:
     return text.rstrip() + f"\n\n{typed_start}\n\n{inner_markdown.strip()}\n\n{typed_end}\n"
 
 
+def wants_block(block_type: str, include_blocks: list[str], readme_text: str) -> bool:
+    """Opt-in sections render when listed in sections.include or when the template has their marker."""
+    return block_type in include_blocks or f"<!-- STATS BREAKDOWN START:{block_type} -->" in readme_text
+
+
 def choose_primary_window(ordered_labels: list[str], raw_timeframes: dict[str, Any]) -> str:
     for label in ordered_labels:
         value = raw_timeframes.get(label)
@@ -753,11 +3414,176 @@ def choose_all_time_window(ordered_labels: list[str], raw_timeframes: dict[str,
     return ordered_labels[0]
 
 
-def main() -> None:
-    STATS_DIR.mkdir(exist_ok=True)
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Update README analytics blocks from git history.")
+    parser.add_argument(
+        "--git-dir",
+        help="Path to the git repository (bare mirrors work; no working tree is needed).",
+    )
+    parser.add_argument(
+        "--readme-ref",
+        help=(
+            "Read the README template from a blob such as 'HEAD:README.md' instead of the "
+            f"working tree. Defaults to {DEFAULT_README_REF!r} when --git-dir is given."
+        ),
+    )
+    parser.add_argument(
+        "--output-dir",
+        help="Directory that receives README.md and the stats/ charts (default: current directory).",
+    )
+    parser.add_argument(
+        "--store",
+        choices=("jsonl", "sqlite"),
+        default="jsonl",
+        help="Persisted history backend (default: jsonl). sqlite also computes summaries in SQL.",
+    )
+    parser.add_argument(
+        "--store-path",
+        help="SQLite database path (default: <git-dir>/analytics/history.sqlite).",
+    )
 
-    readme_text = README_PATH.read_text(encoding="utf-8")
-    config = parse_analytics_config(readme_text)
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND")
+    daemon = subparsers.add_parser(
+        "daemon",
+        help="Keep history in memory, refresh on ref updates and serve JSON over HTTP.",
+    )
+    daemon.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1).")
+    daemon.add_argument("--port", type=int, default=8765, help="Port to listen on (default: 8765).")
+    daemon.add_argument(
+        "--poll-interval",
+        type=float,
+        default=2.0,
+        help="Seconds between checks of HEAD, refs/ and packed-refs (default: 2).",
+    )
+
+    hook = subparsers.add_parser(
+        "hook",
+        help="post-commit/post-merge mode: ingest only new commits and skip chart rendering.",
+    )
+    hook.add_argument(
+        "--install",
+        action="store_true",
+        help="Install post-commit and post-merge hooks that run this mode.",
+    )
+
+    query = subparsers.add_parser(
+        "query",
+        help="Ad-hoc filtered aggregations over the cached history (no git log).",
+    )
+    query.add_argument("--author", action="append", default=[], help="Author name (repeatable).")
+    query.add_argument(
+        "--path",
+        action="append",
+        default=[],
+        type=normalize_prefix,
+        help="Path prefix, e.g. services/billing/ (repeatable).",
+    )
+    query.add_argument("--language", action="append", default=[], help="Language name (repeatable).")
+    query.add_argument(
+        "--category",
+        action="append",
+        default=[],
+        help="Commit category from the subject prefix: feature, fix, docs, ... (repeatable).",
+    )
+    query.add_argument(
+        "--since", type=since_argument, help="Start of the range: a timeframe such as 90d or a YYYY-MM-DD date."
+    )
+    query.add_argument("--until", type=date_argument, help="Last day of the range (YYYY-MM-DD, inclusive).")
+    query.add_argument("--group-by", choices=GROUP_BY_CHOICES, help="Break the totals down by this key.")
+    query.add_argument("--depth", type=int, default=2, help="Directory depth for --group-by path (default: 2).")
+    query.add_argument("--limit", type=int, default=20, help="Maximum groups to print in table output (default: 20).")
+    query.add_argument("--format", choices=("table", "json"), default="table", help="Output format (default: table).")
+
+    sql = subparsers.add_parser(
+        "sql",
+        help="Run a read-only SELECT against the SQLite store (implies --store sqlite).",
+    )
+    sql.add_argument("statement", help="SQL to execute, e.g. \"SELECT name FROM authors\".")
+    sql.add_argument("--format", choices=("table", "json"), default="table", help="Output format (default: table).")
+    return parser.parse_args(argv)
+
+
+def configure_paths(args: argparse.Namespace) -> str | None:
+    """Apply CLI path options to the module globals and return the template ref to read."""
+    global GIT_DIR, README_PATH, STATS_DIR, STORE_BACKEND, STORE_PATH
+
+    GIT_DIR = args.git_dir or None
+    STORE_BACKEND = "sqlite" if args.command == "sql" else args.store
+    STORE_PATH = Path(args.store_path) if args.store_path else None
+    if args.output_dir:
+        output_dir = Path(args.output_dir)
+        README_PATH = output_dir / "README.md"
+        STATS_DIR = output_dir / "stats"
+
+    if args.readme_ref:
+        return args.readme_ref
+    return DEFAULT_README_REF if GIT_DIR else None
+
+
+def run_daemon(config: dict[str, Any], host: str, port: int, poll_interval: float) -> None:
+    """Keep the parsed history in memory and serve fresh JSON as refs move."""
+    # Imported lazily: http.server alone costs more than the whole hook fast path.
+    from analytics_daemon import serve_analytics
+
+    raw_timeframes = config.get("timeframes", {})
+    if not raw_timeframes:
+        raw_timeframes = DEFAULT_CONFIG["timeframes"]
+
+    ordered_labels = list(raw_timeframes.keys())
+    ignored_values = normalize_ignore_values(config.get("languages", {}).get("ignore", []))
+    max_contributors = int(config.get("contributors", {}).get("max", 10))
+    all_time_label = choose_all_time_window(ordered_labels, raw_timeframes)
+
+    index = load_or_build_index()
+    print(f"INFO: Loaded {len(index.commits)} commits ({len(index.changes)} file changes).")
+    cache_dir = index_cache_dir()
+
+    def snapshot() -> dict[str, Any]:
+        apply_gitattributes(config, index)
+        summaries = build_window_summaries(index, raw_timeframes, ignored_values)
+        return build_api_payloads(index, ordered_labels, summaries, all_time_label, max_contributors)
+
+    def refresh() -> dict[str, Any]:
+        previous_head = index.head
+        added = update_history_index(index)
+        if index.head != previous_head:
+            print(f"INFO: Ingested {added} commit(s); HEAD is now {index.head[:12] or 'unborn'}.")
+            if index.head and config.get("languages", {}).get("shebangs", True):
+                CLASSIFIER.add_shebangs(sniff_shebangs(index.head))
+            save_history_index(index, cache_dir)
+        return snapshot()
+
+    git_dir = Path(run_git(["rev-parse", "--absolute-git-dir"]).strip())
+    common_dir = Path(run_git(["rev-parse", "--git-common-dir"]).strip()).resolve()
+    serve_analytics(
+        watched_paths=[git_dir / "HEAD", common_dir / "packed-refs", common_dir / "refs"],
+        initial_payloads=snapshot(),
+        refresh=refresh,
+        host=host,
+        port=port,
+        poll_interval=poll_interval,
+    )
+
+
+def update_readme(
+    readme_text: str,
+    config: dict[str, Any],
+    index: HistoryIndex,
+    render_charts: bool = True,
+    windows: WindowState | None = None,
+) -> None:
+    """Rewrite the README blocks; with ``render_charts=False`` (hook mode) work that scales with the tree is deferred.
+
+    Hook runs link existing chart files as-is. They also reuse the code snapshot and the
+    SURVIVING / HOTSPOTS sections from the last full run instead of re-reading every blob at HEAD,
+    and likewise COUPLING and decayed OWNERSHIP, which rescan every change row; each is marked
+    with the commit it describes. When ``windows`` is given, ``index`` holds only the commits
+    since ``windows.head`` and those are folded into the persisted per-window and per-scope totals.
+    """
+    STATS_DIR.mkdir(parents=True, exist_ok=True)
+    apply_gitattributes(config, index, revalidate=render_charts)
+    deferred_head, deferred = load_deferred()
+    as_of = deferred_head if deferred_head != index.head else None
 
     raw_timeframes = config.get("timeframes", {})
     if not raw_timeframes:
@@ -767,20 +3593,41 @@ def main() -> None:
     ignored_values = normalize_ignore_values(config.get("languages", {}).get("ignore", []))
     graph_cfg = config.get("graphs", {})
     show_graphs = bool(graph_cfg.get("show", True))
-    if show_graphs and get_plot_modules() is None:
+    if show_graphs and render_charts and get_plot_modules() is None:
         show_graphs = False
     max_contributors = int(config.get("contributors", {}).get("max", 10))
 
-    summaries: dict[str, Summary] = {}
+    live_paths = head_paths(index.head) if index.head and config.get("paths", {}).get("head_only") else None
+    scopes = normalize_scopes(config.get("scopes", {}))
+    # Every window is sliced in memory from the single parsed history, or advanced from the persisted totals.
+    if windows is None:
+        summaries = build_window_summaries(index, raw_timeframes, ignored_values)
+        scope_summaries = build_scope_summaries(index, scopes, raw_timeframes, ignored_values)
+        windows = build_window_state(config, index, summaries, scope_summaries, raw_timeframes, ignored_values)
+    else:
+        advance_window_state(windows, index, raw_timeframes, ignored_values, scopes)
+        summaries = {label: summary_from_totals(windows.windows[label]) for label in ordered_labels}
+        scope_summaries = {
+            scope: {label: summary_from_totals(totals[label]) for label in ordered_labels}
+            for scope, totals in windows.scopes.items()
+        }
+    if index.head:
+        try:
+            save_window_state(windows)
+        except OSError as exc:
+            print(f"WARNING: Could not persist window totals ({exc}).")
+    if live_paths is not None:
+        for summary in summaries.values():
+            restrict_to_paths(summary, live_paths)
     commit_charts: dict[str, Path | None] = {}
     language_charts: dict[str, Path | None] = {}
 
-    for label, timeframe_value in raw_timeframes.items():
-        commits, changes = parse_history(timeframe_value)
-        summary = summarize(commits, changes, ignored_values)
-        summaries[label] = summary
-
-        if show_graphs:
+    for label in ordered_labels:
+        summary = summaries[label]
+        if show_graphs and not render_charts:
+            commit_charts[label] = existing_chart("commits", label)
+            language_charts[label] = existing_chart("language", label)
+        elif show_graphs:
             commit_charts[label] = plot_commit_activity(label, summary, graph_cfg)
             language_charts[label] = plot_language_breakdown(label, summary)
         else:
@@ -795,6 +3642,11 @@ def main() -> None:
         summaries=summaries,
         primary_label=primary_label,
         max_contributors=max_contributors,
+        automation=(
+            index.automation.window(window_start_date(raw_timeframes[primary_label]))
+            if config.get("bots", {}).get("automation_row")
+            else None
+        ),
     )
 
     commits_block = build_commits_block(
@@ -803,23 +3655,36 @@ def main() -> None:
         commit_charts=commit_charts,
     )
 
+    languages_cfg = config.get("languages", {})
+    snapshot = None
+    if index.head and languages_cfg.get("snapshot", True) and languages_cfg.get("show_breakdown", True):
+        if render_charts:
+            snapshot = build_code_snapshot(index.head, ignored_values)
+            deferred["snapshot"] = snapshot.to_dict()
+        elif "snapshot" in deferred:
+            snapshot = CodeSnapshot.from_dict(deferred["snapshot"])
+
     language_block = build_language_block(
         ordered_labels=ordered_labels,
         summaries=summaries,
         language_charts=language_charts,
+        snapshot=snapshot,
+        snapshot_as_of=None if render_charts else as_of,
     )
 
-    pulse_chart = (
-        plot_contributor_churn(all_time_label, summaries[all_time_label], max_contributors)
-        if show_graphs
-        else None
-    )
+    if show_graphs and not render_charts:
+        pulse_chart = existing_chart("contributors", all_time_label)
+    elif show_graphs:
+        pulse_chart = plot_contributor_churn(all_time_label, summaries[all_time_label], max_contributors)
+    else:
+        pulse_chart = None
     pulse_block = build_pulse_block(
         generated_at=dt.datetime.utcnow(),
         all_time_label=all_time_label,
         all_time_summary=summaries[all_time_label],
         pulse_contributor_chart=pulse_chart,
         all_time_commit_chart=commit_charts.get(all_time_label),
+        commit_dates=windows.commit_dates,
     )
 
     changelog_cfg = config.get("changelog", {})
@@ -828,6 +3693,10 @@ def main() -> None:
         max_days=int(changelog_cfg.get("max_days", 45)),
         max_per_day=int(changelog_cfg.get("max_per_day", 8)),
         include_authors=bool(changelog_cfg.get("include_authors", True)),
+        git_dir=GIT_DIR,
+        mailmap=IDENTITIES.mailmap,
+        resolve_author=lambda name, email: author_name(IDENTITIES.resolve(name, email)),
+        skip_commit=BOT_FILTER.is_automated,
     )
 
     include_blocks = [
@@ -835,6 +3704,194 @@ def main() -> None:
         for name in config.get("sections", {}).get("include", DEFAULT_BLOCKS)
     ]
 
+    if wants_block("LANGUAGE_GROWTH", include_blocks, readme_text):
+        growth_days, growth = build_language_growth(
+            summaries[all_time_label].language_daily_net,
+            max_languages=int(config.get("languages", {}).get("growth_max", 8)),
+        )
+        if show_graphs and not render_charts:
+            growth_chart = existing_chart("language_growth", all_time_label)
+        elif show_graphs:
+            growth_chart = plot_language_growth(all_time_label, growth_days, growth, graph_cfg)
+        else:
+            growth_chart = None
+        readme_text = replace_block(
+            readme_text,
+            "LANGUAGE_GROWTH",
+            build_language_growth_block(all_time_label, growth_days, growth, growth_chart),
+        )
+
+    if wants_block("DIRECTORY", include_blocks, readme_text):
+        directory_cfg = config.get("directories", {})
+        readme_text = replace_block(
+            readme_text,
+            "DIRECTORY",
+            build_directory_block(
+                ordered_labels,
+                summaries,
+                depth=max(int(directory_cfg.get("depth", 2)), 1),
+                max_rows=int(directory_cfg.get("max", 15)),
+            ),
+        )
+
+    if wants_block("OWNERSHIP", include_blocks, readme_text):
+        ownership_cfg = config.get("ownership", {})
+        half_life = ownership_cfg.get("half_life_days")
+        half_life = float(half_life) if half_life else None
+        depth = max(int(ownership_cfg.get("depth", 2)), 1)
+        if half_life and not render_charts:
+            ownership_block = deferred_block(deferred, "OWNERSHIP", as_of)
+        else:
+            if half_life:
+                today = CLOCK.date(int(time.time()))
+                owned_changes = index.changes
+                if live_paths is not None:
+                    owned_changes = [change for change in index.changes if change.filename in live_paths]
+                window_directories: dict[str, list[tuple[str, Any, int, Counter[int]]]] = {}
+                for label in ordered_labels:
+                    start = window_start_time(raw_timeframes[label])
+                    file_authors = decayed_file_authors(owned_changes, start, half_life, today)
+                    window_directories[label] = directory_rows(build_directory_trie(file_authors, depth), depth)
+            else:
+                window_directories = {
+                    label: summary_directory_rows(summaries[label], depth) for label in ordered_labels
+                }
+            ownership_block = build_ownership_block(
+                ordered_labels,
+                window_directories,
+                depth=depth,
+                max_rows=int(ownership_cfg.get("max", 15)),
+                coverage=[float(share) for share in ownership_cfg.get("coverage", [0.5, 0.8])],
+                half_life_days=half_life,
+            )
+            if half_life:
+                deferred["OWNERSHIP"] = ownership_block
+        if ownership_block:
+            readme_text = replace_block(readme_text, "OWNERSHIP", ownership_block)
+
+    if index.head and wants_block("HOTSPOTS", include_blocks, readme_text) and not render_charts:
+        hotspots_block = deferred_block(deferred, "HOTSPOTS", as_of)
+        if hotspots_block:
+            readme_text = replace_block(readme_text, "HOTSPOTS", hotspots_block)
+    elif index.head and wants_block("HOTSPOTS", include_blocks, readme_text):
+        hotspots_cfg = config.get("hotspots", {})
+        hotspots_label = hotspots_cfg.get("window") or primary_label
+        if hotspots_label not in summaries:
+            hotspots_label = primary_label
+        metric = str(hotspots_cfg.get("metric", "complexity")).lower()
+        hotspots = rank_hotspots(
+            index.head,
+            summaries[hotspots_label].file_churn,
+            ignored_values,
+            metric=metric,
+            workers=default_workers(hotspots_cfg.get("workers")),
+        )
+        deferred["HOTSPOTS"] = build_hotspots_block(
+            hotspots_label, hotspots, metric, max_rows=int(hotspots_cfg.get("max", 15))
+        )
+        readme_text = replace_block(readme_text, "HOTSPOTS", deferred["HOTSPOTS"])
+
+    if wants_block("COUPLING", include_blocks, readme_text) and not render_charts:
+        coupling_block = deferred_block(deferred, "COUPLING", as_of)
+        if coupling_block:
+            readme_text = replace_block(readme_text, "COUPLING", coupling_block)
+    elif wants_block("COUPLING", include_blocks, readme_text):
+        coupling_cfg = config.get("coupling", {})
+        coupling_label = coupling_cfg.get("window") or all_time_label
+        if coupling_label not in raw_timeframes:
+            coupling_label = all_time_label
+        coupling_start = window_start_time(raw_timeframes[coupling_label])
+        max_files = int(coupling_cfg.get("max_files_per_commit", 30))
+        min_support = int(coupling_cfg.get("min_support", 3))
+        min_confidence = float(coupling_cfg.get("min_confidence", 0.5))
+        counts = count_cochanges(
+            (change for change in index.changes if coupling_start is None or change.time >= coupling_start),
+            max_files=max_files,
+            max_pairs=int(coupling_cfg.get("max_pairs", 200_000)),
+            keep=lambda filename: (live_paths is None or filename in live_paths)
+            and not should_ignore(filename, detect_language(filename), ignored_values),
+        )
+        deferred["COUPLING"] = build_coupling_block(
+            coupling_label,
+            counts,
+            max_files=max_files,
+            min_support=min_support,
+            min_confidence=min_confidence,
+            max_rows=int(coupling_cfg.get("max", 15)),
+        )
+        readme_text = replace_block(readme_text, "COUPLING", deferred["COUPLING"])
+
+    if index.head and wants_block("SURVIVING", include_blocks, readme_text) and not render_charts:
+        surviving_block = deferred_block(deferred, "SURVIVING", as_of)
+        if surviving_block:
+            readme_text = replace_block(readme_text, "SURVIVING", surviving_block)
+    elif index.head and wants_block("SURVIVING", include_blocks, readme_text):
+        surviving_cfg = config.get("surviving", {})
+        author_lines, language_lines, blame_result, covered_files, total_files = compute_surviving_lines(
+            index.head, ignored_values, surviving_cfg
+        )
+        deferred["SURVIVING"] = build_surviving_block(
+            author_lines,
+            language_lines,
+            blame_result,
+            covered_files,
+            total_files,
+            max_rows=int(surviving_cfg.get("max", 10)),
+        )
+        readme_text = replace_block(readme_text, "SURVIVING", deferred["SURVIVING"])
+
+    if wants_block("ACTIVITY", include_blocks, readme_text):
+        activity_charts: dict[str, tuple[Path | None, Path | None]] = {}
+        for label in ordered_labels:
+            summary = summaries[label]
+            if show_graphs and not render_charts:
+                activity_charts[label] = (existing_chart("punchcard", label), existing_chart("calendar", label))
+            elif show_graphs:
+                activity_charts[label] = (
+                    plot_punchcard(label, summary.punchcard),
+                    plot_calendar(label, summary.calendar, summary.calendar_start)
+                    if summary.calendar_start
+                    else None,
+                )
+        readme_text = replace_block(
+            readme_text, "ACTIVITY", build_activity_block(ordered_labels, summaries, activity_charts)
+        )
+
+    if wants_block("CODE_FREQUENCY", include_blocks, readme_text):
+        frequency_charts: dict[str, Path | None] = {}
+        for label in ordered_labels:
+            if show_graphs and not render_charts:
+                frequency_charts[label] = existing_chart("code_frequency", label)
+            elif show_graphs:
+                frequency_charts[label] = plot_code_frequency(label, summaries[label], graph_cfg)
+        readme_text = replace_block(
+            readme_text, "CODE_FREQUENCY", build_code_frequency_block(ordered_labels, summaries, frequency_charts)
+        )
+
+    if wants_block("CONTRIBUTOR_ACTIVITY", include_blocks, readme_text):
+        stream_top = int(config.get("contributors", {}).get("stream_top", 6))
+        streams = {label: contributor_stream(summaries[label], stream_top) for label in ordered_labels}
+        stream_charts: dict[str, Path | None] = {}
+        for label in ordered_labels:
+            if show_graphs and not render_charts:
+                stream_charts[label] = existing_chart("contributor_stream", label)
+            elif show_graphs:
+                stream_charts[label] = plot_contributor_stream(label, *streams[label], graph_cfg)
+        readme_text = replace_block(
+            readme_text, "CONTRIBUTOR_ACTIVITY", build_contributor_activity_block(ordered_labels, streams, stream_charts)
+        )
+
+    if wants_block("COHORTS", include_blocks, readme_text):
+        cohort_months = int(config.get("contributors", {}).get("cohort_months", 12))
+        readme_text = replace_block(readme_text, "COHORTS", build_cohorts_block(index.cohorts, cohort_months))
+
+    if scopes and wants_block("SCOPES", include_blocks, readme_text):
+        readme_text = replace_block(
+            readme_text,
+            "SCOPES",
+            build_scopes_block(scopes, ordered_labels, scope_summaries, primary_label, max_contributors),
+        )
+
     if "PULSE" in include_blocks:
         readme_text = replace_block(readme_text, "PULSE", pulse_block)
     if "OVERVIEW" in include_blocks:
@@ -847,8 +3904,214 @@ def main() -> None:
         readme_text = replace_block(readme_text, "CHANGELOG", changelog_block)
 
     README_PATH.write_text(readme_text, encoding="utf-8")
+    chart_cache().save()
+    if render_charts:
+        save_deferred(index.head, deferred)
     print("OK: README analytics + changelog blocks updated (markers/config preserved).")
 
+    export_cfg = config.get("export", {})
+    if export_cfg.get("enabled", True):
+        # Parquet means importing pyarrow, so hook mode defers it along with the charts.
+        parquet_enabled = bool(export_cfg.get("parquet", True)) and render_charts
+        if parquet_enabled and get_arrow_modules() is None:
+            parquet_enabled = False
+        written = export_tables(
+            STATS_DIR,
+            build_export_document(index.head, windows.commit_dates, ordered_labels, summaries),
+            build_export_tables(ordered_labels, summaries),
+            csv_enabled=bool(export_cfg.get("csv", True)),
+            parquet_enabled=parquet_enabled,
+        )
+        print(f"OK: Analytics export refreshed ({len(written)} file(s) changed).")
+
+
+def install_hooks() -> None:
+    hooks_dir = Path(run_git(["rev-parse", "--git-path", "hooks"]).strip() or ".git/hooks")
+    hooks_dir.mkdir(parents=True, exist_ok=True)
+    script = Path(__file__).resolve()
+
+    for name in ("post-commit", "post-merge"):
+        hook_path = hooks_dir / name
+        if hook_path.exists() and HOOK_MARKER not in hook_path.read_text(encoding="utf-8", errors="replace"):
+            print(f"WARNING: {hook_path} already exists and was not installed by this script; skipping.")
+            continue
+        hook_path.write_text(
+            f'#!/bin/sh\n{HOOK_MARKER}\nexec python3 "{script.as_posix()}" hook\n',
+            encoding="utf-8",
+        )
+        hook_path.chmod(0o755)
+        print(f"OK: Installed {hook_path}")
+
+
+def run_hook(readme_ref: str | None) -> None:
+    """post-commit/post-merge entry point: ingest only the new commits, defer chart rendering."""
+    started = time.perf_counter()
+    readme_text = read_readme_template(readme_ref)
+    config = parse_analytics_config(readme_text)
+    configure_path_filter(config)
+    configure_clock(config)
+    configure_bot_filter(config)
+    head = resolve_head()
+    configure_identities(config, head)
+    # The cached version is qualified by the filters above, so compare only once they are configured.
+    stored_head = cached_index_head(index_cache_dir())
+    if stored_head == head:
+        return
+
+    # Fold just the new commits into the persisted window totals; without them, load the whole index.
+    windows = load_window_state(stored_head, window_state_fingerprint(config))
+    index = resume_history_index(windows, head) if windows is not None else None
+    if index is not None:
+        # Persisted totals keep the languages their rows were folded with, so only new paths are classified.
+        configure_classifier(config, head, paths=index.paths.sorted_paths)
+        try:
+            save_history_index(index, index_cache_dir())
+        except OSError as exc:
+            print(f"WARNING: Could not persist analytics index ({exc}).")
+    else:
+        windows = None
+        configure_classifier(config, head)
+        index = load_or_build_index(use_diff_tree=True)
+    update_readme(readme_text, config, index, render_charts=False, windows=windows)
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f"OK: Analytics hook updated to {index.head[:12]} in {elapsed_ms:.0f} ms (charts deferred).")
+
+
+def date_argument(value: str) -> dt.date:
+    try:
+        return dt.date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date {value!r} (expected YYYY-MM-DD)") from None
+
+
+def since_argument(value: str) -> dt.date | str:
+    """A YYYY-MM-DD date, or a timeframe string resolved once the reporting clock is configured."""
+    if re.match(r"\d{4}-", value.strip()):
+        return date_argument(value.strip())
+    return value
+
+
+def parse_query_date(value: dt.date | str | None) -> dt.date | None:
+    if not value or isinstance(value, dt.date):
+        return value or None
+    return window_start_date(value)
+
+
+def template_config(readme_ref: str | None) -> dict[str, Any]:
+    """Config for query/sql: the template's when one is readable, defaults otherwise (no output)."""
+    try:
+        match = ANALYTICS_CONFIG_RE.search(read_readme_template(readme_ref))
+        return deep_merge(DEFAULT_CONFIG, json.loads(match.group(1).strip())) if match else DEFAULT_CONFIG
+    except (OSError, SystemExit, json.JSONDecodeError):
+        return DEFAULT_CONFIG
+
+
+def run_query_command(args: argparse.Namespace, config: dict[str, Any]) -> None:
+    """Answer a filtered aggregation from the persisted index without walking git history."""
+    index = load_history_index(index_cache_dir())
+    if index is None:
+        print("INFO: No cached analytics index yet; building it once from git history.")
+        index = load_or_build_index()
+    apply_gitattributes(config, index)
+
+    filters = QueryFilters(
+        authors=set(args.author),
+        path_prefixes=tuple(args.path),
+        languages=set(args.language),
+        categories=set(args.category),
+        start=parse_query_date(args.since),
+        end=args.until,
+    )
+    changes = index.changes
+    if filters.path_prefixes:
+        changes = [index.changes[row] for row in index.paths.rows_with_prefixes(list(filters.path_prefixes))]
+
+    result = run_query(
+        index.commits,
+        changes,
+        filters,
+        language_of=detect_language,
+        category_of=lambda commit: categorize_subject(commit.subject),
+        group_by=args.group_by,
+        depth=args.depth,
+        author_name=author_name,
+    )
+
+    if args.format == "json":
+        print(json.dumps(result, indent=2))
+    else:
+        print(format_query_table(result, limit=args.limit))
+
+
+def run_sql_command(args: argparse.Namespace, config: dict[str, Any]) -> None:
+    apply_gitattributes(config, load_or_build_index())
+    store_path = sqlite_store_path(index_cache_dir())
+    conn = connect_store(store_path)
+    try:
+        sync_store_classification(conn)
+    finally:
+        conn.close()
+
+    # Ad-hoc statements get their own read-only connection so they cannot alter the store.
+    conn = connect_store_readonly(store_path)
+    try:
+        header, rows = execute_sql(conn, args.statement)
+    except sqlite3.Error as exc:
+        raise SystemExit(f"ERROR: {exc}") from exc
+    finally:
+        conn.close()
+
+    if args.format == "json":
+        print(json.dumps([dict(zip(header, row)) for row in rows], indent=2))
+        return
+
+    print("| " + " | ".join(header) + " |")
+    print("|" + "|".join("-" * (len(name) + 2) for name in header) + "|")
+    for row in rows:
+        print("| " + " | ".join(str(value).replace("|", "\\|") for value in row) + " |")
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    readme_ref = configure_paths(args)
+
+    if args.command in ("sql", "query"):
+        config = template_config(readme_ref)
+        configure_path_filter(config)
+        configure_clock(config)
+        configure_bot_filter(config)
+        head = resolve_head()
+        configure_identities(config, head)
+        configure_classifier(config, head)
+        if args.command == "sql":
+            run_sql_command(args, config)
+        else:
+            run_query_command(args, config)
+        return
+
+    if args.command == "hook":
+        if args.install:
+            install_hooks()
+        else:
+            run_hook(readme_ref)
+        return
+
+    readme_text = read_readme_template(readme_ref)
+    config = parse_analytics_config(readme_text)
+    configure_path_filter(config)
+    configure_clock(config)
+    configure_bot_filter(config)
+    head = resolve_head()
+    configure_identities(config, head)
+    configure_classifier(config, head)
+
+    if args.command == "daemon":
+        run_daemon(config, host=args.host, port=args.port, poll_interval=args.poll_interval)
+        return
+
+    update_readme(readme_text, config, load_or_build_index())
+
 
 if __name__ == "__main__":
     main()